@@ -0,0 +1,177 @@
+# benchmarks/bench.py - THROUGHPUT AND LATENCY BENCHMARKS
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional
+from pathlib import Path
+
+from src.parser import DocumentParser
+from src.processor import FNOLProcessor
+from src.router import RoutingEngine
+from src.validator import FieldValidator
+
+from .corpus import generate_corpus
+
+RESULTS_SCHEMA = 1
+STAGES = ['parse_txt', 'parse_pdf', 'validate', 'route', 'end_to_end', 'startup']
+PERCENTILES = [50, 90, 95, 99]
+RUN_SCRIPT = Path(__file__).resolve().parent.parent / "run.py"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+def time_calls(fn: Callable, items: Iterable) -> Dict[str, Any]:
+    """Call fn on every item, recording per-call latency and overall throughput"""
+    latencies = []
+    clock = time.perf_counter
+    started = clock()
+    for item in items:
+        call_started = clock()
+        fn(item)
+        latencies.append(clock() - call_started)
+    total = clock() - started
+    
+    latencies.sort()
+    stats = {
+        'count': len(latencies),
+        'total_s': round(total, 6),
+        'throughput_per_s': round(len(latencies) / total, 2) if total > 0 else 0.0,
+        'latency_ms': {f'p{pct}': round(percentile(latencies, pct) * 1000, 4) for pct in PERCENTILES},
+    }
+    stats['latency_ms']['mean'] = round(sum(latencies) / len(latencies) * 1000, 4) if latencies else 0.0
+    stats['latency_ms']['max'] = round(latencies[-1] * 1000, 4) if latencies else 0.0
+    return stats
+
+
+def run_cli(file_path: str, cwd: str):
+    """One short-lived `run.py process` call, as a shell pipeline would make it"""
+    subprocess.run([sys.executable, str(RUN_SCRIPT), "process", str(Path(file_path).resolve())],
+                   cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+
+
+def run_benchmarks(files: Dict[str, List[str]], stages: Optional[List[str]] = None,
+                   startup_runs: int = 5) -> Dict[str, Any]:
+    """Benchmark each pipeline stage over the corpus files"""
+    stages = stages or STAGES
+    parser = DocumentParser()
+    validator = FieldValidator()
+    router = RoutingEngine()
+    results = {}
+    
+    # Validation and routing are timed on extractions from the same corpus
+    extracted = []
+    
+    def parse(file_path):
+        extracted.append(parser.parse_document(file_path))
+    
+    for stage, kind in (('parse_txt', 'txt'), ('parse_pdf', 'pdf')):
+        if stage in stages or ({'validate', 'route'} & set(stages)):
+            stats = time_calls(parse, files[kind])
+            if stage in stages:
+                results[stage] = stats
+    
+    if 'validate' in stages or 'route' in stages:
+        missing = []
+        inputs = extracted
+        stats = time_calls(lambda data: missing.append(validator.validate(data)), inputs)
+        if 'validate' in stages:
+            results['validate'] = stats
+        if 'route' in stages:
+            pairs = list(zip(inputs, missing))
+            results['route'] = time_calls(lambda pair: router.determine_route(*pair), pairs)
+    
+    if 'end_to_end' in stages:
+        processor = FNOLProcessor()
+        results['end_to_end'] = time_calls(processor.process_document, files['txt'] + files['pdf'])
+    
+    if 'startup' in stages and files['txt']:
+        # Interpreter start, imports and one TXT document per process
+        # run.py saves its result to the working directory, so run it in a scratch one
+        with tempfile.TemporaryDirectory() as scratch:
+            results['startup'] = time_calls(lambda file_path: run_cli(file_path, scratch),
+                                            [files['txt'][0]] * startup_runs)
+    
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Regressions of throughput or median latency beyond max_regression (a fraction)"""
+    regressions = []
+    for stage, stats in results['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base or not stats['count']:
+            continue
+        if stats['throughput_per_s'] < base['throughput_per_s'] * (1 - max_regression):
+            regressions.append(f"{stage}: throughput {stats['throughput_per_s']}/s "
+                               f"vs baseline {base['throughput_per_s']}/s")
+        if stats['latency_ms']['p50'] > base['latency_ms']['p50'] * (1 + max_regression):
+            regressions.append(f"{stage}: p50 {stats['latency_ms']['p50']}ms "
+                               f"vs baseline {base['latency_ms']['p50']}ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the FNOL pipeline on a synthetic corpus")
+    parser.add_argument('--docs', type=int, default=1000, help="number of documents to generate")
+    parser.add_argument('--pdf-ratio', type=float, default=0.1, help="fraction of documents that are PDFs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus')
+    parser.add_argument('--stages', default=','.join(STAGES), help="comma-separated stages to run")
+    parser.add_argument('--startup-runs', type=int, default=5,
+                        help="CLI processes to start for the startup stage")
+    parser.add_argument('--output', default='benchmarks/results.json')
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="allowed slowdown vs baseline as a fraction (default 0.2)")
+    args = parser.parse_args(argv)
+    
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    
+    print(f"Generating corpus: {args.docs} documents in {args.corpus_dir}")
+    files = generate_corpus(args.corpus_dir, args.docs, pdf_ratio=args.pdf_ratio, seed=args.seed)
+    
+    results = {
+        'schema': RESULTS_SCHEMA,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpus': {'docs': args.docs, 'pdf_ratio': args.pdf_ratio, 'seed': args.seed,
+                   'txt': len(files['txt']), 'pdf': len(files['pdf'])},
+        'stages': run_benchmarks(files, stages, startup_runs=args.startup_runs),
+    }
+    
+    print(f"{'stage':<12} {'docs':>8} {'docs/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for stage, stats in results['stages'].items():
+        print(f"{stage:<12} {stats['count']:>8} {stats['throughput_per_s']:>10} "
+              f"{stats['latency_ms']['p50']:>9} {stats['latency_ms']['p99']:>9}")
+    
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
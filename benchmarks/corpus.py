@@ -0,0 +1,187 @@
+# benchmarks/corpus.py - SYNTHETIC FNOL CORPUS GENERATOR
+import json
+import random
+from typing import Dict, Any, List, Optional
+from pathlib import Path
+
+
+# Documents per sub-directory, so million-document corpora stay listable
+SHARD_SIZE = 10000
+
+FIRST_NAMES = ['Sarah', 'Michael', 'Jane', 'Robert', 'Priya', 'Carlos', 'Emily', 'Wei', 'Fatima', 'David']
+LAST_NAMES = ['Johnson', 'Chen', 'Doe', 'Smith', 'Patel', 'Garcia', 'Brown', 'Nguyen', 'Khan', 'Miller']
+STREETS = ['Park Avenue', 'Commerce St', 'Main Street', 'Oak Lane', 'Harbor Road', 'Elm Drive']
+CITIES = ['Metropolis, NY 10001', 'Springfield, IL 62701', 'Riverside, CA 92501', 'Austin, TX 73301']
+MAKES = ['Toyota', 'BMW', 'Ford', 'Honda', 'Tesla', 'Subaru']
+VIN_CHARS = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+
+# (claim type, asset type, description lines) in the style of txt_files/*.txt
+SCENARIOS = [
+    ('Property Damage', 'Vehicle', ['Tree fell on parked car during storm.',
+                                    'Minor damage to roof and windshield.', 'Photos available.']),
+    ('Collision', 'Vehicle', ['Rear-ended at a traffic light by another driver.',
+                              'Bumper and trunk damaged.', 'Police report filed.']),
+    ('Theft', 'Vehicle', ['Vehicle stolen from parking garage overnight.',
+                          'Security footage shows suspicious activity around 2:15 AM.',
+                          'Vehicle not recovered.']),
+    ('Injury', 'Commercial Property', ['Slip and fall accident in office building lobby.',
+                                       'Employee suffered back injury and requires medical treatment.',
+                                       'Witnesses present.']),
+    ('Collision', 'Vehicle', ['Single vehicle accident on wet road.',
+                              'Driver statement is inconsistent with damage pattern.',
+                              'Claim appears to be staged.']),
+]
+
+# Blank ACORD 2 form text that surrounds the filled-in values
+ACORD_BOILERPLATE = [
+    'AGENCY CUSTOMER ID:',
+    'CARRIER NAIC CODE LINE OF BUSINESS',
+    "INSURED'S MAILING ADDRESS DATE OF BIRTH FEIN (if applicable)",
+    'PRIMARY E-MAIL ADDRESS:',
+    'SECONDARY E-MAIL ADDRESS:',
+    'POLICE OR FIRE DEPARTMENT CONTACTED REPORT NUMBER',
+    "DRIVER'S NAME AND ADDRESS (Check if same as owner)",
+    '1. WAS A STANDARD CHILD PASSENGER RESTRAINT SYSTEM (CHILD SEAT) INSTALLED IN THE VEHICLE? Y / N',
+    'OTHER INSURANCE ON VEHICLE - CARRIER: WHERE CAN VEHICLE BE SEEN?:',
+    'ACORD 2 (2016/10) (c) 1988-2016 ACORD CORPORATION. All rights reserved.',
+]
+
+
+def random_claim(rng: random.Random) -> Dict[str, Any]:
+    """One synthetic claim's field values"""
+    claim_type, asset_type, description = rng.choice(SCENARIOS)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    hour = rng.randint(1, 12)
+    return {
+        'policy_number': f"{rng.choice(['POL', 'INS', 'SML', 'AUT'])}{rng.randint(10 ** 8, 10 ** 9 - 1)}",
+        'policyholder_name': name,
+        'incident_date': f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(2020, 2025)}",
+        'incident_time': f"{hour:02d}:{rng.randint(0, 59):02d} {rng.choice(['AM', 'PM'])}",
+        'location': f"{rng.randint(1, 9999)} {rng.choice(STREETS)}, {rng.choice(CITIES)}",
+        'estimate_amount': rng.choice([rng.randint(500, 24999), rng.randint(25000, 150000)]),
+        'claim_type': claim_type,
+        'asset_type': asset_type,
+        'description': description,
+        'make': rng.choice(MAKES),
+        'vin': ''.join(rng.choice(VIN_CHARS) for _ in range(17)),
+        'contact': f"{name} - (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        # Some claims leave fields blank so validation and routing see gaps
+        'omit': rng.sample(['incident_time', 'location', 'asset_type'], rng.choice([0, 0, 0, 1])),
+    }
+
+
+def render_txt(claim: Dict[str, Any]) -> str:
+    """Claim text in the layout of the sample TXT files"""
+    lines = [
+        f"POLICY NUMBER: {claim['policy_number']}",
+        f"NAME OF INSURED: {claim['policyholder_name']}",
+        f"DATE OF LOSS: {claim['incident_date']}",
+    ]
+    if 'incident_time' not in claim['omit']:
+        lines.append(f"TIME: {claim['incident_time']}")
+    if 'location' not in claim['omit']:
+        lines.append(f"LOCATION: {claim['location']}")
+    lines += [
+        f"ESTIMATE AMOUNT: ${claim['estimate_amount']:,}",
+        f"CLAIM TYPE: {claim['claim_type']}",
+        f"DESCRIPTION: {claim['description'][0]}",
+        *claim['description'][1:],
+    ]
+    if 'asset_type' not in claim['omit']:
+        lines.append(f"ASSET TYPE: {claim['asset_type']}")
+    lines += [
+        f"VEHICLE MAKE: {claim['make']}",
+        f"V.I.N.: {claim['vin']}",
+        f"CONTACT: {claim['contact']}",
+    ]
+    return '\n'.join(lines)
+
+
+def render_acord_pages(claim: Dict[str, Any]) -> List[List[str]]:
+    """Text lines per page of a filled-in ACORD 2 style loss notice"""
+    first = ['AUTOMOBILE LOSS NOTICE', ACORD_BOILERPLATE[0], ACORD_BOILERPLATE[1]]
+    first += render_txt(claim).split('\n')[:-3]
+    first += ACORD_BOILERPLATE[2:7]
+    second = [ACORD_BOILERPLATE[0], 'INSURED VEHICLE',
+              f"MAKE: {claim['make']}", f"V.I.N.: {claim['vin']}", f"CONTACT: {claim['contact']}"]
+    second += ACORD_BOILERPLATE[7:]
+    return [first, second]
+
+
+def _pdf_string(text: str) -> str:
+    """Escape text for a PDF literal string"""
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def render_pdf(pages: List[List[str]]) -> bytes:
+    """Minimal text-only PDF with one Helvetica text block per page"""
+    page_count = len(pages)
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            ' '.join(f'{4 + 2 * i} 0 R' for i in range(page_count)), page_count),
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+    for i, lines in enumerate(pages):
+        body = 'BT /F1 9 Tf 12 TL 40 760 Td\n' + ''.join(
+            f'({_pdf_string(line)}) Tj T*\n' for line in lines) + 'ET'
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>')
+        objects.append(f'<< /Length {len(body.encode("latin-1"))} >>\nstream\n{body}\nendstream')
+    
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{obj}\nendobj\n'.encode('latin-1')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1')
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode('latin-1')
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('latin-1')
+    return bytes(out)
+
+
+def generate_corpus(out_dir: str, count: int, pdf_ratio: float = 0.1,
+                    seed: int = 0) -> Dict[str, List[str]]:
+    """Write count synthetic FNOL documents under out_dir
+    
+    A manifest.json records the parameters; an existing corpus generated with
+    the same parameters is reused instead of being written again.
+    """
+    out = Path(out_dir)
+    manifest_path = out / "manifest.json"
+    params = {'count': count, 'pdf_ratio': pdf_ratio, 'seed': seed}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['params'] == params:
+            return manifest['files']
+    
+    rng = random.Random(seed)
+    files = {'txt': [], 'pdf': []}
+    for i in range(count):
+        claim = random_claim(rng)
+        shard = out / f"{i // SHARD_SIZE:04d}"
+        if i % SHARD_SIZE == 0:
+            shard.mkdir(parents=True, exist_ok=True)
+        
+        if rng.random() < pdf_ratio:
+            path = shard / f"acord_claim_{i:07d}.pdf"
+            path.write_bytes(render_pdf(render_acord_pages(claim)))
+            files['pdf'].append(str(path))
+        else:
+            path = shard / f"fnol_claim_{i:07d}.txt"
+            path.write_text(render_txt(claim), encoding='utf-8')
+            files['txt'].append(str(path))
+    
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'params': params, 'files': files}, f)
+    return files
+
+
+def corpus_paths(files: Dict[str, List[str]], kind: Optional[str] = None) -> List[str]:
+    """All corpus paths, or only those of one kind ('txt' or 'pdf')"""
+    if kind is not None:
+        return list(files[kind])
+    return files['txt'] + files['pdf']
@@ -0,0 +1,73 @@
+# benchmarks/pdf_backends.py - PDF BACKEND SPEED AND ACCURACY COMPARISON
+import argparse
+import json
+import sys
+from typing import Dict, Any, List, Optional
+from pathlib import Path
+
+from src.extractor import DEFAULT_EXTRACTOR
+from src.pdf_backends import PDF_BACKENDS, get_pdf_backend
+
+from .bench import time_calls
+from .corpus import generate_corpus
+
+REFERENCE_BACKEND = 'pdfplumber'
+
+
+def extract_fields(backend, file_path: str) -> Dict[str, Any]:
+    text = "".join(page + "\n" for page in backend.iter_pages(Path(file_path)) if page)
+    return DEFAULT_EXTRACTOR.extract(text).to_dict()
+
+
+def compare_backends(pdf_files: List[str], backends: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Extraction speed of each backend, and how many fields match the pdfplumber output"""
+    backends = backends or list(PDF_BACKENDS)
+    reference = get_pdf_backend(REFERENCE_BACKEND)
+    expected = [extract_fields(reference, file_path) for file_path in pdf_files]
+    total_fields = sum(len(fields) for fields in expected)
+    
+    results = {}
+    for name in backends:
+        backend = get_pdf_backend(name)
+        extracted = []
+        stats = time_calls(lambda file_path: extracted.append(extract_fields(backend, file_path)), pdf_files)
+        matching = sum(1 for want, got in zip(expected, extracted)
+                       for field, value in want.items() if got.get(field) == value)
+        extra = sum(1 for want, got in zip(expected, extracted) for field in got if field not in want)
+        stats['fields'] = {'expected': total_fields, 'matching': matching, 'extra': extra,
+                           'accuracy': round(matching / total_fields, 4) if total_fields else 1.0}
+        stats['identical_docs'] = sum(1 for want, got in zip(expected, extracted) if want == got)
+        results[name] = stats
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare PDF backends on a synthetic corpus")
+    parser.add_argument('--docs', type=int, default=200, help="number of PDFs to generate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus-pdf')
+    parser.add_argument('--extra', nargs='*', default=['data/ACORD-Automobile-Loss-Notice-12.05.16.pdf'],
+                        help="real PDFs to include alongside the synthetic ones")
+    parser.add_argument('--backends', default=','.join(PDF_BACKENDS), help="comma-separated backends")
+    parser.add_argument('--output', help="write the results as JSON")
+    args = parser.parse_args(argv)
+    
+    files = generate_corpus(args.corpus_dir, args.docs, pdf_ratio=1.0, seed=args.seed)
+    pdf_files = files['pdf'] + [path for path in args.extra if Path(path).exists()]
+    backends = [name.strip() for name in args.backends.split(',') if name.strip()]
+    results = compare_backends(pdf_files, backends)
+    
+    print(f"{'backend':<12} {'docs':>6} {'docs/s':>10} {'p50 ms':>9} {'fields ok':>10} {'identical':>10}")
+    for name, stats in results.items():
+        print(f"{name:<12} {stats['count']:>6} {stats['throughput_per_s']:>10} "
+              f"{stats['latency_ms']['p50']:>9} {stats['fields']['accuracy']:>10.2%} "
+              f"{stats['identical_docs']:>10}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
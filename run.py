@@ -1,7 +1,19 @@
 # run.py - Updated for assessment
 import sys
+from contextlib import nullcontext
 from pathlib import Path
+from src.cache import ResultCache
+from src.duplicates import DuplicateIndex
+from src.jobs import BatchJob, JobManifest
+from src.policies import PolicyIndex
+from src.metrics import HistogramSink, JsonLinesSink, Metrics, PrometheusSink
+from src.ocr import OcrStage
+from src.pipeline import ClaimPipeline
 from src.processor import FNOLProcessor
+from src.router import load_rules
+from src.ruleset import RuleSet
+from src.shadow import ShadowReport, replay_cache
+from src.writers import WRITER_FORMATS, JsonLinesWriter, open_writer
 import json
 
 
@@ -69,6 +81,9 @@ def process_demo():
         
         if Path(file_path).exists():
             result = processor.process_document(file_path)
+            # The rules version changes with any rules.json edit, so the
+            # demo results are kept without it
+            result.pop("configVersion", None)
             all_results.append(result)
             
             # Display summary
@@ -90,6 +105,243 @@ def process_demo():
         print(f"\n✅ All results saved to: all_results.json")
 
 
+def process_batch(directory: str, workers: int = None, output_file: str = "batch_results.jsonl",
+                  cache_path: str = None, max_pages: int = None, metrics_path: str = None,
+                  pdf_backend: str = 'auto', duplicates_path: str = None, policies_path: str = None,
+                  pool: str = 'mixed', stage_workers: str = None, queue_size: int = 64,
+                  ocr_workers: int = None, resume: str = None, jobs_path: str = "fnol_jobs.sqlite",
+                  max_attempts: int = 3, shadow_path: str = None):
+    """Process every FNOL document in a directory (or glob) in parallel
+    
+    JSON Lines batches run as resumable jobs: after a crash, ``resume`` with
+    the job id skips documents already finished and retries failed ones.
+    With ``shadow_path`` every claim is also routed by that candidate rule
+    file, and the route changes it would make are reported.
+    """
+    job = None
+    if not directory and not resume:
+        print("Error: batch needs a directory or glob pattern, or --resume <job-id>")
+        return
+    if resume:
+        manifest = JobManifest(jobs_path)
+        if manifest.get_job(resume) is None:
+            print(f"Error: Unknown job - {resume} (in {jobs_path})")
+            return
+        job = BatchJob(manifest, resume)
+        directory, output_file = job.job['source'], job.job['output']
+    elif WRITER_FORMATS.get(Path(output_file).suffix.lower(), 'jsonl') == 'jsonl':
+        manifest = JobManifest(jobs_path)
+        job = BatchJob(manifest, manifest.create_job(directory, output_file, max_attempts))
+    
+    metrics = None
+    if metrics_path:
+        metrics = Metrics([HistogramSink(), JsonLinesSink(metrics_path)])
+    cache = ResultCache(cache_path) if cache_path else None
+    ocr = None
+    if ocr_workers:
+        # Recognised pages are kept in the result cache (or the default one)
+        ocr = OcrStage(workers=ocr_workers, cache=cache or ResultCache())
+    duplicates = DuplicateIndex(duplicates_path) if duplicates_path else None
+    shadow = None
+    if shadow_path:
+        shadow = RuleSet.from_config(load_rules(shadow_path), duplicate_index=duplicates)
+    processor = FNOLProcessor(cache=cache, ocr=ocr,
+                              streaming=max_pages is not None, max_pages=max_pages,
+                              metrics=metrics, pdf_backend=pdf_backend, duplicates=duplicates,
+                              policies=PolicyIndex(policies_path) if policies_path else None,
+                              shadow=shadow)
+    shadow_report = ShadowReport(processor.rules.version, shadow.version) if shadow else None
+    route_counts = {}
+    processed = 0
+    
+    print(f"Batch processing: {directory}")
+    if job is not None:
+        print(f"Job {job.job_id} (resume with: python run.py batch --resume {job.job_id})")
+    print("-" * 50)
+    
+    pipeline = None
+    if pool == 'pipeline':
+        sizes = dict(item.split('=', 1) for item in (stage_workers or '').split(',') if '=' in item)
+        pipeline = ClaimPipeline(processor, parse_workers=int(sizes.get('parse', workers or 4)),
+                                 validate_workers=int(sizes.get('validate', 1)),
+                                 route_workers=int(sizes.get('route', 1)),
+                                 pdf_processes=int(sizes.get('pdf', 0)), queue_size=queue_size)
+        process = pipeline.run
+    else:
+        def process(paths):
+            return processor.process_batch(paths, workers=workers, prefork=pool == 'prefork')
+    
+    # Stream results to a JSON Lines / Parquet / Arrow file as they finish;
+    # a job writes (and checkpoints) them itself
+    with (nullcontext() if job is not None else open_writer(output_file)) as writer:
+        results = job.run(process) if job is not None else process(directory)
+        for result in results:
+            if job is None:
+                writer.write(result)
+            processed += 1
+            
+            route = result['recommendedRoute']
+            route_counts[route] = route_counts.get(route, 0) + 1
+            status = f"ERROR ({result['error']})" if 'error' in result else route
+            if result.get('policyIssues'):
+                status += f" [{'; '.join(result['policyIssues'])}]"
+            if shadow_report is not None:
+                shadow_report.observe(result)
+                if result.get('shadowRoute', route) != route:
+                    status += f" (candidate: {result['shadowRoute']})"
+            print(f"{result['sourceFile']}: {status}")
+    if ocr is not None:
+        ocr.close()
+    
+    print(f"\nProcessed {processed} documents")
+    for route, count in sorted(route_counts.items()):
+        print(f"  {route}: {count}")
+    if job is not None:
+        if job.skipped:
+            print(f"Skipped {job.skipped} documents finished in an earlier run")
+        retrying = manifest.summary(job.job_id).get('retry', 0)
+        if retrying:
+            print(f"{retrying} failed documents will be retried by: python run.py batch --resume {job.job_id}")
+    if shadow_report is not None:
+        print_shadow_report(shadow_report)
+    
+    if pipeline is not None:
+        print("\nPipeline stages:")
+        for name, stats in pipeline.stats().items():
+            print(f"  {name}: {stats['workers']} workers, {stats['throughputPerS']} docs/s, "
+                  f"utilization {stats['utilization']:.0%}, peak queue {stats['peakQueueDepth']}"
+                  f"/{stats['queueCapacity']}")
+    
+    if metrics is not None:
+        print("\nStage timings (ms):")
+        for stage, stats in metrics.sink(HistogramSink).snapshot()['stages'].items():
+            print(f"  {stage}: mean {stats['meanMs']}, p50 {stats['p50Ms']}, p99 {stats['p99Ms']}")
+        metrics.close()
+        print(f"Per-document traces saved to: {metrics_path}")
+    print(f"\n✅ Results saved to: {output_file}")
+
+
+def print_shadow_report(report: ShadowReport):
+    summary = report.to_dict()
+    print(f"\nShadow rules {summary['candidateVersion']} vs live {summary['liveVersion']}: "
+          f"{summary['changed']} of {summary['claims']} claims change route ({summary['changedShare']:.2%})")
+    for transition in summary['transitions']:
+        print(f"  {transition['from']} -> {transition['to']}: {transition['count']}"
+              f"  e.g. {', '.join(transition['sampleClaims'])}")
+
+
+def shadow_replay(candidate_path: str, cache_path: str = "fnol_cache.sqlite", rules_path: str = None,
+                  workers: int = None, parser_version: str = None,
+                  output_file: str = "shadow_report.json"):
+    """Re-route every cached extraction under the live and a candidate rule file"""
+    if not Path(cache_path).exists():
+        print(f"Error: Cache not found - {cache_path}")
+        return
+    live = RuleSet.from_config(load_rules(rules_path))
+    candidate = RuleSet.from_config(load_rules(candidate_path))
+    print(f"Replaying cached extractions in {cache_path}")
+    print("-" * 50)
+    
+    report = replay_cache(ResultCache(cache_path), live, candidate, workers=workers,
+                          parser_version=parser_version)
+    print_shadow_report(report)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Report saved to: {output_file}")
+
+
+def process_bundle(file_path: str, output_file: str = "bundle_results.jsonl", duplicates_path: str = None):
+    """Split a document holding many claims and route each claim"""
+    processor = FNOLProcessor(duplicates=DuplicateIndex(duplicates_path) if duplicates_path else None)
+    route_counts = {}
+    
+    print(f"Splitting bundle: {file_path}")
+    print("-" * 50)
+    
+    with open_writer(output_file) as writer:
+        for result in processor.process_bundle(file_path):
+            writer.write({"sourceFile": file_path, **result})
+            route = result['recommendedRoute']
+            route_counts[route] = route_counts.get(route, 0) + 1
+            policy = result['extractedFields'].get('policy_number', '?')
+            print(f"  claim {result['claimIndex']} ({policy}): {route}")
+    
+    print(f"\nProcessed {sum(route_counts.values())} claims")
+    for route, count in sorted(route_counts.items()):
+        print(f"  {route}: {count}")
+    print(f"\n✅ Results saved to: {output_file}")
+
+
+def watch(directory: str, index_path: str = "fnol_index.sqlite", output_file: str = "watch_results.jsonl",
+          interval: float = 2.0, workers: int = None, duplicates_path: str = None,
+          rules_path: str = None):
+    """Process new or changed files dropped into a directory, until interrupted"""
+    from src.watcher import FolderWatcher, ProcessedIndex
+    
+    with JsonLinesWriter(output_file, append=True) as writer:
+        def on_result(result):
+            writer.write(result)
+            writer.flush()
+            status = f"ERROR ({result['error']})" if 'error' in result else result['recommendedRoute']
+            print(f"{result['sourceFile']}: {status}")
+        
+        processor = FNOLProcessor(
+            duplicates=DuplicateIndex(duplicates_path) if duplicates_path else None,
+            rules_path=rules_path)
+        rules_watcher = processor.watch_rules()
+        watcher = FolderWatcher(directory, processor, ProcessedIndex(index_path),
+                                on_result=on_result, interval=interval, workers=workers)
+        print(f"Watching {watcher.directory} ({watcher.mode}), {len(watcher.index)} files already processed")
+        print(f"Rules {processor.rules.version} from {processor.rules_path} (reloaded on change)")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            rules_watcher.stop()
+            watcher.close()
+    print(f"\n✅ Results appended to: {output_file}")
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, workers: int = 4, queue_size: int = 16,
+          slow_trace: float = None, rules_path: str = None):
+    """Run the HTTP intake service with one warm processor"""
+    from src.service import ClaimService, create_server
+    
+    metrics = Metrics([PrometheusSink()], slow_threshold=slow_trace)
+    processor = FNOLProcessor(metrics=metrics, rules_path=rules_path).warmup()
+    rules_watcher = processor.watch_rules()
+    service = ClaimService(processor, workers=workers, queue_size=queue_size)
+    server = create_server(host, port, service)
+    print(f"FNOL service listening on http://{host}:{server.server_port}")
+    print(f"  Rules {processor.rules.version} from {processor.rules_path} (reloaded on change)")
+    print("  POST /process  - JSON {\"path\": ...}, multipart upload or raw body (?filename=)")
+    print("  POST /batch    - JSON {\"paths\": [...]} or multipart uploads")
+    print("  GET  /metrics  - Prometheus metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        rules_watcher.stop()
+
+
+def _parse_options(args):
+    """Split command-line arguments into positionals and --option values"""
+    positionals, options = [], {}
+    i = 0
+    while i < len(args):
+        if args[i].startswith('--') and i + 1 < len(args):
+            options[args[i][2:]] = args[i + 1]
+            i += 2
+        else:
+            positionals.append(args[i])
+            i += 1
+    return positionals, options
+
+
 def show_help():
     """Show help message"""
     print("FNOL Processing Agent - Assessment Solution")
@@ -97,11 +349,37 @@ def show_help():
     print("\nCommands:")
     print("  python run.py demo              - Process all demo files")
     print("  python run.py process <file>    - Process a single file")
+    print("  python run.py batch <dir>       - Process a directory in parallel")
+    print("      [--workers N] [--output batch_results.jsonl|.parquet|.arrow] [--cache fnol_cache.sqlite]")
+    print("      [--max-pages N]  (stream PDF pages, stop once mandatory fields are found)")
+    print("      [--metrics traces.jsonl]  (per-stage timings for every document)")
+    print("      [--pdf-backend auto|pdfplumber|pypdf2]  (PDF text extractor, default auto)")
+    print("  python run.py batch --resume <job-id>  - Continue an interrupted batch where it stopped")
+    print("      [--jobs fnol_jobs.sqlite] [--max-attempts 3]  (job manifest, retries per document)")
+    print("      [--ocr N]  (OCR scanned PDF pages with tesseract, N pages in parallel)")
+    print("      [--pool mixed|prefork|pipeline]  (prefork: warm up, then fork workers for every document)")
+    print("      [--stage-workers parse=8,validate=1,route=1,pdf=4] [--queue-size 64]  (pipeline sizing)")
+    print("      [--duplicates fnol_duplicates.sqlite]  (flag duplicates of earlier claims)")
+    print("      [--policies policies.csv|.sqlite]  (report unknown or inactive policies)")
+    print("      [--shadow candidate_rules.json]  (also route by candidate rules, report route changes)")
+    print("  python run.py shadow <candidate_rules.json>  - Replay cached extractions under candidate rules")
+    print("      [--cache fnol_cache.sqlite] [--rules src/config/rules.json] [--workers N]")
+    print("      [--parser-version V] [--output shadow_report.json]")
+    print("  python run.py bundle <file>     - Split a multi-claim TXT/PDF export and route every claim")
+    print("      [--output bundle_results.jsonl] [--duplicates fnol_duplicates.sqlite]")
+    print("  python run.py watch <dir>       - Process new or changed files as they arrive")
+    print("      [--index fnol_index.sqlite] [--output watch_results.jsonl] [--interval 2] [--workers N]")
+    print("      [--duplicates fnol_duplicates.sqlite] [--rules src/config/rules.json]  (reloaded on change)")
+    print("  python run.py serve             - Run the HTTP intake service")
+    print("      [--host 127.0.0.1] [--port 8000] [--workers 4] [--queue 16]")
+    print("      [--rules src/config/rules.json]  (validation and routing rules, reloaded on change)")
+    print("      [--slow-trace SECONDS]  (attach stage timings to slow results)")
     print("  python run.py help              - Show this help")
     print("\nExamples:")
     print("  python run.py demo")
     print("  python run.py process data/ACORD-Automobile-Loss-Notice-12.05.16.pdf")
     print("  python run.py process txt_files/fnol_injury_claim.txt")
+    print("  python run.py batch txt_files --workers 4")
 
 
 if __name__ == "__main__":
@@ -111,6 +389,47 @@ if __name__ == "__main__":
         process_demo()
     elif sys.argv[1] == "process" and len(sys.argv) > 2:
         process_single_file(sys.argv[2])
+    elif sys.argv[1] == "batch" and len(sys.argv) > 2:
+        args, options = _parse_options(sys.argv[2:])
+        workers = int(options['workers']) if 'workers' in options else None
+        max_pages = int(options['max-pages']) if 'max-pages' in options else None
+        process_batch(args[0] if args else None, workers=workers,
+                      resume=options.get('resume'), jobs_path=options.get('jobs', "fnol_jobs.sqlite"),
+                      max_attempts=int(options.get('max-attempts', 3)),
+                      output_file=options.get('output', "batch_results.jsonl"),
+                      cache_path=options.get('cache'), max_pages=max_pages,
+                      metrics_path=options.get('metrics'),
+                      pdf_backend=options.get('pdf-backend', 'auto'),
+                      duplicates_path=options.get('duplicates'),
+                      policies_path=options.get('policies'),
+                      pool=options.get('pool', 'mixed'), stage_workers=options.get('stage-workers'),
+                      queue_size=int(options.get('queue-size', 64)),
+                      ocr_workers=int(options['ocr']) if 'ocr' in options else None,
+                      shadow_path=options.get('shadow'))
+    elif sys.argv[1] == "shadow" and len(sys.argv) > 2:
+        args, options = _parse_options(sys.argv[2:])
+        shadow_replay(args[0], cache_path=options.get('cache', "fnol_cache.sqlite"),
+                      rules_path=options.get('rules'),
+                      workers=int(options['workers']) if 'workers' in options else None,
+                      parser_version=options.get('parser-version'),
+                      output_file=options.get('output', "shadow_report.json"))
+    elif sys.argv[1] == "bundle" and len(sys.argv) > 2:
+        args, options = _parse_options(sys.argv[2:])
+        process_bundle(args[0], output_file=options.get('output', "bundle_results.jsonl"),
+                       duplicates_path=options.get('duplicates'))
+    elif sys.argv[1] == "watch" and len(sys.argv) > 2:
+        args, options = _parse_options(sys.argv[2:])
+        watch(args[0], index_path=options.get('index', "fnol_index.sqlite"),
+              output_file=options.get('output', "watch_results.jsonl"),
+              interval=float(options.get('interval', 2.0)),
+              workers=int(options['workers']) if 'workers' in options else None,
+              duplicates_path=options.get('duplicates'), rules_path=options.get('rules'))
+    elif sys.argv[1] == "serve":
+        _, options = _parse_options(sys.argv[2:])
+        serve(host=options.get('host', "127.0.0.1"), port=int(options.get('port', 8000)),
+              workers=int(options.get('workers', 4)), queue_size=int(options.get('queue', 16)),
+              slow_trace=float(options['slow-trace']) if 'slow-trace' in options else None,
+              rules_path=options.get('rules'))
     elif sys.argv[1] == "help":
         show_help()
     else:
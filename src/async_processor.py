@@ -0,0 +1,125 @@
+# src/async_processor.py - ASYNCIO FRONT END FOR THE FNOL PIPELINE
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterable, AsyncIterator, Iterable, Optional, Union
+from pathlib import Path
+
+from .processor import FNOLProcessor, _process_in_worker, error_result, expand_paths
+
+
+async def _aiter_paths(paths) -> AsyncIterator[str]:
+    """Iterate paths from an async iterable (e.g. a queue consumer) or a plain one"""
+    if hasattr(paths, '__aiter__'):
+        async for file_path in paths:
+            yield str(file_path)
+    else:
+        for file_path in expand_paths(paths):
+            yield file_path
+
+
+class AsyncFNOLProcessor:
+    """Run an FNOLProcessor from asyncio code without blocking the event loop
+    
+    TXT documents are read and processed in a thread pool, PDFs in a process
+    pool (pdfplumber is CPU-bound); both pools are shared by every call. At
+    most ``concurrency`` documents are processed at once. Cancelling a call
+    cancels its document if it has not started yet; a document already
+    running finishes in the background (still holding its slot) and its
+    result is dropped.
+    """
+    
+    def __init__(self, processor: Optional[FNOLProcessor] = None, concurrency: int = 8,
+                 pdf_workers: Optional[int] = None):
+        self.processor = processor or FNOLProcessor()
+        self.concurrency = concurrency
+        self.pdf_workers = pdf_workers or os.cpu_count() or 1
+        self._txt_pool = None
+        self._pdf_pool = None
+        # Created on first use, inside the running event loop
+        self._semaphore = None
+    
+    async def __aenter__(self) -> 'AsyncFNOLProcessor':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    def _get_txt_pool(self) -> ThreadPoolExecutor:
+        if self._txt_pool is None:
+            self._txt_pool = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                thread_name_prefix="fnol-async")
+        return self._txt_pool
+    
+    def _get_pdf_pool(self) -> ProcessPoolExecutor:
+        if self._pdf_pool is None:
+            self._pdf_pool = self.processor._start_process_pool(self.pdf_workers)
+        return self._pdf_pool
+    
+    async def _run(self, executor: Executor, fn, *args):
+        """Await fn in executor; if cancelled, wait until fn has stopped"""
+        future = executor.submit(fn, *args)
+        waiter = asyncio.wrap_future(future)
+        try:
+            return await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # Work that already started cannot be interrupted; keep the
+            # concurrency slot until it is done
+            if not future.cancel():
+                await asyncio.gather(waiter, return_exceptions=True)
+            raise
+    
+    async def process_document(self, file_path: str) -> Dict[str, Any]:
+        """Process a single FNOL document"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async with self._semaphore:
+            if Path(file_path).suffix.lower() != '.pdf':
+                return await self._run(self._get_txt_pool(), self.processor.process_document, file_path)
+            
+            result, trace = await self._run(self._get_pdf_pool(), _process_in_worker, str(file_path))
+            if trace is not None:
+                self.processor.metrics.observe(trace, result)
+            return result
+    
+    async def _process_tagged(self, file_path: str) -> Dict[str, Any]:
+        """Process one batch document, turning failures into error results"""
+        try:
+            result = await self.process_document(file_path)
+        except Exception as e:
+            return error_result(file_path, e)
+        return {"sourceFile": file_path, **result}
+    
+    async def process_batch(self, paths: Union[str, os.PathLike, Iterable[str], AsyncIterable[str]],
+                            window: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Process many documents concurrently, yielding results in input order
+        
+        paths may be a directory, glob, iterable or async iterable of paths.
+        At most ``window`` documents (default ``concurrency * 2``) are
+        scheduled ahead of the one being yielded. Closing the generator or
+        cancelling its consumer cancels everything still pending.
+        """
+        window = window or self.concurrency * 2
+        pending = deque()
+        try:
+            async for file_path in _aiter_paths(paths):
+                pending.append(asyncio.ensure_future(self._process_tagged(file_path)))
+                if len(pending) >= window:
+                    yield await pending.popleft()
+            
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def close(self):
+        """Shut down the shared worker pools"""
+        pools = [pool for pool in (self._txt_pool, self._pdf_pool) if pool is not None]
+        self._txt_pool = self._pdf_pool = None
+        for pool in pools:
+            await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
@@ -0,0 +1,151 @@
+# src/cache.py - CONTENT-ADDRESSED RESULT CACHE
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterator, Optional, Tuple
+from pathlib import Path
+
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """On-disk SQLite cache of extracted fields and processing results
+    
+    Entries are keyed by document content hash plus the parser version
+    (extractions) or the parser version and rules fingerprint (results), so a
+    rules change re-routes claims from cached extractions without re-parsing.
+    The cache is bounded by the total size of stored values and evicts the
+    least recently used entries first.
+    """
+    
+    EXTRACTION = 'extraction'
+    RESULT = 'result'
+    OCR = 'ocr'
+    
+    def __init__(self, path: str = "fnol_cache.sqlite", max_bytes: int = 256 * 1024 * 1024):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+    
+    def __getstate__(self):
+        # Connections cannot cross process boundaries; workers reopen lazily
+        return {'path': self.path, 'max_bytes': self.max_bytes}
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database on first use"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (kind, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+            self._total_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            self._conn = conn
+        return self._conn
+    
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """Look up an entry and mark it as recently used"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE entries SET last_access = ? WHERE kind = ? AND key = ?",
+                (time.time(), kind, key))
+            conn.commit()
+        return json.loads(row[0])
+    
+    def put(self, kind: str, key: str, value: Dict[str, Any]):
+        """Store an entry, evicting least recently used entries if over budget"""
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT size FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, value, size, last_access)"
+                " VALUES (?, ?, ?, ?, ?)", (kind, key, data, size, time.time()))
+            self._total_bytes += size - (row[0] if row else 0)
+            if self._total_bytes > self.max_bytes:
+                # Other processes may share the file, so recount before evicting
+                self._total_bytes = conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if self._total_bytes > self.max_bytes:
+                    self._evict(conn)
+            conn.commit()
+    
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until usage is back under 90% of the budget"""
+        target = self.max_bytes * 0.9
+        cursor = conn.execute(
+            "SELECT kind, key, size FROM entries ORDER BY last_access")
+        evicted = []
+        for kind, key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            evicted.append((kind, key))
+            self._total_bytes -= size
+        conn.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", evicted)
+    
+    def rowid_bounds(self, kind: str) -> Optional[Tuple[int, int]]:
+        """Lowest and highest rowid of one kind of entry, None if there are none"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MIN(rowid), MAX(rowid) FROM entries WHERE kind = ?", (kind,)).fetchone()
+        return None if row[0] is None else (row[0], row[1])
+    
+    def iter_entries(self, kind: str, first: int, last: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(key, value) of the entries of one kind in a rowid span, for bulk scans
+        
+        Unlike get, this leaves the entries' last use alone, so a scan does
+        not reorder eviction.
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT key, value FROM entries WHERE kind = ? AND rowid BETWEEN ? AND ?",
+                (kind, first, last)).fetchall()
+        for key, value in rows:
+            yield key, json.loads(value)
+    
+    def clear(self, kind: Optional[str] = None):
+        """Remove all entries, or only those of one kind"""
+        with self._lock:
+            conn = self._connect()
+            if kind is None:
+                conn.execute("DELETE FROM entries")
+            else:
+                conn.execute("DELETE FROM entries WHERE kind = ?", (kind,))
+            conn.commit()
+            self._total_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
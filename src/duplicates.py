@@ -0,0 +1,177 @@
+# src/duplicates.py - DUPLICATE AND NEAR-DUPLICATE CLAIM INDEX
+import hashlib
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from pathlib import Path
+
+_WORDS = re.compile(r'[a-z0-9]+')
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def exact_key(extracted_data: Dict[str, Any]) -> Optional[str]:
+    """Normalised (policy_number, vin, incident_date) key; None without policy and date"""
+    policy = str(extracted_data.get('policy_number') or '').strip().upper()
+    date = str(extracted_data.get('incident_date') or '').strip()
+    if not policy or not date:
+        return None
+    vin = str(extracted_data.get('vin') or '').strip().upper()
+    return hashlib.sha1(f"{policy}|{vin}|{date}".encode('utf-8')).hexdigest()
+
+
+class DuplicateIndex:
+    """Persistent SQLite index of past claims for duplicate detection
+    
+    Claims are matched on an exact key, (policy_number, vin, incident_date),
+    and on a MinHash signature of their description's word shingles. The
+    signatures are split into LSH bands, so a lookup reads only the few
+    claims that share a band with the new one, however large the index is.
+    Claims are added one at a time as they are routed; adding a source again
+    replaces its earlier entry.
+    """
+    
+    def __init__(self, path: str = "fnol_duplicates.sqlite", num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = str(path)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._signature_format = struct.Struct(f'<{num_perm}Q')
+        self._lock = threading.Lock()
+        self._conn = None
+    
+    def __getstate__(self):
+        # Connections cannot cross process boundaries; workers reopen lazily
+        return {'path': self.path, 'num_perm': self.num_perm, 'bands': self.bands,
+                'shingle_size': self.shingle_size, 'seed': self.seed}
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the index database on first use"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS claims ("
+                " id INTEGER PRIMARY KEY, source TEXT NOT NULL, claim_key TEXT,"
+                " signature BLOB, added_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS claims_key ON claims (claim_key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS claims_source ON claims (source)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS lsh ("
+                " bucket INTEGER NOT NULL, claim_id INTEGER NOT NULL,"
+                " PRIMARY KEY (bucket, claim_id)) WITHOUT ROWID"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    def signature(self, description: Any) -> Optional[Tuple[int, ...]]:
+        """MinHash signature of a description's word shingles (None if it has no words)"""
+        words = _WORDS.findall(str(description or '').lower())
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        hashes = {_hash64(' '.join(words[i:i + size]).encode('utf-8'))
+                  for i in range(len(words) - size + 1)}
+        return tuple(min(h ^ mask for h in hashes) for mask in self._masks)
+    
+    def _buckets(self, signature: Tuple[int, ...]) -> List[int]:
+        """One LSH bucket id per band (band number included, signed for SQLite)"""
+        rows = self.rows
+        return [int.from_bytes(hashlib.blake2b(
+                    struct.pack(f'<H{rows}Q', band, *signature[band * rows:(band + 1) * rows]),
+                    digest_size=8).digest(), 'little', signed=True)
+                for band in range(self.bands)]
+    
+    def find(self, extracted_data: Dict[str, Any], exclude_source: Optional[str] = None,
+             threshold: float = 0.7, max_candidates: int = 100) -> Optional[Dict[str, Any]]:
+        """Best earlier claim this one duplicates, or None
+        
+        Returns {"kind": "exact" | "near", "source": ..., "similarity": ...}.
+        Near matches need an estimated description similarity (Jaccard over
+        word shingles) of at least threshold; at most max_candidates claims
+        sharing an LSH band are compared.
+        """
+        key = exact_key(extracted_data)
+        signature = self.signature(extracted_data.get('description'))
+        with self._lock:
+            conn = self._connect()
+            if key is not None:
+                row = conn.execute(
+                    "SELECT source FROM claims WHERE claim_key = ? AND source IS NOT ? LIMIT 1",
+                    (key, exclude_source)).fetchone()
+                if row:
+                    return {"kind": "exact", "source": row[0], "similarity": 1.0}
+            if signature is None:
+                return None
+            
+            buckets = self._buckets(signature)
+            candidates = conn.execute(
+                "SELECT source, signature FROM claims WHERE id IN ("
+                f" SELECT claim_id FROM lsh WHERE bucket IN ({','.join('?' * len(buckets))}))"
+                " AND source IS NOT ? LIMIT ?", (*buckets, exclude_source, max_candidates)).fetchall()
+        
+        best = None
+        for source, blob in candidates:
+            other = self._signature_format.unpack(blob)
+            similarity = sum(a == b for a, b in zip(signature, other)) / self.num_perm
+            if similarity >= threshold and (best is None or similarity > best['similarity']):
+                best = {"kind": "near", "source": source, "similarity": similarity}
+        return best
+    
+    def add(self, extracted_data: Dict[str, Any], source: str):
+        """Index a routed claim under its source (e.g. the document path)"""
+        key = exact_key(extracted_data)
+        signature = self.signature(extracted_data.get('description'))
+        if key is None and signature is None:
+            return
+        blob = self._signature_format.pack(*signature) if signature is not None else None
+        with self._lock:
+            conn = self._connect()
+            self._remove(conn, source)
+            claim_id = conn.execute(
+                "INSERT INTO claims (source, claim_key, signature, added_at) VALUES (?, ?, ?, ?)",
+                (source, key, blob, time.time())).lastrowid
+            if signature is not None:
+                conn.executemany("INSERT OR IGNORE INTO lsh (bucket, claim_id) VALUES (?, ?)",
+                                 [(bucket, claim_id) for bucket in self._buckets(signature)])
+            conn.commit()
+    
+    def _remove(self, conn: sqlite3.Connection, source: str):
+        for claim_id, blob in conn.execute(
+                "SELECT id, signature FROM claims WHERE source = ?", (source,)).fetchall():
+            if blob is not None:
+                buckets = self._buckets(self._signature_format.unpack(blob))
+                conn.executemany("DELETE FROM lsh WHERE bucket = ? AND claim_id = ?",
+                                 [(bucket, claim_id) for bucket in buckets])
+            conn.execute("DELETE FROM claims WHERE id = ?", (claim_id,))
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,226 @@
+# src/extractor.py - PRECOMPILED SINGLE-PASS FIELD EXTRACTION
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from .record import ClaimRecord
+
+
+# (field, labels, value pattern) in extraction priority order. The full field
+# pattern is label + value. Labels are upper-case literals starting with
+# distinct words, so at most one field label can begin at any position.
+FIELD_SPECS = [
+    ('policy_number', ['POLICY'], r'\s*(?:NO\.?|NUMBER|#)\s*:?\s*([A-Z0-9-]+)'),
+    ('policyholder_name', ['NAME'], r'\s*(?:OF\s*)?INSURED\s*:?\s*(.+?)(?=\n|$)'),
+    ('incident_date', ['DATE'], r'\s*(?:OF\s*)?LOSS\s*:?\s*(\d{1,2}/\d{1,2}/\d{4})'),
+    ('incident_time', ['TIME'], r'\s*:?\s*(\d{1,2}:\d{2}\s*[APMapm]{2})'),
+    ('location', ['LOCATION'], r'\s*:?\s*(.+?)(?=\n|$)'),
+    ('estimate_amount', ['ESTIMATE'], r'\s*AMOUNT\s*:?\s*\$?\s*([\d,]+)'),
+    ('claim_type', ['CLAIM'], r'\s*TYPE\s*:?\s*(.+?)(?=\n|$)'),
+    ('asset_type', ['ASSET'], r'\s*TYPE\s*:?\s*(.+?)(?=\n|$)'),
+    ('vin', ['V.I.N', 'V.IN', 'VI.N', 'VIN'], r'\.?\s*:?\s*([A-HJ-NPR-Z0-9]{17})'),
+    ('description', ['DESCRIPTION'], r'\s*:?\s*(.+?)(?=\n[A-Z]|$)'),
+]
+
+# Line-by-line fallback rules: the first rule whose keywords all appear in the
+# upper-cased key of a "KEY: value" line fills its field if still missing
+LINE_RULES = [
+    ('policy_number', ('POLICY', 'NUMBER')),
+    ('policyholder_name', ('NAME', 'INSURED')),
+    ('incident_date', ('DATE', 'LOSS')),
+    ('incident_time', ('TIME',)),
+    ('location', ('LOCATION',)),
+    ('estimate_amount', ('ESTIMATE', 'AMOUNT')),
+    ('claim_type', ('CLAIM', 'TYPE')),
+    ('asset_type', ('ASSET', 'TYPE')),
+    ('description', ('DESCRIPTION',)),
+]
+
+# Labels that end a description captured by the regex pass
+DESCRIPTION_STOP_LABELS = ['VEHICLE MAKE:', 'V.I.N.:', 'CONTACT:', 'ASSET TYPE:']
+
+
+# Characters that re.IGNORECASE treats as equal to an upper-case ASCII letter
+_UPPER_ASCII = str.maketrans({
+    **{chr(c): chr(c - 32) for c in range(ord('a'), ord('z') + 1)},
+    '\u0130': 'I', '\u0131': 'I', '\u017f': 'S', '\u212a': 'K',
+})
+
+
+def clean_description(description: str) -> str:
+    """Clean description text"""
+    # Remove any field labels that might have been included
+    for label in DESCRIPTION_STOP_LABELS:
+        if label in description:
+            description = description.split(label)[0].strip()
+    
+    # Remove trailing INVESTIGATION NEEDED if it's a separate line
+    if 'INVESTIGATION NEEDED' in description:
+        description = description.replace('INVESTIGATION NEEDED', '').strip()
+    
+    return description
+
+
+class FieldExtractor:
+    """Extract FNOL fields from text with precompiled, label-anchored patterns
+    
+    The text is upper-cased once into a same-length copy. Field labels are
+    located in that copy with literal searches (much cheaper than running a
+    case-insensitive regex over the whole text), and the compiled field
+    pattern is only tried where its label starts. This gives the same
+    leftmost matches as searching each field pattern separately. The
+    line-by-line fallback likewise only visits lines whose key can still
+    fill a missing field.
+    """
+    
+    def __init__(self, specs: List[Tuple[str, List[str], str]] = None,
+                 line_rules: List[Tuple[str, Tuple[str, ...]]] = None):
+        specs = specs or FIELD_SPECS
+        self.fields = [field for field, _, _ in specs]
+        self.line_rules = line_rules or LINE_RULES
+        self.line_fields = {field for field, _ in self.line_rules}
+        self.output_fields = set(self.fields) | self.line_fields | {'estimated_damage'}
+        
+        flags = re.IGNORECASE | re.DOTALL
+        self.labels = {}
+        self.field_patterns = {}
+        for field, labels, value in specs:
+            label_pattern = '|'.join(re.escape(label) for label in labels)
+            self.labels[field] = labels
+            self.field_patterns[field] = re.compile(f'(?:{label_pattern}){value}', flags)
+    
+    def extract(self, text: str) -> ClaimRecord:
+        """Extract fields from text content"""
+        folded, keys_aligned = self._fold_case(text)
+        
+        extracted = ClaimRecord()
+        for field in self.fields:
+            match = self._first_match(field, text, folded)
+            if match is None:
+                continue
+            value = match.group(1).strip()
+            if field == 'estimate_amount':
+                value = value.replace('$', '').replace(',', '')
+                extracted['estimate_amount'] = value
+                extracted['estimated_damage'] = value
+            elif field == 'description':
+                extracted[field] = clean_description(value)
+            else:
+                extracted[field] = value
+        
+        if not self.line_fields.issubset(extracted):
+            self._extract_lines(text, folded if keys_aligned else None, extracted)
+        
+        return extracted
+    
+    def _first_match(self, field: str, text: str, folded: str):
+        """Leftmost match of a field pattern, tried only where a label starts"""
+        pattern = self.field_patterns[field]
+        first = None
+        for label in self.labels[field]:
+            pos = folded.find(label)
+            while pos != -1 and (first is None or pos < first.start()):
+                match = pattern.match(text, pos)
+                if match:
+                    first = match
+                    break
+                pos = folded.find(label, pos + 1)
+        return first
+    
+    def _fold_case(self, text: str) -> Tuple[str, bool]:
+        """Same-length upper-case copy of text, so positions index into both
+        
+        The flag tells whether slices of the copy equal str.upper() of the
+        same slice of text, which the line fallback relies on.
+        """
+        if text.isascii():
+            return text.upper(), True
+        folded = text.upper()
+        if len(folded) != len(text):
+            return text.translate(_UPPER_ASCII), False
+        if '\u0130' in text or '\u212a' in text:
+            return text.translate(_UPPER_ASCII), True
+        return folded, True
+    
+    def _candidate_lines(self, text: str, folded: str, rules) -> List[int]:
+        """Start offsets of lines whose key may satisfy one of the rules"""
+        if folded is None:
+            # upper() changes the length of some characters; visit every line
+            starts = [0]
+            pos = text.find('\n')
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = text.find('\n', pos + 1)
+            return starts
+        
+        starts = set()
+        for keyword in {keywords[0] for _, keywords in rules}:
+            pos = folded.find(keyword)
+            while pos != -1:
+                line_start = folded.rfind('\n', 0, pos) + 1
+                colon = folded.find(':', line_start)
+                newline = folded.find('\n', line_start)
+                # The keyword must sit in the key part, before the line's first colon
+                if colon != -1 and (newline == -1 or colon < newline) and pos + len(keyword) <= colon:
+                    starts.add(line_start)
+                pos = folded.find(keyword, pos + 1)
+        return sorted(starts)
+    
+    def _extract_lines(self, text: str, folded: Optional[str], extracted: Dict[str, Any]):
+        """Line-by-line extraction for fields the label scan missed"""
+        rules = [rule for rule in self.line_rules if rule[0] not in extracted]
+        resume_at = 0
+        
+        for line_start in self._candidate_lines(text, folded, rules):
+            if line_start < resume_at:
+                continue
+            line_end = text.find('\n', line_start)
+            if line_end == -1:
+                line_end = len(text)
+            line = text[line_start:line_end].strip()
+            if ':' not in line:
+                continue
+            
+            key, value = line.split(':', 1)
+            key = key.strip().upper()
+            
+            for index, (field, keywords) in enumerate(rules):
+                if keywords[0] not in key or not all(k in key for k in keywords[1:]):
+                    continue
+                value = value.strip()
+                if field == 'estimate_amount':
+                    cleaned = value.replace('$', '').replace(',', '')
+                    extracted['estimate_amount'] = cleaned
+                    extracted['estimated_damage'] = cleaned
+                elif field in ('claim_type', 'asset_type'):
+                    words = value.split()
+                    extracted[field] = words[0] if words else value  # Take first word
+                elif field == 'description':
+                    extracted['description'], resume_at = self._collect_description(
+                        text, value, line_end)
+                else:
+                    extracted[field] = value
+                del rules[index]
+                break
+            
+            if not rules:
+                return
+    
+    def _collect_description(self, text: str, first_line: str, pos: int) -> Tuple[str, int]:
+        """Join a multi-line description up to the next "KEY:" line"""
+        lines = [first_line]
+        while pos < len(text):
+            line_start = pos + 1
+            line_end = text.find('\n', line_start)
+            if line_end == -1:
+                line_end = len(text)
+            line = text[line_start:line_end].strip()
+            if ':' in line:
+                return ' '.join(lines), line_start
+            if line:
+                lines.append(line)
+            pos = line_end
+        return ' '.join(lines), len(text)
+
+
+# Compiled once per process and shared by every DocumentParser
+DEFAULT_EXTRACTOR = FieldExtractor()
@@ -0,0 +1,210 @@
+# src/jobs.py - RESUMABLE BATCH JOBS WITH A CHECKPOINT MANIFEST
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from pathlib import Path
+
+from .processor import expand_paths
+from .writers import JsonLinesWriter
+
+# Document states: finished (result written), failed for good (error result
+# written), or failed with attempts left (nothing written, retried on resume)
+DONE = 'done'
+FAILED = 'failed'
+RETRY = 'retry'
+
+
+class JobManifest:
+    """Durable SQLite record of batch jobs and the state of each document
+    
+    For every document it keeps the status, the number of attempts and the
+    byte offset and size of its result line in the job's JSON Lines output.
+    """
+    
+    def __init__(self, path: str = "fnol_jobs.sqlite"):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = None
+    
+    def __getstate__(self):
+        # Connections cannot cross process boundaries; workers reopen lazily
+        return {'path': self.path}
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the manifest database on first use"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, source TEXT NOT NULL, output TEXT NOT NULL,"
+                " max_attempts INTEGER NOT NULL, created_at REAL NOT NULL, finished_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " job_id TEXT NOT NULL, path TEXT NOT NULL, status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL, result_offset INTEGER, result_size INTEGER,"
+                " error TEXT, updated_at REAL NOT NULL,"
+                " PRIMARY KEY (job_id, path)) WITHOUT ROWID"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    def create_job(self, source: str, output: str, max_attempts: int = 3) -> str:
+        """Register a new job and return its id"""
+        job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO jobs (job_id, source, output, max_attempts, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, str(source), str(output), max_attempts, time.time()))
+            conn.commit()
+        return job_id
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT source, output, max_attempts, created_at, finished_at FROM jobs WHERE job_id = ?",
+                (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {'job_id': job_id, 'source': row[0], 'output': row[1], 'max_attempts': row[2],
+                'created_at': row[3], 'finished_at': row[4]}
+    
+    def document_states(self, job_id: str) -> Dict[str, Tuple[str, int]]:
+        """(status, attempts) of every document the job has seen"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT path, status, attempts FROM documents WHERE job_id = ?", (job_id,)).fetchall()
+        return {path: (status, attempts) for path, status, attempts in rows}
+    
+    def output_end(self, job_id: str) -> int:
+        """Byte offset just past the last checkpointed result"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MAX(result_offset + result_size) FROM documents WHERE job_id = ?",
+                (job_id,)).fetchone()
+        return row[0] or 0
+    
+    def checkpoint(self, job_id: str, entries: Iterable[Tuple[str, str, int, Optional[int], Optional[int], Optional[str]]]):
+        """Store (path, status, attempts, offset, size, error) entries in one transaction"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO documents"
+                " (job_id, path, status, attempts, result_offset, result_size, error, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(job_id, *entry, now) for entry in entries])
+            conn.commit()
+    
+    def finish_job(self, job_id: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE jobs SET finished_at = ? WHERE job_id = ?", (time.time(), job_id))
+            conn.commit()
+    
+    def summary(self, job_id: str) -> Dict[str, int]:
+        """Number of documents per status"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT status, COUNT(*) FROM documents WHERE job_id = ? GROUP BY status",
+                (job_id,)).fetchall()
+        return dict(rows)
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class BatchJob:
+    """Run (or resume) one job, appending results to its JSON Lines output
+    
+    Documents finished in an earlier run are skipped, and failed ones are
+    retried until ``max_attempts`` is reached; then their error result is
+    written. Checkpoints are written every ``checkpoint_every`` results or
+    ``checkpoint_interval`` seconds, whichever comes first, after making
+    the output durable. On resume the output is cut back to the last
+    checkpointed result, so results written after it are not duplicated.
+    """
+    
+    def __init__(self, manifest: JobManifest, job_id: str, checkpoint_every: int = 500,
+                 checkpoint_interval: float = 2.0):
+        self.manifest = manifest
+        self.job_id = job_id
+        self.job = manifest.get_job(job_id)
+        if self.job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.skipped = 0
+    
+    def pending(self, states: Dict[str, Tuple[str, int]]) -> Iterator[str]:
+        """Input documents without a final status"""
+        for file_path in expand_paths(self.job['source']):
+            status = states.get(file_path, (None, 0))[0]
+            if status in (DONE, FAILED):
+                self.skipped += 1
+                continue
+            yield file_path
+    
+    def _truncate_output(self):
+        output = self.job['output']
+        end = self.manifest.output_end(self.job_id)
+        size = os.path.getsize(output) if os.path.exists(output) else 0
+        if size < end:
+            raise RuntimeError(f"Output {output} is shorter than job {self.job_id} checkpointed "
+                               f"({size} < {end} bytes)")
+        if size > end:
+            # Results written after the last checkpoint are produced again
+            with open(output, 'r+b') as f:
+                f.truncate(end)
+    
+    def run(self, process: Callable[[Iterable[str]], Iterable[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """Process the job's pending documents with process(paths), yielding each result"""
+        states = self.manifest.document_states(self.job_id)
+        max_attempts = self.job['max_attempts']
+        self._truncate_output()
+        entries: List[Tuple[str, str, int, Optional[int], Optional[int], Optional[str]]] = []
+        last_checkpoint = time.monotonic()
+        
+        with JsonLinesWriter(self.job['output'], append=True, track_offsets=True) as writer:
+            def checkpoint():
+                writer.sync()
+                self.manifest.checkpoint(self.job_id, entries)
+                entries.clear()
+            
+            try:
+                for result in process(self.pending(states)):
+                    file_path = result['sourceFile']
+                    attempts = states.get(file_path, (None, 0))[1] + 1
+                    error = result.get('error')
+                    if error is not None and attempts < max_attempts:
+                        entries.append((file_path, RETRY, attempts, None, None, error))
+                    else:
+                        offset = writer.offset
+                        writer.write(result)
+                        entries.append((file_path, FAILED if error is not None else DONE, attempts,
+                                        offset, writer.offset - offset, error))
+                    
+                    if (len(entries) >= self.checkpoint_every
+                            or time.monotonic() - last_checkpoint >= self.checkpoint_interval):
+                        checkpoint()
+                        last_checkpoint = time.monotonic()
+                    yield result
+            finally:
+                checkpoint()
+        if RETRY not in self.manifest.summary(self.job_id):
+            self.manifest.finish_job(self.job_id)
@@ -0,0 +1,77 @@
+# src/matcher.py - COMPILED MULTI-PHRASE MATCHER
+import re
+from typing import Dict, Iterable, List, Set
+
+
+_END = ''
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Regex for a phrase trie, sharing common prefixes between branches"""
+    branches = []
+    optional = False
+    for char in sorted(node):
+        if char == _END:
+            optional = True
+        else:
+            branches.append(re.escape(char) + _trie_pattern(node[char]))
+    
+    if not branches:
+        return ''
+    if len(branches) == 1:
+        pattern = branches[0]
+        if optional:
+            pattern = f'(?:{pattern})?'
+    else:
+        pattern = '(?:' + '|'.join(branches) + ')'
+        if optional:
+            pattern += '?'
+    return pattern
+
+
+class PhraseMatcher:
+    """Find which of many phrases occur in a text with one regex scan
+    
+    Phrases are stored in a trie that is compiled into a single
+    prefix-factored regex, so the cost per text position stays flat as the
+    phrase list grows. Every position where some phrase starts is visited,
+    and the trie is walked there to collect all phrases (including ones that
+    overlap or are prefixes of each other).
+    """
+    
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = list(dict.fromkeys(phrase for phrase in phrases if phrase))
+        self.rank = {phrase: i for i, phrase in enumerate(self.phrases)}
+        self.trie: Dict[str, dict] = {}
+        for phrase in self.phrases:
+            node = self.trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+        
+        pattern = _trie_pattern(self.trie)
+        self.pattern = re.compile(pattern) if pattern else None
+    
+    def find_all(self, text: str) -> Set[str]:
+        """Every phrase that occurs in text (case-sensitive)"""
+        found = set()
+        if self.pattern is None or not text:
+            return found
+        
+        search = self.pattern.search
+        match = search(text)
+        while match:
+            start = match.start()
+            node = self.trie
+            for pos in range(start, len(text)):
+                node = node.get(text[pos])
+                if node is None:
+                    break
+                if _END in node:
+                    found.add(text[start:pos + 1])
+            match = search(text, start + 1)
+        return found
+    
+    def ordered_matches(self, text: str) -> List[str]:
+        """Matched phrases ordered by their position in the phrase list"""
+        return sorted(self.find_all(text), key=self.rank.__getitem__)
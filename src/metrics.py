@@ -0,0 +1,244 @@
+# src/metrics.py - PER-STAGE TIMING AND METRICS SINKS
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, List, Optional, Sequence
+
+
+# Upper bounds (seconds) of latency histogram buckets
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class NullTrace:
+    """Trace that records nothing, used when metrics are disabled"""
+    
+    _stage = nullcontext()
+    
+    def stage(self, name: str):
+        return self._stage
+    
+    def count(self, name: str, value: int):
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+class DocumentTrace:
+    """Timings and sizes recorded while processing one document
+    
+    Stages: read (file / pdfplumber I/O), extract (field extraction and
+    inference), validate and route. Counts: pages, text_chars and
+    extracted_fields, plus cache_hit when a result cache is used.
+    """
+    
+    def __init__(self, file_path: str):
+        self.file = str(file_path)
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.route: Optional[str] = None
+        self.error: Optional[str] = None
+        self.total = 0.0
+        self._started = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage; repeated stages accumulate"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+    
+    def count(self, name: str, value: int):
+        self.counts[name] = value
+    
+    def finish(self, result: Optional[Dict[str, Any]] = None, error: Optional[Exception] = None):
+        """Stop the clock and record the outcome"""
+        self.total = time.perf_counter() - self._started
+        if result is not None:
+            self.route = result.get('recommendedRoute')
+            self.counts['extracted_fields'] = len(result.get('extractedFields', {}))
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        trace = {
+            "file": self.file,
+            "totalMs": round(self.total * 1000, 3),
+            "stagesMs": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            "counts": dict(self.counts),
+            "route": self.route,
+        }
+        if self.error:
+            trace["error"] = self.error
+        return trace
+
+
+class MetricsSink:
+    """Receives one finished trace per processed document"""
+    
+    def record(self, trace: DocumentTrace):
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+
+
+class HistogramSink(MetricsSink):
+    """In-memory latency histograms per stage, plus route and size totals"""
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, List[int]] = {}
+        self.sums: Dict[str, float] = {}
+        self.routes: Dict[str, int] = {}
+        self.totals: Dict[str, int] = {}
+        self.documents = 0
+        self.errors = 0
+    
+    def _observe(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = [0] * (len(self.buckets) + 1)
+            self.sums[name] = 0.0
+        histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sums[name] += seconds
+    
+    def record(self, trace: DocumentTrace):
+        with self._lock:
+            self.documents += 1
+            if trace.error:
+                self.errors += 1
+            self._observe('total', trace.total)
+            for name, seconds in trace.stages.items():
+                self._observe(name, seconds)
+            if trace.route:
+                self.routes[trace.route] = self.routes.get(trace.route, 0) + 1
+            for name, value in trace.counts.items():
+                self.totals[name] = self.totals.get(name, 0) + value
+    
+    def percentile(self, stage: str, pct: float) -> Optional[float]:
+        """Upper bucket bound containing the pct-th percentile of a stage"""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if not histogram:
+                return None
+            target = sum(histogram) * pct / 100
+            seen = 0
+            for index, count in enumerate(histogram):
+                seen += count
+                if count and seen >= target:
+                    return self.buckets[index] if index < len(self.buckets) else float('inf')
+            return None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts, mean and p50/p95/p99 per stage"""
+        stages = {}
+        for name in list(self.histograms):
+            count = sum(self.histograms[name])
+            stages[name] = {
+                "count": count,
+                "meanMs": round(self.sums[name] / count * 1000, 3) if count else 0.0,
+                **{f"p{pct}Ms": round(self.percentile(name, pct) * 1000, 3) for pct in (50, 95, 99)},
+            }
+        return {"documents": self.documents, "errors": self.errors, "stages": stages,
+                "routes": dict(self.routes), "totals": dict(self.totals)}
+
+
+class PrometheusSink(HistogramSink):
+    """Histograms rendered in the Prometheus text exposition format"""
+    
+    def __init__(self, namespace: str = "fnol", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(buckets)
+        self.namespace = namespace
+    
+    def render(self) -> str:
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_stage_seconds Time spent per processing stage",
+            f"# TYPE {ns}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), histogram):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{ns}_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'{ns}_stage_seconds_sum{{stage="{name}"}} {self.sums[name]:.6f}')
+                lines.append(f'{ns}_stage_seconds_count{{stage="{name}"}} {cumulative}')
+            
+            lines += [f"# HELP {ns}_documents_total Documents processed by route",
+                      f"# TYPE {ns}_documents_total counter"]
+            for route, count in sorted(self.routes.items()):
+                label = route.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{ns}_documents_total{{route="{label}"}} {count}')
+            lines += [f"# TYPE {ns}_errors_total counter", f"{ns}_errors_total {self.errors}"]
+            
+            for name, value in sorted(self.totals.items()):
+                lines += [f"# TYPE {ns}_{name}_total counter", f"{ns}_{name}_total {value}"]
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path: str):
+        """Write the metrics to a file (e.g. for a node_exporter textfile collector)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+
+
+class JsonLinesSink(MetricsSink):
+    """Append every trace as one JSON line"""
+    
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8')
+    
+    def record(self, trace: DocumentTrace):
+        line = json.dumps(trace.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+    
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Metrics:
+    """Fan finished document traces out to sinks
+    
+    With ``slow_threshold`` (seconds) set, results of documents that took at
+    least that long carry their trace under the "trace" key.
+    """
+    
+    def __init__(self, sinks: Optional[List[MetricsSink]] = None,
+                 slow_threshold: Optional[float] = None):
+        self.sinks = list(sinks or [])
+        self.slow_threshold = slow_threshold
+    
+    def __getstate__(self):
+        # Sinks stay in the parent process; batch workers send traces back
+        return {'sinks': [], 'slow_threshold': self.slow_threshold}
+    
+    def observe(self, trace: DocumentTrace, result: Optional[Dict[str, Any]] = None):
+        """Record a finished trace and attach it to a slow result"""
+        for sink in self.sinks:
+            sink.record(trace)
+        if (result is not None and self.slow_threshold is not None
+                and trace.total >= self.slow_threshold):
+            result["trace"] = trace.to_dict()
+    
+    def sink(self, sink_type: type) -> Optional[MetricsSink]:
+        """First sink of the given type, if any"""
+        for sink in self.sinks:
+            if isinstance(sink, sink_type):
+                return sink
+        return None
+    
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
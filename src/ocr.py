@@ -0,0 +1,148 @@
+# src/ocr.py - OCR FALLBACK FOR PDF PAGES WITHOUT A TEXT LAYER
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from pathlib import Path
+
+from .cache import ResultCache
+
+
+def _pdfium():
+    """pypdfium2 ships with pdfplumber; imported on the first scanned page only"""
+    try:
+        import pypdfium2
+    except ImportError:
+        raise ImportError("OCR page rendering requires pypdfium2 (pip install pdfplumber)")
+    return pypdfium2
+
+
+def render_page(file_path: Path, page_number: int, dpi: int = 300):
+    """Grayscale PIL image of one PDF page (0-based page number)"""
+    pdf = _pdfium().PdfDocument(str(file_path))
+    try:
+        return pdf[page_number].render(scale=dpi / 72, grayscale=True).to_pil()
+    finally:
+        pdf.close()
+
+
+def image_hash(image) -> str:
+    """SHA-256 of an image's pixels, so identical pages share one OCR result"""
+    digest = hashlib.sha256(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class TesseractEngine:
+    """Local OCR with the tesseract command-line tool; nothing leaves the machine"""
+    
+    def __init__(self, binary: str = 'tesseract', lang: str = 'eng', psm: int = 6,
+                 timeout: float = 120.0):
+        if shutil.which(binary) is None:
+            raise RuntimeError(f"OCR requires the tesseract binary ({binary} not found on PATH; "
+                               "e.g. apt install tesseract-ocr)")
+        self.binary = binary
+        self.lang = lang
+        # 6: a single uniform block of text, which suits form pages
+        self.psm = psm
+        self.timeout = timeout
+    
+    @property
+    def cache_key(self) -> str:
+        """Settings that change the recognised text, for keying cached pages"""
+        return f"tesseract-{self.lang}-psm{self.psm}"
+    
+    def recognize(self, image) -> str:
+        png = io.BytesIO()
+        image.save(png, format='PNG')
+        completed = subprocess.run(
+            [self.binary, 'stdin', 'stdout', '-l', self.lang, '--psm', str(self.psm)],
+            input=png.getvalue(), capture_output=True, timeout=self.timeout, check=True)
+        return completed.stdout.decode('utf-8', errors='ignore')
+
+
+def _ocr_page(file_path: str, page_number: int, dpi: int, engine,
+              cache: Optional[ResultCache]) -> Tuple[str, bool]:
+    """(text, cache hit) for one page; runs in an OCR pool worker"""
+    image = render_page(Path(file_path), page_number, dpi)
+    key = f"{engine.cache_key}:{dpi}:{image_hash(image)}"
+    if cache is not None:
+        cached = cache.get(ResultCache.OCR, key)
+        if cached is not None:
+            return cached['text'], True
+    text = engine.recognize(image)
+    if cache is not None:
+        cache.put(ResultCache.OCR, key, {'text': text})
+    return text, False
+
+
+class OcrStage:
+    """OCR the pages of a PDF that have no extractable text
+    
+    Pages are rendered and recognised in a page-level process pool of
+    ``workers`` processes (none for one worker), separate from any document
+    pool. With a ``cache``, recognised text is stored under a hash of the
+    rendered page, so a page seen before (a resubmitted scan, a repeated
+    cover sheet) is never recognised again.
+    """
+    
+    def __init__(self, engine=None, workers: Optional[int] = None,
+                 cache: Optional[ResultCache] = None, dpi: int = 300):
+        self.engine = engine or TesseractEngine()
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        self.dpi = dpi
+        self._pool = None
+        self._lock = threading.Lock()
+        self.pages_recognized = 0
+        self.pages_cached = 0
+    
+    def __getstate__(self):
+        # Pools cannot cross process boundaries; workers start their own
+        return {'engine': self.engine, 'workers': self.workers, 'cache': self.cache, 'dpi': self.dpi}
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+    
+    @property
+    def cache_key(self) -> str:
+        return f"{self.engine.cache_key}-{self.dpi}dpi"
+    
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+    
+    def ocr_pages(self, file_path: Path, page_numbers: Iterable[int]) -> Dict[int, str]:
+        """Recognised text by page number (0-based)"""
+        page_numbers = list(page_numbers)
+        if self.workers == 1 or len(page_numbers) == 1:
+            results = [_ocr_page(str(file_path), number, self.dpi, self.engine, self.cache)
+                       for number in page_numbers]
+        else:
+            pool = self._get_pool()
+            futures = [pool.submit(_ocr_page, str(file_path), number, self.dpi, self.engine, self.cache)
+                       for number in page_numbers]
+            results = [future.result() for future in futures]
+        
+        texts = {}
+        with self._lock:
+            for number, (text, cached) in zip(page_numbers, results):
+                texts[number] = text
+                if cached:
+                    self.pages_cached += 1
+                else:
+                    self.pages_recognized += 1
+        return texts
+    
+    def close(self):
+        """Stop the OCR worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
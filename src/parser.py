@@ -1,131 +1,231 @@
 # src/parser.py - WITH INFERENCE FOR ASSET TYPE
-import re
-import pdfplumber
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, Optional, Set
 from pathlib import Path
 
+from .acroform import extract_form_fields, load_form_reader
+from .extractor import DEFAULT_EXTRACTOR
+from .metrics import NULL_TRACE
+from .pdf_backends import get_pdf_backend
+from .record import ClaimRecord
+from .splitter import ClaimSplitter
+
+
+# Bump whenever extraction output changes, so cached extractions are not reused
+PARSER_VERSION = "1"
+
+# Sample claim run through extraction by warmup()
+WARMUP_TEXT = """POLICY NUMBER: WARMUP-0001
+POLICYHOLDER NAME: Warm Up
+DATE OF LOSS: 01/01/2024
+TIME: 09:00 AM
+LOCATION: 1 Main Street
+DESCRIPTION: Rear-ended at a traffic light, bumper damaged.
+CLAIM TYPE: Auto Collision
+ESTIMATE AMOUNT: $1,000
+"""
+
 
 class DocumentParser:
-    """Parser for FNOL documents in PDF/TXT format"""
+    """Parser for FNOL documents in PDF/TXT format
+    
+    In streaming mode PDF pages are opened one at a time and reading stops
+    as soon as every field in ``stop_fields`` has been found. ``max_pages``
+    caps the number of pages read in either mode. ``pdf_backend`` names the
+    PDF text extractor (see pdf_backends); 'auto' chooses per document.
+    With ``read_forms`` the values of a filled ACORD form are read straight
+    from its AcroForm fields, and text is only extracted when there are none.
+    With an ``ocr`` stage (see ocr.OcrStage), PDF pages without a text
+    layer are recognised instead of being skipped.
+    """
+    
+    def __init__(self, streaming: bool = False, max_pages: Optional[int] = None,
+                 stop_fields: Optional[Iterable[str]] = None, pdf_backend: str = 'auto',
+                 read_forms: bool = True, ocr=None):
+        self.extractor = DEFAULT_EXTRACTOR
+        self.pdf_backend = get_pdf_backend(pdf_backend)
+        self.read_forms = read_forms
+        self.ocr = ocr
+        self.streaming = streaming
+        self.max_pages = max_pages
+        self.stop_fields = stop_fields
     
-    def parse_document(self, file_path: str) -> Dict[str, Any]:
+    @property
+    def stop_fields(self) -> Set[str]:
+        return self._stop_fields
+    
+    @stop_fields.setter
+    def stop_fields(self, fields: Optional[Iterable[str]]):
+        # Only fields the extractor can produce can end a stream early
+        self._stop_fields = set(fields or ()) & self.extractor.output_fields
+    
+    def cache_version(self) -> str:
+        """Version tag for cached extractions produced by this parser"""
+        version = f"parser-{PARSER_VERSION}-{self.pdf_backend.name}"
+        if self.read_forms:
+            version += "-forms"
+        if self.ocr is not None:
+            version += f"-ocr-{self.ocr.cache_key}"
+        if self.max_pages is not None:
+            version += f"-max{self.max_pages}"
+        if self.streaming:
+            version += "-stream-" + ",".join(sorted(self.stop_fields))
+        return version
+    
+    def warmup(self, pdf: bool = True) -> ClaimRecord:
+        """Load the PDF libraries (unless pdf is False) and extract a sample claim"""
+        if pdf:
+            self.pdf_backend.load()
+            if self.read_forms:
+                load_form_reader()
+        extracted = self._extract_from_text(WARMUP_TEXT)
+        self._infer_missing_fields(extracted, "warmup.txt")
+        return extracted
+    
+    def parse_document(self, file_path: str, trace=NULL_TRACE) -> Dict[str, Any]:
         """Parse document based on file extension"""
+        path = self._check_path(file_path)
+        
+        if path.suffix.lower() == '.pdf':
+            return self.parse_pdf(path, trace)
+        else:
+            return self.parse_txt(path, trace)
+    
+    def extract_document(self, file_path: str, trace=NULL_TRACE) -> Optional[Dict[str, Any]]:
+        """Extract fields from document content only, without filename inference
+        
+        Returns None when the document cannot be read.
+        """
+        path = self._check_path(file_path)
+        
+        with trace.stage('read'):
+            if path.suffix.lower() == '.pdf':
+                form = self._read_form(path, trace)
+                if form is not None:
+                    return form
+                text = self._read_pdf_text(path, trace)
+            else:
+                text = self._read_txt_text(path)
+        if text is None:
+            return None
+        
+        trace.count('text_chars', len(text))
+        with trace.stage('extract'):
+            return self._extract_from_text(text)
+    
+    def parse_pdf(self, file_path: Path, trace=NULL_TRACE) -> Dict[str, Any]:
+        """Extract text from PDF file - Improved for ACORD forms"""
+        with trace.stage('read'):
+            form = self._read_form(file_path, trace)
+            if form is None:
+                text = self._read_pdf_text(file_path, trace)
+        if form is not None:
+            with trace.stage('extract'):
+                self._infer_missing_fields(form, file_path.name)
+            return form
+        return self._parse_text(text, file_path, trace)
+    
+    def parse_txt(self, file_path: Path, trace=NULL_TRACE) -> Dict[str, Any]:
+        """Extract text from TXT file"""
+        with trace.stage('read'):
+            text = self._read_txt_text(file_path)
+        return self._parse_text(text, file_path, trace)
+    
+    def _parse_text(self, text: Optional[str], file_path: Path, trace) -> Dict[str, Any]:
+        """Extract fields from document text and infer the missing ones"""
+        if text is None:
+            return ClaimRecord()
+        
+        trace.count('text_chars', len(text))
+        with trace.stage('extract'):
+            extracted = self._extract_from_text(text)
+            self._infer_missing_fields(extracted, file_path.name)
+        return extracted
+    
+    def _read_form(self, file_path: Path, trace=NULL_TRACE) -> Optional[ClaimRecord]:
+        """Fields of a filled ACORD form, or None when text extraction is needed"""
+        if not self.read_forms:
+            return None
+        form = extract_form_fields(file_path)
+        if form is not None:
+            trace.count('form_fields', len(form))
+        return form
+    
+    def _check_path(self, file_path: str) -> Path:
+        """Ensure the document exists and has a supported format"""
         path = Path(file_path)
         
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        if path.suffix.lower() == '.pdf':
-            return self.parse_pdf(path)
-        elif path.suffix.lower() == '.txt':
-            return self.parse_txt(path)
-        else:
+        if path.suffix.lower() not in ('.pdf', '.txt'):
             raise ValueError(f"Unsupported file format: {path.suffix}")
+        
+        return path
     
-    def parse_pdf(self, file_path: Path) -> Dict[str, Any]:
-        """Extract text from PDF file - Improved for ACORD forms"""
-        text = ""
+    def iter_pdf_pages(self, file_path: Path) -> Iterator[str]:
+        """Yield the text of each PDF page lazily, up to max_pages"""
+        return self.pdf_backend.iter_pages(file_path, self.max_pages)
+    
+    def iter_claim_texts(self, file_path: Path, splitter: ClaimSplitter) -> Iterator[str]:
+        """Text of each claim in a bundled document, read incrementally"""
+        if file_path.suffix.lower() == '.pdf':
+            return splitter.iter_chunks(self.iter_pdf_pages(file_path))
+        return splitter.iter_txt(file_path)
+    
+    def _read_pdf_text(self, file_path: Path, trace=NULL_TRACE) -> Optional[str]:
+        """Read the text layer of the PDF, page by page"""
+        pages = []
+        # (index in pages, page number) of pages left for OCR
+        scanned = []
+        seen = {}
+        page_count = 0
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            for page_text in self.iter_pdf_pages(file_path):
+                page_count += 1
+                trace.count('pages', page_count)
+                if self.ocr is not None and not (page_text or '').strip():
+                    scanned.append((len(pages), page_count - 1))
+                    pages.append("")
+                    continue
+                if not page_text:
+                    continue
+                pages.append(page_text + "\n")
+                
+                if self.streaming and self.stop_fields:
+                    # Page-local extraction is enough to know which fields exist
+                    for field, value in self._extract_from_text(page_text).items():
+                        seen.setdefault(field, value)
+                    found = dict(seen)
+                    self._infer_missing_fields(found, file_path.name)
+                    if self.stop_fields.issubset(found):
+                        break
+            
+            if scanned:
+                trace.count('ocr_pages', len(scanned))
+                with trace.stage('ocr'):
+                    texts = self.ocr.ocr_pages(file_path, [number for _, number in scanned])
+                for index, number in scanned:
+                    pages[index] = texts[number] + "\n"
+        except ImportError:
+            raise
         except Exception as e:
             print(f"Error reading PDF: {e}")
-            return {}
+            return None
         
-        extracted = self._extract_from_text(text)
-        self._infer_missing_fields(extracted, file_path.name)
-        return extracted
+        return "".join(pages)
     
-    def parse_txt(self, file_path: Path) -> Dict[str, Any]:
-        """Extract text from TXT file"""
+    def _read_txt_text(self, file_path: Path) -> Optional[str]:
+        """Read a TXT file"""
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
+                return f.read()
         except Exception as e:
             print(f"Error reading TXT file: {e}")
-            return {}
-        
-        extracted = self._extract_from_text(text)
-        self._infer_missing_fields(extracted, file_path.name)
-        return extracted
+            return None
     
     def _extract_from_text(self, text: str) -> Dict[str, Any]:
         """Extract fields from text content"""
-        extracted = {}
-        
-        # Split text into lines
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        
-        # Field patterns with more flexible matching
-        patterns = {
-            'policy_number': r'POLICY\s*(?:NO\.?|NUMBER|#)\s*:?\s*([A-Z0-9-]+)',
-            'policyholder_name': r'NAME\s*(?:OF\s*)?INSURED\s*:?\s*(.+?)(?=\n|$)',
-            'incident_date': r'DATE\s*(?:OF\s*)?LOSS\s*:?\s*(\d{1,2}/\d{1,2}/\d{4})',
-            'incident_time': r'TIME\s*:?\s*(\d{1,2}:\d{2}\s*[APMapm]{2})',
-            'location': r'LOCATION\s*:?\s*(.+?)(?=\n|$)',
-            'estimate_amount': r'ESTIMATE\s*AMOUNT\s*:?\s*\$?\s*([\d,]+)',
-            'claim_type': r'CLAIM\s*TYPE\s*:?\s*(.+?)(?=\n|$)',
-            'asset_type': r'ASSET\s*TYPE\s*:?\s*(.+?)(?=\n|$)',
-            'vin': r'V\.?I\.?N\.?\s*:?\s*([A-HJ-NPR-Z0-9]{17})',
-            'description': r'DESCRIPTION\s*:?\s*(.+?)(?=\n[A-Z]|$)',
-        }
-        
-        # First pass: try regex patterns
-        for field, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-            if match:
-                value = match.group(1).strip()
-                if field == 'estimate_amount':
-                    value = value.replace('$', '').replace(',', '')
-                    extracted['estimate_amount'] = value
-                    extracted['estimated_damage'] = value
-                elif field == 'description':
-                    # Clean description - take until next field
-                    value = self._clean_description(value)
-                    extracted[field] = value
-                else:
-                    extracted[field] = value
-        
-        # Second pass: line-by-line extraction for missed fields
-        for i, line in enumerate(lines):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip().upper()
-                value = value.strip()
-                
-                if 'POLICY' in key and 'NUMBER' in key and 'policy_number' not in extracted:
-                    extracted['policy_number'] = value
-                elif 'NAME' in key and 'INSURED' in key and 'policyholder_name' not in extracted:
-                    extracted['policyholder_name'] = value
-                elif 'DATE' in key and 'LOSS' in key and 'incident_date' not in extracted:
-                    extracted['incident_date'] = value
-                elif 'TIME' in key and 'incident_time' not in extracted:
-                    extracted['incident_time'] = value
-                elif 'LOCATION' in key and 'location' not in extracted:
-                    extracted['location'] = value
-                elif 'ESTIMATE' in key and 'AMOUNT' in key and 'estimate_amount' not in extracted:
-                    cleaned = value.replace('$', '').replace(',', '')
-                    extracted['estimate_amount'] = cleaned
-                    extracted['estimated_damage'] = cleaned
-                elif 'CLAIM' in key and 'TYPE' in key and 'claim_type' not in extracted:
-                    extracted['claim_type'] = value.split()[0]  # Take first word
-                elif 'ASSET' in key and 'TYPE' in key and 'asset_type' not in extracted:
-                    extracted['asset_type'] = value.split()[0]
-                elif 'DESCRIPTION' in key and 'description' not in extracted:
-                    # Collect multi-line description
-                    desc_lines = [value]
-                    for j in range(i+1, len(lines)):
-                        next_line = lines[j]
-                        if ':' not in next_line:  # Not a new field
-                            desc_lines.append(next_line)
-                        else:
-                            break
-                    extracted['description'] = ' '.join(desc_lines)
-        
-        return extracted
+        return self.extractor.extract(text)
     
     def _infer_missing_fields(self, extracted: Dict[str, Any], filename: str):
         """Infer missing fields based on context"""
@@ -157,18 +257,4 @@ class DocumentParser:
         
         # Ensure estimated_damage exists
         if 'estimate_amount' in extracted and 'estimated_damage' not in extracted:
-            extracted['estimated_damage'] = extracted['estimate_amount']
-    
-    def _clean_description(self, description: str) -> str:
-        """Clean description text"""
-        # Remove any field labels that might have been included
-        field_labels = ['VEHICLE MAKE:', 'V.I.N.:', 'CONTACT:', 'ASSET TYPE:']
-        for label in field_labels:
-            if label in description:
-                description = description.split(label)[0].strip()
-        
-        # Remove trailing INVESTIGATION NEEDED if it's a separate line
-        if 'INVESTIGATION NEEDED' in description:
-            description = description.replace('INVESTIGATION NEEDED', '').strip()
-        
-        return description
\ No newline at end of file
+            extracted['estimated_damage'] = extracted['estimate_amount']
\ No newline at end of file
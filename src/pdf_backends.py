@@ -0,0 +1,138 @@
+# src/pdf_backends.py - PLUGGABLE PDF TEXT EXTRACTION BACKENDS
+from typing import Iterator, Optional
+from pathlib import Path
+
+
+def _pdfplumber():
+    """Import pdfplumber on first use; TXT-only runs never load it"""
+    try:
+        import pdfplumber
+    except ImportError:
+        raise ImportError("PDF parsing requires pdfplumber (pip install pdfplumber)")
+    return pdfplumber
+
+
+def _pypdf2():
+    try:
+        import PyPDF2
+    except ImportError:
+        raise ImportError("The text-layer PDF backend requires PyPDF2 (pip install PyPDF2)")
+    return PyPDF2
+
+
+class PdfBackend:
+    """Yields the text of each page of a PDF"""
+    
+    name = None
+    
+    def load(self):
+        """Import the backend's library now instead of on the first PDF"""
+    
+    def iter_pages(self, file_path: Path, max_pages: Optional[int] = None) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class PdfPlumberBackend(PdfBackend):
+    """Layout-aware extraction with pdfplumber (slow, handles positioned form labels)"""
+    
+    name = 'pdfplumber'
+    
+    def load(self):
+        _pdfplumber()
+    
+    def iter_pages(self, file_path: Path, max_pages: Optional[int] = None) -> Iterator[str]:
+        with _pdfplumber().open(file_path) as pdf:
+            for page_number, page in enumerate(pdf.pages):
+                if max_pages is not None and page_number >= max_pages:
+                    break
+                page_text = page.extract_text()
+                # Release the page's parsed layout before opening the next one
+                page.flush_cache()
+                page.get_textmap.cache_clear()
+                yield page_text or ""
+
+
+class TextLayerBackend(PdfBackend):
+    """Content-stream text in stream order with PyPDF2, without layout analysis
+    
+    Over ten times faster than pdfplumber and just as accurate for
+    digitally generated documents that write their text in reading order.
+    """
+    
+    name = 'pypdf2'
+    
+    def load(self):
+        _pypdf2()
+    
+    def iter_pages(self, file_path: Path, max_pages: Optional[int] = None) -> Iterator[str]:
+        yield from self.iter_reader_pages(_pypdf2().PdfReader(str(file_path)), max_pages)
+    
+    def iter_reader_pages(self, reader, max_pages: Optional[int] = None) -> Iterator[str]:
+        for page_number, page in enumerate(reader.pages):
+            if max_pages is not None and page_number >= max_pages:
+                break
+            yield page.extract_text() or ""
+
+
+class AutoBackend(PdfBackend):
+    """Pick a backend per document with a cheap structural probe
+    
+    Fillable forms (an AcroForm, or widget annotations on the first page)
+    place their labels by position, so they need pdfplumber's layout
+    analysis; everything else uses the text layer. The probe only reads the
+    document catalog and first page dictionary, and its PyPDF2 reader is
+    reused for extraction.
+    """
+    
+    name = 'auto'
+    
+    def __init__(self):
+        self.layout = PdfPlumberBackend()
+        self.text_layer = TextLayerBackend()
+    
+    def load(self):
+        self.layout.load()
+        self.text_layer.load()
+    
+    def needs_layout(self, reader) -> bool:
+        if '/AcroForm' in reader.trailer['/Root']:
+            return True
+        if not reader.pages:
+            return False
+        annotations = reader.pages[0].get('/Annots')
+        if annotations is None:
+            return False
+        return any(annotation.get_object().get('/Subtype') == '/Widget'
+                   for annotation in annotations.get_object())
+    
+    def select(self, file_path: Path):
+        """(backend, PyPDF2 reader or None) to use for a document"""
+        try:
+            reader = _pypdf2().PdfReader(str(file_path))
+            if not self.needs_layout(reader):
+                return self.text_layer, reader
+        except Exception:
+            # Anything PyPDF2 cannot read (encrypted, damaged) goes to pdfplumber
+            pass
+        return self.layout, None
+    
+    def iter_pages(self, file_path: Path, max_pages: Optional[int] = None) -> Iterator[str]:
+        backend, reader = self.select(file_path)
+        if reader is not None:
+            yield from backend.iter_reader_pages(reader, max_pages)
+        else:
+            yield from backend.iter_pages(file_path, max_pages)
+
+
+PDF_BACKENDS = {
+    'auto': AutoBackend,
+    'pdfplumber': PdfPlumberBackend,
+    'pypdf2': TextLayerBackend,
+}
+
+
+def get_pdf_backend(name: str) -> PdfBackend:
+    """Backend instance by name: auto, pdfplumber or pypdf2"""
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {name} (choose from {', '.join(PDF_BACKENDS)})")
+    return PDF_BACKENDS[name]()
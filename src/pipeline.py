@@ -0,0 +1,237 @@
+# src/pipeline.py - STAGED CLAIM PIPELINE WITH BOUNDED QUEUES
+import queue
+import threading
+import time
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Union
+from pathlib import Path
+
+from .metrics import NULL_TRACE, DocumentTrace
+from .processor import FNOLProcessor, _extract_in_worker, error_result, expand_paths
+from .record import ClaimRecord
+
+# End-of-input marker passed down the stage queues
+_DONE = object()
+
+
+class _Claim:
+    """One document on its way through the pipeline"""
+    
+    __slots__ = ('file_path', 'trace', 'rules', 'extracted', 'missing', 'policy_issues',
+                 'result_key', 'result', 'error')
+    
+    def __init__(self, file_path: str, trace):
+        self.file_path = file_path
+        self.trace = trace
+        # The rule set the claim is processed under, taken when parsing starts
+        self.rules = None
+        self.extracted = None
+        self.missing = None
+        self.policy_issues = None
+        self.result_key = None
+        # Set once the claim is routed, found in the cache or has failed
+        self.result = None
+        self.error = None
+
+
+class Stage:
+    """Worker threads taking claims from a bounded input queue"""
+    
+    def __init__(self, name: str, fn: Optional[Callable[[_Claim], None]], workers: int,
+                 queue_size: int):
+        if workers < 1:
+            raise ValueError(f"The {name} stage needs at least one worker")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.peak_depth = 0
+        self._running = workers
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float, failed: bool = False):
+        with self._lock:
+            self.processed += 1
+            self.busy += seconds
+            if failed:
+                self.errors += 1
+    
+    def worker_finished(self) -> bool:
+        """True for the stage's last worker to finish"""
+        with self._lock:
+            self._running -= 1
+            return self._running == 0
+    
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queueDepth": self.queue.qsize(),
+                "queueCapacity": self.queue.maxsize,
+                "peakQueueDepth": self.peak_depth,
+                "processed": self.processed,
+                "errors": self.errors,
+                "busySeconds": round(self.busy, 3),
+                "throughputPerS": round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+                # Share of the stage's worker time spent working, not waiting
+                "utilization": round(self.busy / (elapsed * self.workers), 3) if elapsed > 0 else 0.0,
+            }
+
+
+class ClaimPipeline:
+    """Parse -> validate -> route -> sink, each stage with its own workers
+    
+    Stages are connected by queues of ``queue_size`` claims, so a stage
+    that falls behind blocks the ones before it (down to the reading of
+    input paths) instead of letting claims pile up in memory. The caller
+    iterating ``run()`` is the sink; results arrive in completion order.
+    With ``pdf_processes`` PDFs are parsed in that many worker processes
+    (forked after warming up the processor), while parse threads wait on
+    them and keep TXT files moving. Use one route worker with a duplicate
+    index, so that copies routed at the same time still see each other.
+    """
+    
+    def __init__(self, processor: Optional[FNOLProcessor] = None, parse_workers: int = 4,
+                 validate_workers: int = 1, route_workers: int = 1, queue_size: int = 64,
+                 pdf_processes: int = 0):
+        self.processor = processor or FNOLProcessor()
+        self.pdf_processes = pdf_processes
+        self.stages = [
+            Stage('parse', self._parse, parse_workers, queue_size),
+            Stage('validate', self._validate, validate_workers, queue_size),
+            Stage('route', self._route, route_workers, queue_size),
+            Stage('sink', None, 1, queue_size),
+        ]
+        self._stop = threading.Event()
+        self._process_pool = None
+        self._started = None
+        self._ended = None
+    
+    def _parse(self, claim: _Claim):
+        parse = None
+        if self._process_pool is not None and Path(claim.file_path).suffix.lower() == '.pdf':
+            parse = self._parse_in_worker
+        claim.rules = self.processor.rules
+        claim.result, claim.extracted, claim.result_key = self.processor._extract(
+            claim.file_path, claim.trace, parse, claim.rules)
+    
+    def _parse_in_worker(self, file_path: str, trace) -> Optional[ClaimRecord]:
+        traced = trace is not NULL_TRACE
+        extracted, worker_trace = self._process_pool.submit(
+            _extract_in_worker, str(file_path), traced).result()
+        if worker_trace is not None:
+            for name, seconds in worker_trace.stages.items():
+                trace.stages[name] = trace.stages.get(name, 0.0) + seconds
+            trace.counts.update(worker_trace.counts)
+        return ClaimRecord.from_dict(extracted) if extracted is not None else None
+    
+    def _validate(self, claim: _Claim):
+        claim.missing, claim.policy_issues = self.processor._validate(claim.extracted, claim.trace,
+                                                                      claim.rules)
+    
+    def _route(self, claim: _Claim):
+        claim.result = self.processor._route(claim.extracted, claim.missing, claim.policy_issues,
+                                             claim.trace, claim.file_path, claim.result_key,
+                                             claim.rules)
+    
+    def _put(self, stage: Stage, item) -> bool:
+        """Block until there is room downstream; False once the pipeline is stopping"""
+        while not self._stop.is_set():
+            try:
+                stage.queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            depth = stage.queue.qsize()
+            if depth > stage.peak_depth:
+                stage.peak_depth = depth
+            return True
+        return False
+    
+    def _get(self, stage: Stage):
+        while not self._stop.is_set():
+            try:
+                return stage.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+    
+    def _feed(self, paths_or_glob: Union[str, Iterable[str]]):
+        """Put every input path on the parse queue, then one end marker per parse worker"""
+        parse = self.stages[0]
+        try:
+            for file_path in expand_paths(paths_or_glob):
+                trace = DocumentTrace(file_path) if self.processor.metrics is not None else NULL_TRACE
+                if not self._put(parse, _Claim(file_path, trace)):
+                    return
+        finally:
+            for _ in range(parse.workers):
+                self._put(parse, _DONE)
+    
+    def _work(self, stage: Stage, downstream: Stage):
+        while True:
+            claim = self._get(stage)
+            if claim is _DONE:
+                break
+            # Cached and failed claims pass straight through
+            if claim.result is None:
+                started = time.perf_counter()
+                try:
+                    stage.fn(claim)
+                except Exception as e:
+                    claim.error = e
+                    claim.result = error_result(claim.file_path, e)
+                stage.record(time.perf_counter() - started, claim.error is not None)
+            if not self._put(downstream, claim):
+                return
+        if stage.worker_finished():
+            for _ in range(downstream.workers):
+                self._put(downstream, _DONE)
+    
+    def run(self, paths_or_glob: Union[str, Iterable[str]]) -> Iterator[Dict[str, Any]]:
+        """Process documents, yielding each result as soon as it is routed"""
+        self._stop.clear()
+        self._started, self._ended = time.perf_counter(), None
+        if self.pdf_processes:
+            # Forked before any pipeline thread exists
+            self._process_pool = self.processor._start_process_pool(self.pdf_processes)
+        
+        threads = [threading.Thread(target=self._feed, args=(paths_or_glob,), daemon=True,
+                                    name="fnol-pipeline-feed")]
+        for stage, downstream in zip(self.stages, self.stages[1:]):
+            threads.extend(threading.Thread(target=self._work, args=(stage, downstream), daemon=True,
+                                            name=f"fnol-pipeline-{stage.name}-{i}")
+                           for i in range(stage.workers))
+        for thread in threads:
+            thread.start()
+        
+        sink = self.stages[-1]
+        metrics = self.processor.metrics
+        try:
+            while True:
+                claim = self._get(sink)
+                if claim is _DONE:
+                    break
+                started = time.perf_counter()
+                if metrics is not None:
+                    claim.trace.finish(claim.result if claim.error is None else None, claim.error)
+                    metrics.observe(claim.trace, claim.result if claim.error is None else None)
+                yield {"sourceFile": claim.file_path, **claim.result}
+                sink.record(time.perf_counter() - started)
+        finally:
+            self._ended = time.perf_counter()
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            if self._process_pool is not None:
+                self._process_pool.shutdown(cancel_futures=True)
+                self._process_pool = None
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage queue depth, throughput and utilisation, for sizing each stage"""
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._ended or time.perf_counter()) - self._started
+        return {stage.name: stage.stats(elapsed) for stage in self.stages}
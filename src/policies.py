@@ -0,0 +1,167 @@
+# src/policies.py - LOCAL POLICY SNAPSHOT FOR INTAKE VALIDATION
+import csv
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from pathlib import Path
+
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y')
+ACTIVE_STATUSES = ('', 'active', 'in force', 'inforce')
+
+
+def normalize_date(value: Any) -> Optional[str]:
+    """ISO date (YYYY-MM-DD) from the date formats used in claims and snapshots"""
+    text = str(value or '').strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def build_snapshot(csv_path: str, db_path: str, batch_size: int = 100000) -> str:
+    """Compile a policy CSV into a SQLite snapshot, replacing db_path atomically
+    
+    The CSV needs a policy_number column; effective_from, effective_to
+    (either date format) and status are optional.
+    """
+    tmp_path = f"{db_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "CREATE TABLE policies ("
+            " policy_number TEXT PRIMARY KEY, effective_from TEXT, effective_to TEXT, status TEXT)"
+            " WITHOUT ROWID"
+        )
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            rows = []
+            for row in csv.DictReader(f):
+                number = (row.get('policy_number') or '').strip().upper()
+                if not number:
+                    continue
+                rows.append((number, normalize_date(row.get('effective_from')),
+                             normalize_date(row.get('effective_to')),
+                             (row.get('status') or '').strip()))
+                if len(rows) >= batch_size:
+                    conn.executemany("INSERT OR REPLACE INTO policies VALUES (?, ?, ?, ?)", rows)
+                    rows = []
+            conn.executemany("INSERT OR REPLACE INTO policies VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+class PolicyIndex:
+    """Read-only policy lookups against a local SQLite snapshot
+    
+    The snapshot is a WITHOUT ROWID table keyed on the policy number and is
+    read through SQLite's memory map, so a lookup is a few page reads with
+    no network round-trip, even with millions of policies. A CSV path is
+    compiled to a ``.sqlite`` snapshot next to it first (again whenever the
+    CSV is newer). At most every ``reload_interval`` seconds the snapshot
+    file is checked, and a replaced snapshot is reopened.
+    """
+    
+    def __init__(self, path: str, reload_interval: float = 1.0, mmap_bytes: int = 1 << 30):
+        self.path = str(path)
+        self.reload_interval = reload_interval
+        self.mmap_bytes = mmap_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._version = None
+        self._checked = 0.0
+    
+    def __getstate__(self):
+        # Connections cannot cross process boundaries; workers reopen lazily
+        return {'path': self.path, 'reload_interval': self.reload_interval,
+                'mmap_bytes': self.mmap_bytes}
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+    
+    @property
+    def snapshot_path(self) -> str:
+        if Path(self.path).suffix.lower() == '.csv':
+            return str(Path(self.path).with_suffix('.sqlite'))
+        return self.path
+    
+    def _file_version(self, path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the snapshot, rebuilding or reopening it when it changed"""
+        now = time.monotonic()
+        if self._conn is not None and now - self._checked < self.reload_interval:
+            return self._conn
+        self._checked = now
+        
+        snapshot = self.snapshot_path
+        if snapshot != self.path and (not os.path.exists(snapshot) or
+                                      os.stat(snapshot).st_mtime_ns < os.stat(self.path).st_mtime_ns):
+            build_snapshot(self.path, snapshot)
+        version = self._file_version(snapshot)
+        if self._conn is None or version != self._version:
+            if self._conn is not None:
+                self._conn.close()
+            conn = sqlite3.connect(f"file:{Path(snapshot).resolve()}?mode=ro", uri=True,
+                                   check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+            self._conn = conn
+            self._version = version
+        return self._conn
+    
+    @property
+    def version(self) -> str:
+        """Identifies the loaded snapshot, for keying cached results"""
+        with self._lock:
+            self._connect()
+            return f"{self._version[0]}-{self._version[1]}"
+    
+    def lookup(self, policy_number: Any) -> Optional[Dict[str, Any]]:
+        """The policy's row, or None if the snapshot does not have it"""
+        number = str(policy_number or '').strip().upper()
+        if not number:
+            return None
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT policy_number, effective_from, effective_to, status FROM policies"
+                " WHERE policy_number = ?", (number,)).fetchone()
+        if row is None:
+            return None
+        return {'policy_number': row[0], 'effective_from': row[1], 'effective_to': row[2],
+                'status': row[3]}
+    
+    def check(self, policy_number: Any, incident_date: Any = None) -> Optional[str]:
+        """Why the policy cannot cover the loss (unknown, inactive, out of dates), or None"""
+        policy = self.lookup(policy_number)
+        if policy is None:
+            return f"Unknown policy number: {policy_number}"
+        if policy['status'].lower() not in ACTIVE_STATUSES:
+            return f"Policy {policy['policy_number']} is not active (status: {policy['status']})"
+        
+        loss_date = normalize_date(incident_date)
+        if loss_date is None:
+            return None
+        starts, ends = policy['effective_from'], policy['effective_to']
+        if (starts and loss_date < starts) or (ends and loss_date > ends):
+            return (f"Date of loss {incident_date} is outside the effective dates of policy "
+                    f"{policy['policy_number']} ({starts or '...'} to {ends or '...'})")
+        return None
+    
+    def close(self):
+        """Close the snapshot"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,43 +1,427 @@
 # src/processor.py
+import gc
+import glob
 import json
-from typing import Dict, Any
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 
+from .cache import ResultCache, hash_file
+from .duplicates import DuplicateIndex
+from .metrics import NULL_TRACE, DocumentTrace, Metrics
+from .ocr import OcrStage
 from .parser import DocumentParser
+from .policies import PolicyIndex
+from .record import ClaimRecord
+from .ruleset import RuleSet, RulesWatcher
+from .splitter import ClaimSplitter
 from .validator import FieldValidator
-from .router import RoutingEngine
+from .writers import open_writer
+from .router import DEFAULT_RULES_PATH, RoutingEngine, load_rules
+
+
+SUPPORTED_SUFFIXES = ('.pdf', '.txt')
+
+# Per-process processor used by batch workers (a copy of the parent's)
+_worker_processor = None
+# SQLite connections a forked worker inherited; kept open but never used,
+# since closing them in the child could disturb the parent's database
+_inherited_connections = []
+
+
+def _fork_context():
+    """multiprocessing context whose workers share the parent's memory, if any"""
+    import multiprocessing
+    # fork is unsafe with macOS system frameworks; Windows has no fork
+    if sys.platform == 'darwin' or 'fork' not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context('fork')
+
+
+def _init_worker(processor: 'FNOLProcessor'):
+    """Install the batch processor inside a pool worker process
+    
+    A forked worker gets the parent's objects as they are, so its SQLite
+    helpers are reset to open their own connection (and get fresh locks).
+    """
+    global _worker_processor
+    ocr = processor.parser.ocr
+    if ocr is not None:
+        # The parent's OCR pool belongs to the parent process
+        ocr.__setstate__(ocr.__getstate__())
+    for resource in (processor.cache, processor.duplicates, processor.validator.policy_index,
+                     ocr.cache if ocr is not None else None):
+        if resource is not None:
+            if resource._conn is not None:
+                _inherited_connections.append(resource._conn)
+            resource.__setstate__(resource.__getstate__())
+    _worker_processor = processor
+
+
+def _process_in_worker(file_path: str) -> Tuple[Dict[str, Any], Optional[DocumentTrace]]:
+    """Process a document inside a pool worker process
+    
+    The trace (if metrics are enabled) goes back to the parent, whose sinks
+    record it.
+    """
+    if _worker_processor.metrics is None:
+        return _worker_processor.process_document(file_path), None
+    return _worker_processor.trace_document(file_path)
+
+
+def _extract_in_worker(file_path: str, traced: bool) -> Tuple[Optional[Dict[str, Any]], Optional[DocumentTrace]]:
+    """Extract a document's fields (no inference) inside a pool worker process"""
+    trace = DocumentTrace(file_path) if traced else NULL_TRACE
+    extracted_data = _worker_processor.parser.extract_document(file_path, trace)
+    return (extracted_data.to_dict() if extracted_data is not None else None,
+            trace if traced else None)
+
+
+def error_result(file_path: str, error: Exception) -> Dict[str, Any]:
+    """Result for a batch document that could not be processed"""
+    return {
+        "sourceFile": file_path,
+        "error": f"{type(error).__name__}: {error}",
+        "extractedFields": {},
+        "missingFields": [],
+        "recommendedRoute": "Manual Review",
+        "reasoning": f"Document could not be processed: {error}"
+    }
+
+
+def expand_paths(paths_or_glob: Union[str, os.PathLike, Iterable[str]]) -> Iterator[str]:
+    """Expand a directory, glob pattern, single file or iterable of paths"""
+    if not isinstance(paths_or_glob, (str, os.PathLike)):
+        for file_path in paths_or_glob:
+            yield str(file_path)
+        return
+    
+    pattern = str(paths_or_glob)
+    path = Path(pattern)
+    if path.is_dir():
+        for child in sorted(path.iterdir()):
+            if child.is_file() and child.suffix.lower() in SUPPORTED_SUFFIXES:
+                yield str(child)
+    elif glob.has_magic(pattern):
+        for match in sorted(glob.glob(pattern, recursive=True)):
+            if Path(match).suffix.lower() in SUPPORTED_SUFFIXES:
+                yield match
+    else:
+        yield pattern
 
 
 class FNOLProcessor:
     """Main FNOL processing pipeline"""
     
-    def __init__(self):
-        self.parser = DocumentParser()
-        self.validator = FieldValidator()
-        self.router = RoutingEngine()
+    def __init__(self, cache: Optional[ResultCache] = None, streaming: bool = False,
+                 max_pages: Optional[int] = None, metrics: Optional[Metrics] = None,
+                 pdf_backend: str = 'auto', duplicates: Optional[DuplicateIndex] = None,
+                 policies: Optional[PolicyIndex] = None, ocr: Optional[OcrStage] = None,
+                 rules_path: Optional[str] = None, shadow: Optional[RuleSet] = None):
+        self.rules_path = str(rules_path or DEFAULT_RULES_PATH)
+        # Replaced as a whole on reload; each claim reads it once
+        self.rules = RuleSet.from_config(load_rules(self.rules_path), policy_index=policies,
+                                         duplicate_index=duplicates)
+        # Candidate rules routed next to the live ones; results gain its shadowRoute
+        self.shadow = shadow
+        self.parser = DocumentParser(streaming=streaming, max_pages=max_pages,
+                                     stop_fields=self.validator.mandatory_fields,
+                                     pdf_backend=pdf_backend, ocr=ocr)
+        # Every routed claim is added, so later copies are flagged
+        self.duplicates = duplicates
+        self.cache = cache
+        # None disables instrumentation entirely
+        self.metrics = metrics
+    
+    @property
+    def validator(self) -> FieldValidator:
+        return self.rules.validator
+    
+    @validator.setter
+    def validator(self, validator: FieldValidator):
+        self.rules = self.rules.replace(validator=validator)
+    
+    @property
+    def router(self) -> RoutingEngine:
+        return self.rules.router
+    
+    @router.setter
+    def router(self, router: RoutingEngine):
+        self.rules = self.rules.replace(router=router)
+    
+    def reload_rules(self, config: Optional[Dict[str, Any]] = None) -> RuleSet:
+        """Compile a new version of the rule file and swap it in
+        
+        ``config`` is a parsed rule file; by default rules_path is read again.
+        Claims already being processed finish on the rules they started with.
+        """
+        if config is None:
+            config = load_rules(self.rules_path)
+        current = self.rules
+        rules = RuleSet.from_config(config, policy_index=current.validator.policy_index,
+                                    duplicate_index=current.router.duplicate_index)
+        self.parser.stop_fields = rules.validator.mandatory_fields
+        self.rules = rules
+        return rules
+    
+    def watch_rules(self, interval: float = 2.0) -> RulesWatcher:
+        """Reload the rules in the background whenever rules_path changes"""
+        return RulesWatcher(self.rules_path, self.reload_rules, interval).start()
+    
+    def warmup(self, pdf: bool = True) -> 'FNOLProcessor':
+        """Load everything a document needs up front, e.g. before forking workers
+        
+        Imports the PDF libraries (unless pdf is False), runs a sample claim
+        through extraction, validation and the routing rules, and computes
+        the configuration fingerprints. Forked workers then share this state
+        copy-on-write instead of each building it on its first document.
+        """
+        extracted = self.parser.warmup(pdf)
+        rules = self.rules
+        missing_fields = rules.validator.validate(extracted)
+        rules.validator.check_inconsistencies(extracted)
+        rules.router.warmup(extracted, missing_fields)
+        if self.shadow is not None:
+            self.shadow.router.warmup(extracted, self.shadow.validator.validate(extracted))
+        return self
     
     def process_document(self, file_path: str) -> Dict[str, Any]:
         """Process a single FNOL document"""
+        if self.metrics is None:
+            return self._process(file_path, NULL_TRACE)
+        
+        trace = DocumentTrace(file_path)
+        try:
+            result = self._process(file_path, trace)
+        except Exception as e:
+            trace.finish(error=e)
+            self.metrics.observe(trace)
+            raise
+        trace.finish(result)
+        self.metrics.observe(trace, result)
+        return result
+    
+    def process_bundle(self, file_path: str, splitter: Optional[ClaimSplitter] = None
+                       ) -> Iterator[Dict[str, Any]]:
+        """Process a document holding many claims, yielding one result per claim
+        
+        The document is split on its claim headers (see ClaimSplitter) as it
+        is read, and each claim is validated and routed on its own. Results
+        carry the claim's claimIndex; the result cache is not used.
+        """
+        path = self.parser._check_path(file_path)
+        texts = self.parser.iter_claim_texts(path, splitter or ClaimSplitter())
+        for index, text in enumerate(texts):
+            source = f"{file_path}#{index}"
+            trace = DocumentTrace(source) if self.metrics is not None else NULL_TRACE
+            with trace.stage('extract'):
+                extracted_data = self.parser._extract_from_text(text)
+                self.parser._infer_missing_fields(extracted_data, path.name)
+            rules = self.rules
+            missing_fields, policy_issues = self._validate(extracted_data, trace, rules)
+            result = self._route(extracted_data, missing_fields, policy_issues, trace, source,
+                                 rules=rules)
+            if self.metrics is not None:
+                trace.finish(result)
+                self.metrics.observe(trace, result)
+            yield {"claimIndex": index, **result}
+    
+    def trace_document(self, file_path: str) -> Tuple[Dict[str, Any], DocumentTrace]:
+        """Process a document and return its trace without recording it"""
+        trace = DocumentTrace(file_path)
+        result = self._process(file_path, trace)
+        trace.finish(result)
+        return result, trace
+    
+    def _process(self, file_path: str, trace) -> Dict[str, Any]:
+        """Parse (or look up), validate and route one document"""
+        rules = self.rules
+        result, extracted_data, result_key = self._extract(file_path, trace, rules=rules)
+        if result is not None:
+            return result
+        missing_fields, policy_issues = self._validate(extracted_data, trace, rules)
+        return self._route(extracted_data, missing_fields, policy_issues, trace, file_path, result_key,
+                           rules)
+    
+    def _extract(self, file_path: str, trace=NULL_TRACE, parse=None, rules: Optional[RuleSet] = None
+                 ) -> Tuple[Optional[Dict[str, Any]], Optional[ClaimRecord], Optional[str]]:
+        """Step 1: (cached result, None, None), or (None, extracted fields, result cache key)
+        
+        ``parse`` replaces the parser's extract_document, e.g. to run it in
+        a worker process. The steps take the claim's ``rules`` (by default
+        the current ones), so a reload never splits a claim across versions.
+        """
+        if self.cache is None:
+            if parse is None:
+                return None, self.parser.parse_document(file_path, trace), None
+            extracted_data = parse(file_path, trace)
+            if extracted_data is None:
+                return None, ClaimRecord(), None
+            self.parser._infer_missing_fields(extracted_data, Path(file_path).name)
+            return None, extracted_data, None
+        
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        extraction_key = f"{hash_file(path)}:{self.parser.cache_version()}"
+        # Filename-based inference feeds routing, so results are keyed on the name too
+        fingerprint = (rules or self.rules).fingerprint()
+        if self.shadow is not None:
+            fingerprint += f"-shadow-{self.shadow.fingerprint()}"
+        result_key = f"{extraction_key}:{fingerprint}:{path.name.lower()}"
         
-        # Step 1: Parse document
-        extracted_data = self.parser.parse_document(file_path)
+        # With duplicate detection the route depends on earlier claims too
+        use_results = self.duplicates is None
+        with trace.stage('cache'):
+            result = self.cache.get(ResultCache.RESULT, result_key) if use_results else None
+        if result is not None:
+            trace.count('cache_hit', 1)
+            return result, None, None
+        trace.count('cache_hit', 0)
         
-        # Step 2: Validate and find missing fields
-        missing_fields = self.validator.validate(extracted_data)
+        extracted_data = self.cache.get(ResultCache.EXTRACTION, extraction_key)
+        if extracted_data is None:
+            extracted_data = (parse or self.parser.extract_document)(path, trace)
+            if extracted_data is None:
+                # Unreadable document: route it, but don't cache the failure
+                return None, ClaimRecord(), None
+            self.cache.put(ResultCache.EXTRACTION, extraction_key, extracted_data.to_dict())
+        else:
+            extracted_data = ClaimRecord.from_dict(extracted_data)
         
-        # Step 3: Determine routing
-        routing_info = self.router.determine_route(extracted_data, missing_fields)
+        self.parser._infer_missing_fields(extracted_data, path.name)
+        return None, extracted_data, result_key if use_results else None
+    
+    def _validate(self, extracted_data: Dict[str, Any], trace=NULL_TRACE,
+                  rules: Optional[RuleSet] = None) -> Tuple[List[str], List[str]]:
+        """Step 2: missing mandatory fields and policy issues"""
+        validator = (rules or self.rules).validator
+        with trace.stage('validate'):
+            return validator.validate(extracted_data), validator.check_policy(extracted_data)
+    
+    def _route(self, extracted_data: Dict[str, Any], missing_fields: List[str], policy_issues: List[str],
+               trace=NULL_TRACE, file_path: Optional[str] = None,
+               result_key: Optional[str] = None, rules: Optional[RuleSet] = None) -> Dict[str, Any]:
+        """Step 3: route the claim and build (and cache, given a key) its result"""
+        rules = rules or self.rules
+        with trace.stage('route'):
+            source = str(Path(file_path).resolve()) if file_path is not None else None
+            routing_info = rules.router.determine_route(extracted_data, missing_fields, source)
+            if self.shadow is not None:
+                # Same extracted fields, so shadow mode costs no second parse
+                shadow_missing = self.shadow.validator.validate(extracted_data)
+                shadow_info = self.shadow.router.determine_route(extracted_data, shadow_missing, source)
+            if self.duplicates is not None and source is not None:
+                self.duplicates.add(extracted_data, source)
         
-        # Step 4: Prepare result in required format
+        # Prepare result in required format
         result = {
-            "extractedFields": extracted_data,
+            "extractedFields": extracted_data.to_dict(),
             "missingFields": missing_fields,
             "recommendedRoute": routing_info['route'],
-            "reasoning": routing_info['reasoning']
+            "reasoning": routing_info['reasoning'],
+            "configVersion": rules.version
         }
+        if rules.validator.policy_index is not None:
+            result["policyIssues"] = policy_issues
+        if self.shadow is not None:
+            result["shadowRoute"] = shadow_info['route']
         
+        if result_key is not None:
+            self.cache.put(ResultCache.RESULT, result_key, result)
         return result
     
+    def rules_fingerprint(self) -> str:
+        """Fingerprint of the validation and routing configuration"""
+        return self.rules.fingerprint()
+    
+    def process_batch(self, paths_or_glob: Union[str, os.PathLike, Iterable[str]],
+                      workers: Optional[int] = None, prefork: bool = False) -> Iterator[Dict[str, Any]]:
+        """Process many documents in parallel, yielding results in input order
+        
+        PDFs are parsed in a process pool (pdfplumber is CPU-bound), TXT files
+        in a thread pool. With ``prefork`` the processor is warmed up and the
+        worker processes are forked before the first document, and every
+        document goes to them, which scales TXT batches past one core. At
+        most ``workers * 4`` documents are in flight, so results stream out
+        as soon as every earlier document has finished. A failing document
+        yields an error result instead of stopping the batch.
+        """
+        workers = workers or os.cpu_count() or 1
+        max_in_flight = workers * 4
+        pending = deque()
+        process_pool = self._start_process_pool(workers) if prefork else None
+        
+        with ThreadPoolExecutor(max_workers=workers) as thread_pool:
+            try:
+                for file_path in expand_paths(paths_or_glob):
+                    if prefork or Path(file_path).suffix.lower() == '.pdf':
+                        if process_pool is None:
+                            # Started on the first PDF, like the PDF backend itself
+                            process_pool = self._start_process_pool(workers)
+                        future = process_pool.submit(_process_in_worker, file_path)
+                        pending.append((file_path, future, True))
+                    else:
+                        future = thread_pool.submit(self.process_document, file_path)
+                        pending.append((file_path, future, False))
+                    
+                    if len(pending) >= max_in_flight:
+                        yield self._collect(*pending.popleft())
+                
+                while pending:
+                    yield self._collect(*pending.popleft())
+            finally:
+                for _, future, _ in pending:
+                    future.cancel()
+                if process_pool is not None:
+                    process_pool.shutdown(cancel_futures=True)
+    
+    def _start_process_pool(self, workers: int):
+        """Warm up, then fork worker processes that share the warm state
+        
+        The garbage collector is frozen while the workers are forked, so
+        collections in the workers do not touch (and copy) the inherited
+        objects. Without fork the processor is pickled to each worker.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        self.warmup()
+        process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=_fork_context(),
+                                           initializer=_init_worker, initargs=(self,))
+        gc.freeze()
+        try:
+            # Forking pools start all their workers on the first submit
+            process_pool.submit(os.getpid)
+        finally:
+            gc.unfreeze()
+        return process_pool
+    
+    def _collect(self, file_path: str, future, in_worker: bool) -> Dict[str, Any]:
+        """Wait for one batch document and tag the result with its source"""
+        try:
+            result = future.result()
+            if in_worker:
+                result, trace = result
+                if trace is not None:
+                    self.metrics.observe(trace, result)
+        except Exception as e:
+            return error_result(file_path, e)
+        
+        return {"sourceFile": file_path, **result}
+    
+    def save_results(self, results: Iterable[Dict[str, Any]], output_file: str = "results.jsonl",
+                     format: Optional[str] = None) -> int:
+        """Stream many results to one JSON Lines, Parquet or Arrow file
+        
+        The format follows the file extension unless given. Results are
+        written as they arrive, so memory does not grow with the batch.
+        """
+        with open_writer(output_file, format) as writer:
+            return writer.write_all(results)
+    
     def save_result(self, result: Dict[str, Any], output_file: str = "result.json"):
         """Save result to JSON file"""
         with open(output_file, 'w', encoding='utf-8') as f:
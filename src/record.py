@@ -0,0 +1,152 @@
+# src/record.py - COMPACT CLAIM RECORD SHARED BY ALL STAGES
+import re
+import sys
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterator, Optional
+
+
+# Known claim fields, in output order. Each gets a slot; anything else is
+# kept in a small overflow dict.
+CLAIM_FIELDS = tuple(sys.intern(field) for field in (
+    'policy_number', 'policyholder_name', 'incident_date', 'incident_time', 'location',
+    'estimate_amount', 'estimated_damage', 'claim_type', 'asset_type', 'vin', 'description',
+))
+_FIELD_SET = frozenset(CLAIM_FIELDS)
+_ESTIMATE_FIELDS = frozenset(('estimate_amount', 'estimated_damage'))
+_UNPARSED = object()
+_NON_NUMERIC = re.compile(r'[^\d.]')
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """Parse a money amount such as "$45,000" to a float (None if not numeric)"""
+    if value is None:
+        return None
+    
+    try:
+        if isinstance(value, str):
+            cleaned = _NON_NUMERIC.sub('', value)
+            return float(cleaned) if cleaned else None
+        elif isinstance(value, (int, float)):
+            return float(value)
+    except (ValueError, TypeError):
+        return None
+    
+    return None
+
+
+class ClaimRecord(MutableMapping):
+    """Extracted claim fields in slots instead of a per-claim dict
+    
+    Parser, validator and router all work on the same record through the
+    usual mapping interface. The estimated damage is parsed to a float once
+    and cached. Records turn into plain dicts (or pydantic models) only at
+    the output boundary.
+    """
+    
+    __slots__ = CLAIM_FIELDS + ('_extra', '_damage')
+    
+    def __init__(self, fields: Optional[Dict[str, Any]] = None):
+        self._extra = None
+        self._damage = _UNPARSED
+        if fields:
+            for field, value in fields.items():
+                self[field] = value
+    
+    @classmethod
+    def from_dict(cls, fields: Dict[str, Any]) -> 'ClaimRecord':
+        return cls(fields)
+    
+    def __getitem__(self, field: str) -> Any:
+        if field in _FIELD_SET:
+            try:
+                return getattr(self, field)
+            except AttributeError:
+                raise KeyError(field) from None
+        if self._extra is None:
+            raise KeyError(field)
+        return self._extra[field]
+    
+    def get(self, field: str, default: Any = None) -> Any:
+        if field in _FIELD_SET:
+            return getattr(self, field, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(field, default)
+    
+    def __setitem__(self, field: str, value: Any):
+        if field in _FIELD_SET:
+            setattr(self, field, value)
+            if field in _ESTIMATE_FIELDS:
+                self._damage = _UNPARSED
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[sys.intern(field)] = value
+    
+    def __delitem__(self, field: str):
+        if field in _FIELD_SET:
+            try:
+                delattr(self, field)
+            except AttributeError:
+                raise KeyError(field) from None
+            if field in _ESTIMATE_FIELDS:
+                self._damage = _UNPARSED
+        elif self._extra is None:
+            raise KeyError(field)
+        else:
+            del self._extra[field]
+    
+    def __contains__(self, field: object) -> bool:
+        if field in _FIELD_SET:
+            return hasattr(self, field)
+        return self._extra is not None and field in self._extra
+    
+    def __iter__(self) -> Iterator[str]:
+        for field in CLAIM_FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"ClaimRecord({self.to_dict()!r})"
+    
+    def __getstate__(self):
+        return self.to_dict()
+    
+    def __setstate__(self, state):
+        self.__init__(state)
+    
+    def copy(self) -> 'ClaimRecord':
+        return ClaimRecord(self.to_dict())
+    
+    @property
+    def damage(self) -> Optional[float]:
+        """Estimated damage as a float, parsed once"""
+        if self._damage is _UNPARSED:
+            self._damage = parse_amount(self.get('estimated_damage') or self.get('estimate_amount'))
+        return self._damage
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the set fields, for JSON output and caching"""
+        fields = {field: getattr(self, field) for field in CLAIM_FIELDS if hasattr(self, field)}
+        if self._extra:
+            fields.update(self._extra)
+        return fields
+    
+    def to_model(self):
+        """The record as the FNOLData pydantic model"""
+        from .models import AssetDetails, FNOLData, IncidentInfo, PolicyInfo
+        
+        return FNOLData(
+            policy_info=PolicyInfo(policy_number=self.get('policy_number'),
+                                   policyholder_name=self.get('policyholder_name')),
+            incident_info=IncidentInfo(date=self.get('incident_date'), time=self.get('incident_time'),
+                                       location=self.get('location'), description=self.get('description')),
+            asset_details=AssetDetails(asset_type=self.get('asset_type'), asset_id=self.get('vin'),
+                                       estimated_damage=self.damage),
+            claim_type=self.get('claim_type'),
+        )
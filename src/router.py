@@ -1,130 +1,418 @@
-# src/router.py - WITH CONTEXT-AWARE FRAUD DETECTION
-import re
-from typing import Dict, Any, List
+# src/router.py - RULE-TABLE ROUTING WITH CONTEXT-AWARE FRAUD DETECTION
+import hashlib
+import json
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from pathlib import Path
 
+from .matcher import PhraseMatcher
+from .record import ClaimRecord, parse_amount
 
-class RoutingEngine:
-    """Make routing decisions based on extracted data"""
-    
-    def __init__(self):
-        # Strong fraud indicators (phrases that definitely indicate fraud)
-        self.strong_fraud_indicators = [
-            'potentially fraudulent',
-            'appears to be staged',
-            'fraudulent claim',
-            'false claim',
-            'fabricated'
-        ]
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "config" / "rules.json"
+
+# Missing-field sets are stored as int64 bitmasks in batch columns
+MAX_BATCH_BITS = 63
+
+
+def _numpy():
+    """Import numpy, which only batch routing needs"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Batch routing requires numpy (pip install numpy)")
+    return numpy
+
+
+def _render(template: str, **values):
+    """Format template for each row, once per distinct combination of values"""
+    np = _numpy()
+    codes = None
+    for column in values.values():
+        uniques, inverse = np.unique(column, return_inverse=True)
+        codes = inverse if codes is None else codes * len(uniques) + inverse
+    
+    if codes is None or len(codes) == 0:
+        return np.full(0 if codes is None else len(codes), template, dtype=object)
+    
+    _, first_rows, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    rendered = np.array([template.format(**{name: column[row] for name, column in values.items()})
+                         for row in first_rows], dtype=object)
+    return rendered[inverse.reshape(-1)]
+
+
+def load_rules(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the rule file (routing rules live under its "routing" key)"""
+    with open(path or DEFAULT_RULES_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class RoutingContext:
+    """Per-claim values shared by all rules while routing one claim"""
+    
+    def __init__(self, extracted_data: Dict[str, Any], missing_fields: List[str],
+                 source: Optional[str] = None):
+        self.extracted_data = extracted_data
+        self.missing_fields = missing_fields
+        # Where the claim came from, so it is never its own duplicate
+        self.source = source
+        self._lowered = {}
+    
+    @property
+    def damage(self) -> Optional[float]:
+        """Estimated damage as a number (a ClaimRecord parses it only once)"""
+        if isinstance(self.extracted_data, ClaimRecord):
+            return self.extracted_data.damage
+        return parse_amount(self.extracted_data.get('estimated_damage') or
+                            self.extracted_data.get('estimate_amount'))
+    
+    def text(self, field: str) -> str:
+        """Lower-cased field value, computed once per claim"""
+        if field not in self._lowered:
+            self._lowered[field] = str(self.extracted_data.get(field) or '').lower()
+        return self._lowered[field]
+
+
+class PhraseRule:
+    """Fire when any indicator phrase occurs in one of the rule's fields
+    
+    The first phrase in list order wins, so phrase order is priority order.
+    Exceptions skip a phrase when another field contains some text, e.g.
+    "suspicious" activity is normal in a theft claim.
+    """
+    
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec['name']
+        self.fields = spec['fields']
+        self.matcher = PhraseMatcher(phrase.lower() for phrase in spec['phrases'])
+        self.exceptions = {}
+        for exception in spec.get('exceptions', []):
+            self.exceptions.setdefault(exception['phrase'].lower(), []).append(
+                (exception['field'], exception['contains'].lower()))
+        self.route = spec['route']
+        self.reasoning = spec['reasoning']
+    
+    def match(self, context: RoutingContext) -> Optional[str]:
+        """Highest-priority phrase found in the claim, after exceptions"""
+        found = set()
+        for field in self.fields:
+            found |= self.matcher.find_all(context.text(field))
         
-        # Weak fraud indicators (might be normal in some contexts)
-        self.weak_fraud_indicators = [
-            'suspicious',
-            'inconsistent',
-            'questionable'
-        ]
+        for phrase in sorted(found, key=self.matcher.rank.__getitem__):
+            if not any(contains in context.text(field)
+                       for field, contains in self.exceptions.get(phrase, ())):
+                return phrase
+        return None
+    
+    def evaluate(self, context: RoutingContext) -> Optional[Tuple[str, str]]:
+        phrase = self.match(context)
+        if phrase is None:
+            return None
+        return self.route, self.reasoning.format(
+            phrase=phrase, claim_type=context.text('claim_type'))
+    
+    @property
+    def column(self) -> str:
+        """Batch column holding the rank of the phrase that matched a claim"""
+        return f"{self.name}_phrase"
+    
+    def phrase_rank(self, context: RoutingContext) -> int:
+        """Rank of the claim's matching phrase (after exceptions), -1 for none"""
+        phrase = self.match(context)
+        return -1 if phrase is None else self.matcher.rank[phrase]
+    
+    def evaluate_batch(self, columns, pending):
+        np = _numpy()
+        ranks = np.asarray(columns[self.column], dtype=np.int64)
+        fires = pending & (ranks >= 0)
+        phrases = np.array(self.matcher.phrases, dtype=object)[ranks[fires]]
+        if '{claim_type}' in self.reasoning:
+            reasoning = _render(self.reasoning, phrase=phrases,
+                                claim_type=np.asarray(columns['claim_type'], dtype=str)[fires])
+        else:
+            reasoning = _render(self.reasoning, phrase=phrases)
+        return fires, self.route, reasoning
+
+
+class MissingFieldsRule:
+    """Fire when any of the rule's mandatory fields is missing"""
+    
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec['name']
+        self.fields = spec['fields']
+        self.field_set = set(self.fields)
+        self.max_listed = spec.get('max_listed', 3)
+        self.route = spec['route']
+        self.reasoning = spec['reasoning']
+        self.field_bits = {}
+    
+    def evaluate(self, context: RoutingContext) -> Optional[Tuple[str, str]]:
+        # Fields outside the rule (not present in our sample files) are ignored
+        actual_missing = [f for f in context.missing_fields if f in self.field_set]
+        if not actual_missing:
+            return None
+        return self.route, self.reasoning.format(
+            missing=', '.join(actual_missing[:self.max_listed]))
+    
+    def evaluate_batch(self, columns, pending):
+        np = _numpy()
+        mask = sum(1 << bit for bit in self.field_bits.values())
+        missing = np.asarray(columns['missing_fields'], dtype=np.int64) & mask
+        fires = pending & (missing != 0)
         
-        # Injury indicators
-        self.injury_indicators = ['injury', 'medical', 'bodily', 'hospital']
+        # Fields are listed in the order of each claim's missing list, as in evaluate
+        orders, inverse = np.unique(np.asarray(columns['missing_order'], dtype=str)[fires],
+                                    return_inverse=True)
+        rendered = []
+        for order in orders.tolist():
+            listed = [field for field in order.split(',') if field in self.field_set]
+            rendered.append(self.reasoning.format(missing=', '.join(listed[:self.max_listed])))
+        return fires, self.route, np.array(rendered, dtype=object)[inverse.reshape(-1)]
+
+
+class DamageThresholdRule:
+    """Route on estimated damage below / at or above a threshold"""
+    
+    def __init__(self, spec: Dict[str, Any], engine: 'RoutingEngine'):
+        self.name = spec['name']
+        self.threshold = spec['threshold']
+        self.below = spec['below']
+        self.at_or_above = spec['at_or_above']
+        self.engine = engine
     
-    def determine_route(self, extracted_data: Dict[str, Any], 
-                       missing_fields: List[str]) -> Dict[str, str]:
-        """Determine the recommended route - FOLLOWING ASSESSMENT PRIORITY"""
+    def evaluate(self, context: RoutingContext) -> Optional[Tuple[str, str]]:
+        damage = context.damage
+        if damage is None:
+            return None
+        outcome = self.below if damage < self.threshold else self.at_or_above
+        return outcome['route'], outcome['reasoning'].format(
+            damage=damage, threshold=self.threshold)
+    
+    def evaluate_batch(self, columns, pending):
+        np = _numpy()
+        damage = np.asarray(columns['estimated_damage'], dtype=np.float64)
+        fires = pending & ~np.isnan(damage)
+        selected = damage[fires]
+        below = selected < self.threshold
         
-        reasoning_parts = []
+        routes = np.where(below, self.below['route'], self.at_or_above['route']).astype(object)
+        reasoning = np.empty(len(selected), dtype=object)
+        reasoning[below] = _render(self.below['reasoning'], damage=selected[below],
+                                   threshold=np.full(below.sum(), self.threshold))
+        reasoning[~below] = _render(self.at_or_above['reasoning'], damage=selected[~below],
+                                    threshold=np.full((~below).sum(), self.threshold))
+        return fires, routes, reasoning
+
+
+class DuplicateRule:
+    """Fire when the engine's DuplicateIndex holds an earlier copy of the claim
+    
+    Exact matches share policy number, VIN and date of loss; near matches
+    have a description at least ``similarity_threshold`` similar. Without a
+    duplicate index the rule never fires.
+    """
+    
+    def __init__(self, spec: Dict[str, Any], engine: 'RoutingEngine'):
+        self.name = spec['name']
+        self.threshold = spec.get('similarity_threshold', 0.7)
+        self.route = spec['route']
+        self.reasoning = spec['reasoning']
+        self.engine = engine
+    
+    def reasoning_for(self, context: RoutingContext) -> Optional[str]:
+        """Reasoning for a suspected duplicate, None if the claim looks new"""
+        index = self.engine.duplicate_index
+        if index is None:
+            return None
+        match = index.find(context.extracted_data, exclude_source=context.source,
+                           threshold=self.threshold)
+        if match is None:
+            return None
+        return self.reasoning[match['kind']].format(**match)
+    
+    def evaluate(self, context: RoutingContext) -> Optional[Tuple[str, str]]:
+        reasoning = self.reasoning_for(context)
+        if reasoning is None:
+            return None
+        return self.route, reasoning
+    
+    def evaluate_batch(self, columns, pending):
+        np = _numpy()
+        if self.column not in columns:
+            return np.zeros_like(pending), self.route, np.empty(0, dtype=object)
+        reasoning = np.asarray(columns[self.column], dtype=object)
+        fires = pending & np.array([value is not None for value in reasoning], dtype=bool)
+        return fires, self.route, reasoning[fires]
+    
+    @property
+    def column(self) -> str:
+        return f"{self.name}_reasoning"
+
+
+class DefaultRule:
+    """Always fires; use with the lowest priority"""
+    
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec['name']
+        self.route = spec['route']
+        self.reasoning = spec['reasoning']
+    
+    def evaluate(self, context: RoutingContext) -> Optional[Tuple[str, str]]:
+        return self.route, self.reasoning
+    
+    def evaluate_batch(self, columns, pending):
+        np = _numpy()
+        return pending.copy(), self.route, np.full(pending.sum(), self.reasoning, dtype=object)
+
+
+class RoutingEngine:
+    """Make routing decisions from a declarative, prioritised rule table"""
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None, duplicate_index=None):
+        # config is the "routing" section of the rule file
+        if config is None:
+            config = load_rules()['routing']
+        self.config = config
+        # DuplicateIndex consulted by "duplicate" rules; None disables them
+        self.duplicate_index = duplicate_index
+        self._fingerprint = None
+        self.rules = [self._compile_rule(spec)
+                      for spec in sorted(config['rules'], key=lambda spec: spec['priority'])]
         
-        # PRIORITY 1: Check for strong fraud indicators
-        description = extracted_data.get('description', '').lower()
-        for indicator in self.strong_fraud_indicators:
-            if indicator in description:
-                reasoning_parts.append(f"Description contains fraud indicator: '{indicator}'")
-                return {
-                    "route": "Investigation Flag",
-                    "reasoning": ". ".join(reasoning_parts)
-                }
+        # Bit positions of mandatory fields in the batch missing-field bitmask
+        self.missing_field_bits = {}
+        for rule in self.rules:
+            if isinstance(rule, MissingFieldsRule):
+                for field in rule.fields:
+                    self.missing_field_bits.setdefault(field, len(self.missing_field_bits))
+                rule.field_bits = {field: self.missing_field_bits[field] for field in rule.fields}
         
-        # PRIORITY 2: Check claim type for injury
-        claim_type = extracted_data.get('claim_type', '').lower()
-        for indicator in self.injury_indicators:
-            if indicator in claim_type or indicator in description:
-                reasoning_parts.append(f"Claim involves injury: '{claim_type}'")
-                return {
-                    "route": "Specialist Queue",
-                    "reasoning": ". ".join(reasoning_parts)
-                }
+        # Field texts that batch rules read directly (reasoning)
+        self.text_fields = ['claim_type']
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'RoutingEngine':
+        """Build an engine from a rule file"""
+        return cls(load_rules(path)['routing'])
+    
+    def _compile_rule(self, spec: Dict[str, Any]):
+        """Turn one rule table entry into an evaluable rule"""
+        rule_type = spec['type']
+        if rule_type == 'phrase':
+            return PhraseRule(spec)
+        if rule_type == 'missing_fields':
+            return MissingFieldsRule(spec)
+        if rule_type == 'damage_threshold':
+            return DamageThresholdRule(spec, self)
+        if rule_type == 'duplicate':
+            return DuplicateRule(spec, self)
+        if rule_type == 'default':
+            return DefaultRule(spec)
+        raise ValueError(f"Unknown routing rule type: {rule_type}")
+    
+    def config_fingerprint(self) -> str:
+        """Hash of the routing configuration, used to key cached results"""
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha256(
+                json.dumps(self.config, sort_keys=True).encode()).hexdigest()[:16]
+        return self._fingerprint
+    
+    def warmup(self, extracted_data: Dict[str, Any], missing_fields: List[str]):
+        """Evaluate every rule once, except those that query the duplicate index"""
+        context = RoutingContext(extracted_data, missing_fields)
+        for rule in self.rules:
+            if not isinstance(rule, DuplicateRule):
+                rule.evaluate(context)
+        self.config_fingerprint()
+    
+    def determine_route(self, extracted_data: Dict[str, Any], missing_fields: List[str],
+                        source: Optional[str] = None) -> Dict[str, str]:
+        """Determine the recommended route - first matching rule by priority"""
+        context = RoutingContext(extracted_data, missing_fields, source)
         
-        # PRIORITY 3: Check for missing mandatory fields
-        # According to brief: "If any mandatory field is missing → Manual review"
-        if missing_fields:
-            # But some fields might not be in our sample files
-            # Filter out fields that aren't in the sample data
-            sample_mandatory_fields = [
-                'policy_number', 'policyholder_name', 'incident_date',
-                'incident_time', 'location', 'description', 'asset_type',
-                'estimated_damage', 'claim_type'
-            ]
-            
-            actual_missing = [f for f in missing_fields if f in sample_mandatory_fields]
-            
-            if actual_missing:
-                missing_list = ', '.join(actual_missing[:3])
-                reasoning_parts.append(f"Missing mandatory fields: {missing_list}")
-                return {
-                    "route": "Manual Review",
-                    "reasoning": ". ".join(reasoning_parts)
-                }
+        for rule in self.rules:
+            decision = rule.evaluate(context)
+            if decision is not None:
+                route, reasoning = decision
+                return {"route": route, "reasoning": reasoning}
         
-        # PRIORITY 4: Check estimated damage
-        estimated_damage = self._extract_numeric_value(
-            extracted_data.get('estimated_damage') or 
-            extracted_data.get('estimate_amount')
-        )
+        return {
+            "route": "Manual Review",
+            "reasoning": "No routing rule matched"
+        }
+    
+    def claim_columns(self, claims: Iterable[Tuple]) -> Dict[str, Any]:
+        """Build the columnar batch that route_batch consumes
         
-        if estimated_damage is not None:
-            if estimated_damage < 25000:
-                reasoning_parts.append(f"Estimated damage (${estimated_damage:,.0f}) < $25,000")
-                return {
-                    "route": "Fast-track",
-                    "reasoning": ". ".join(reasoning_parts)
-                }
-            else:
-                reasoning_parts.append(f"Estimated damage (${estimated_damage:,.0f}) ≥ $25,000")
-                return {
-                    "route": "Standard Processing",
-                    "reasoning": ". ".join(reasoning_parts)
-                }
+        claims yields (extracted_data, missing_fields) pairs, or
+        (extracted_data, missing_fields, source) triples so that a claim
+        already in the duplicate index is not its own duplicate, as with
+        determine_route's source. Columns are
+        estimated_damage (float, NaN when absent), the lower-cased text fields
+        rules read, a missing-field bitmask, the claim's missing fields in
+        order (comma-joined) and, per phrase rule, the rank of the phrase
+        that matched (after exceptions; -1 for none). Only the phrase columns
+        depend on the phrase lists, so a threshold change can re-route the
+        same columns. With a duplicate index, duplicate rules get a column of
+        their reasoning (None for claims that look new).
+        """
+        np = _numpy()
+        phrase_rules = [rule for rule in self.rules if isinstance(rule, PhraseRule)]
+        if len(self.missing_field_bits) > MAX_BATCH_BITS:
+            raise ValueError("Too many mandatory fields for batch routing")
         
-        # PRIORITY 5: Check for weak fraud indicators (only if no other rules apply)
-        for indicator in self.weak_fraud_indicators:
-            if indicator in description:
-                # Check context - "suspicious activity" in theft claims is normal
-                if indicator == 'suspicious' and 'theft' in claim_type:
-                    continue  # Skip this - normal for theft claims
-                
-                reasoning_parts.append(f"Description contains '{indicator}'")
-                return {
-                    "route": "Investigation Flag",
-                    "reasoning": ". ".join(reasoning_parts)
-                }
+        damage, missing, missing_order = [], [], []
+        texts = {field: [] for field in self.text_fields}
+        phrases = {rule.column: [] for rule in phrase_rules}
+        duplicate_rules = [rule for rule in self.rules if isinstance(rule, DuplicateRule)
+                           and self.duplicate_index is not None]
+        duplicates = {rule.column: [] for rule in duplicate_rules}
+        for extracted_data, missing_fields, *source in claims:
+            context = RoutingContext(extracted_data, missing_fields, source[0] if source else None)
+            value = context.damage
+            damage.append(np.nan if value is None else value)
+            missing.append(sum(1 << self.missing_field_bits[field] for field in set(missing_fields)
+                               if field in self.missing_field_bits))
+            missing_order.append(','.join(missing_fields))
+            for field, column in texts.items():
+                column.append(context.text(field))
+            for rule in phrase_rules:
+                phrases[rule.column].append(rule.phrase_rank(context))
+            for rule in duplicate_rules:
+                duplicates[rule.column].append(rule.reasoning_for(context))
         
-        # Default route
-        reasoning_parts.append("All checks passed, no special conditions")
-        return {
-            "route": "Standard Processing",
-            "reasoning": ". ".join(reasoning_parts)
-        }
+        columns = {'estimated_damage': np.array(damage, dtype=np.float64),
+                   'missing_fields': np.array(missing, dtype=np.int64),
+                   'missing_order': np.array(missing_order, dtype=object)}
+        for field, column in texts.items():
+            columns[field] = np.array(column, dtype=object)
+        for name, column in phrases.items():
+            columns[name] = np.array(column, dtype=np.int64)
+        for name, column in duplicates.items():
+            columns[name] = np.array(column, dtype=object)
+        return columns
     
-    def _extract_numeric_value(self, value: Any) -> float:
-        """Extract numeric value from string"""
-        if value is None:
-            return None
+    def route_batch(self, columns) -> Dict[str, Any]:
+        """Route a columnar batch of claims with vectorized rule evaluation
         
-        try:
-            if isinstance(value, str):
-                cleaned = re.sub(r'[^\d.]', '', value)
-                return float(cleaned) if cleaned else None
-            elif isinstance(value, (int, float)):
-                return float(value)
-        except (ValueError, TypeError):
-            return None
+        columns maps column names (see claim_columns) to arrays; a dict of
+        numpy arrays, a pandas DataFrame or a pyarrow Table all work. Returns
+        numpy arrays of route, reason_code (name of the deciding rule) and
+        reasoning, identical to calling determine_route per claim.
+        """
+        np = _numpy()
+        size = len(np.asarray(columns['estimated_damage']))
+        routes = np.full(size, "Manual Review", dtype=object)
+        reason_codes = np.full(size, "no_match", dtype=object)
+        reasoning = np.full(size, "No routing rule matched", dtype=object)
+        pending = np.ones(size, dtype=bool)
+        
+        for rule in self.rules:
+            if not pending.any():
+                break
+            fires, route, rule_reasoning = rule.evaluate_batch(columns, pending)
+            routes[fires] = route
+            reason_codes[fires] = rule.name
+            reasoning[fires] = rule_reasoning
+            pending &= ~fires
         
-        return None
\ No newline at end of file
+        return {"route": routes, "reason_code": reason_codes, "reasoning": reasoning}
\ No newline at end of file
@@ -0,0 +1,267 @@
+# src/service.py - HTTP INTAKE SERVICE WITH A WARM PROCESSOR
+import json
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+from .metrics import PrometheusSink
+from .processor import FNOLProcessor, SUPPORTED_SUFFIXES, error_result
+
+
+class ServiceBusy(Exception):
+    """Raised when every worker slot and queue slot is taken"""
+
+
+class ServiceError(Exception):
+    """Request error carrying an HTTP status code"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ClaimService:
+    """Keep one warm FNOLProcessor behind a bounded worker pool
+    
+    At most ``workers`` documents are processed at once and at most
+    ``queue_size`` more may wait; anything beyond that is rejected straight
+    away so clients can back off instead of piling up requests.
+    """
+    
+    def __init__(self, processor: Optional[FNOLProcessor] = None, workers: int = 4,
+                 queue_size: int = 16, root: str = ".", batch_workers: Optional[int] = None,
+                 max_upload_bytes: int = 50 * 1024 * 1024):
+        self.processor = processor or FNOLProcessor()
+        self.root = Path(root).resolve()
+        self.batch_workers = batch_workers or workers
+        self.max_upload_bytes = max_upload_bytes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fnol-worker")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+    
+    def run(self, fn, *args):
+        """Run fn in the worker pool, or raise ServiceBusy if the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusy("All workers are busy, retry later")
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+    
+    def resolve_path(self, file_path: str) -> Path:
+        """Resolve a client-supplied path, which must stay inside the service root"""
+        path = (self.root / file_path).resolve()
+        if self.root not in path.parents:
+            raise ServiceError(403, f"Path outside service root: {file_path}")
+        return path
+    
+    def process_path(self, file_path: str) -> Dict[str, Any]:
+        """Process a document already on the server's disk"""
+        path = self.resolve_path(file_path)
+        if not path.is_file():
+            raise ServiceError(404, f"File not found: {file_path}")
+        self._check_suffix(path.name)
+        return self.run(self.processor.process_document, str(path))
+    
+    def process_upload(self, filename: str, data: bytes) -> Dict[str, Any]:
+        """Process uploaded document bytes
+        
+        The upload keeps its original file name, since the parser infers
+        missing fields from it.
+        """
+        name = Path(filename).name
+        self._check_suffix(name)
+        upload_dir = tempfile.mkdtemp(prefix="fnol-upload-")
+        try:
+            path = Path(upload_dir) / name
+            path.write_bytes(data)
+            return self.run(self.processor.process_document, str(path))
+        finally:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+    
+    def process_paths(self, paths: List[str]) -> List[Dict[str, Any]]:
+        """Process several server-side documents as one batch, results in input order
+        
+        The documents run on the service's worker pool, each holding a slot
+        while it waits or runs, so batches stay within the same bounds as
+        single documents. Up to ``batch_workers`` documents of a batch are in
+        flight, as many as free slots allow; a failing document yields an
+        error result.
+        """
+        resolved = [str(self.resolve_path(file_path)) for file_path in paths]
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusy("All workers are busy, retry later")
+        held = 1
+        pending = deque()
+        results = []
+        try:
+            for file_path in resolved:
+                if len(pending) >= held:
+                    if held < self.batch_workers and self._slots.acquire(blocking=False):
+                        held += 1
+                    else:
+                        # Reuse the slot of the oldest document in flight
+                        results.append(self._collect(*pending.popleft()))
+                pending.append((file_path, self._executor.submit(self.processor.process_document, file_path)))
+            while pending:
+                results.append(self._collect(*pending.popleft()))
+        finally:
+            for _, future in pending:
+                future.cancel()
+            for _ in range(held):
+                self._slots.release()
+        return results
+    
+    @staticmethod
+    def _collect(file_path: str, future) -> Dict[str, Any]:
+        try:
+            return {"sourceFile": file_path, **future.result()}
+        except Exception as e:
+            return error_result(file_path, e)
+    
+    def _check_suffix(self, name: str):
+        """Reject unsupported document formats up front"""
+        if Path(name).suffix.lower() not in SUPPORTED_SUFFIXES:
+            raise ServiceError(415, f"Unsupported file format: {Path(name).suffix}")
+    
+    def shutdown(self):
+        """Stop the worker pool"""
+        self._executor.shutdown(wait=True)
+
+
+class ClaimRequestHandler(BaseHTTPRequestHandler):
+    """HTTP routes: GET /health, GET /metrics, POST /process, POST /batch"""
+    
+    service: ClaimService = None
+    server_version = "FNOLService/1.0"
+    
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/metrics":
+            self._send_metrics()
+        else:
+            self._send_json(404, {"error": "Not found"})
+    
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            if url.path == "/process":
+                self._send_json(200, self._handle_process(url))
+            elif url.path == "/batch":
+                self._send_json(200, self._handle_batch())
+            else:
+                self._send_json(404, {"error": "Not found"})
+        except ServiceBusy as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "1"})
+        except ServiceError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {"error": f"Bad request: {e}"})
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+    
+    def _handle_process(self, url) -> Dict[str, Any]:
+        """Process one document given as a JSON path, multipart upload or raw body"""
+        content_type = self.headers.get('Content-Type', '')
+        
+        if content_type.startswith('application/json'):
+            return self.service.process_path(self._read_json()['path'])
+        
+        if content_type.startswith('multipart/form-data'):
+            uploads = self._read_multipart()
+            if len(uploads) != 1:
+                raise ServiceError(400, "Expected exactly one uploaded file")
+            return self.service.process_upload(*uploads[0])
+        
+        # Raw body: file name comes from ?filename= or the X-Filename header
+        filename = parse_qs(url.query).get('filename', [None])[0] or self.headers.get('X-Filename')
+        if not filename:
+            raise ServiceError(400, "Missing filename for raw upload")
+        return self.service.process_upload(filename, self._read_body())
+    
+    def _handle_batch(self) -> List[Dict[str, Any]]:
+        """Process several documents given as JSON paths or multipart uploads"""
+        content_type = self.headers.get('Content-Type', '')
+        
+        if content_type.startswith('multipart/form-data'):
+            return [self.service.process_upload(name, data) for name, data in self._read_multipart()]
+        
+        paths = self._read_json()['paths']
+        if not isinstance(paths, list):
+            raise ValueError("'paths' must be a list")
+        return self.service.process_paths(paths)
+    
+    def _content_length(self) -> int:
+        length = int(self.headers.get('Content-Length', 0))
+        if length > self.service.max_upload_bytes:
+            raise ServiceError(413, f"Request body larger than {self.service.max_upload_bytes} bytes")
+        return length
+    
+    def _read_body(self) -> bytes:
+        return self.rfile.read(self._content_length())
+    
+    def _read_json(self) -> Dict[str, Any]:
+        return json.loads(self._read_body() or b'{}')
+    
+    def _read_multipart(self) -> List[Tuple[str, bytes]]:
+        """Parse uploaded files with python-multipart"""
+        try:
+            from python_multipart import parse_form
+        except ImportError:
+            from multipart import parse_form
+        
+        uploads = []
+        
+        def on_file(file):
+            file.file_object.seek(0)
+            uploads.append((file.file_name.decode('utf-8', 'ignore'), file.file_object.read()))
+        
+        headers = {'Content-Type': self.headers['Content-Type'].encode('latin-1'),
+                   'Content-Length': str(self._content_length()).encode('latin-1')}
+        parse_form(headers, self.rfile, lambda field: None, on_file)
+        return uploads
+    
+    def _send_metrics(self):
+        """Prometheus metrics of the warm processor, if it records any"""
+        metrics = self.service.processor.metrics
+        sink = metrics.sink(PrometheusSink) if metrics is not None else None
+        if sink is None:
+            self._send_json(404, {"error": "Metrics are not enabled"})
+            return
+        body = sink.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, status: int, payload: Any, extra_headers: Dict[str, str] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Access logs per claim would dominate latency at high request rates
+        pass
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8000,
+                  service: Optional[ClaimService] = None) -> ThreadingHTTPServer:
+    """Build an HTTP server bound to a (warm) ClaimService"""
+    handler = type("BoundClaimRequestHandler", (ClaimRequestHandler,),
+                   {"service": service or ClaimService()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
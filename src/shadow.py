@@ -0,0 +1,184 @@
+# src/shadow.py - SHADOW EVALUATION OF CANDIDATE RULES
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from .cache import ResultCache
+from .parser import DocumentParser
+from .processor import _fork_context
+from .record import ClaimRecord
+from .router import RoutingEngine
+from .ruleset import RuleSet
+
+
+class ShadowReport:
+    """Aggregated route changes between the live rules and a candidate
+    
+    Counts every (live route, candidate route) pair and keeps the first
+    ``max_samples`` claim ids of each pair that changes route. Reports of
+    separate shards merge into one.
+    """
+    
+    def __init__(self, live_version: str = '', candidate_version: str = '', max_samples: int = 5):
+        self.live_version = live_version
+        self.candidate_version = candidate_version
+        self.max_samples = max_samples
+        self.transitions: Dict[Tuple[str, str], int] = {}
+        self.samples: Dict[Tuple[str, str], List[str]] = {}
+        self.claims = 0
+        self._lock = threading.Lock()
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    @property
+    def changed(self) -> int:
+        return sum(count for (live, candidate), count in self.transitions.items() if live != candidate)
+    
+    def add(self, claim_id: str, live_route: str, candidate_route: str):
+        pair = (live_route, candidate_route)
+        with self._lock:
+            self.claims += 1
+            self.transitions[pair] = self.transitions.get(pair, 0) + 1
+            if live_route != candidate_route:
+                samples = self.samples.setdefault(pair, [])
+                if len(samples) < self.max_samples:
+                    samples.append(claim_id)
+    
+    def observe(self, result: Dict[str, Any]):
+        """Count a processed result that carries a shadowRoute"""
+        if 'shadowRoute' in result:
+            self.add(result.get('sourceFile', ''), result['recommendedRoute'], result['shadowRoute'])
+    
+    def merge(self, other: 'ShadowReport') -> 'ShadowReport':
+        with self._lock:
+            self.claims += other.claims
+            for pair, count in other.transitions.items():
+                self.transitions[pair] = self.transitions.get(pair, 0) + count
+            for pair, claim_ids in other.samples.items():
+                samples = self.samples.setdefault(pair, [])
+                samples.extend(claim_ids[:self.max_samples - len(samples)])
+        return self
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Transition matrix (live route -> candidate route -> claims) and the changed routes"""
+        matrix: Dict[str, Dict[str, int]] = {}
+        for (live, candidate), count in sorted(self.transitions.items()):
+            matrix.setdefault(live, {})[candidate] = count
+        changed = sorted(((pair, count) for pair, count in self.transitions.items() if pair[0] != pair[1]),
+                         key=lambda item: (-item[1], item[0]))
+        return {
+            "liveVersion": self.live_version,
+            "candidateVersion": self.candidate_version,
+            "claims": self.claims,
+            "changed": self.changed,
+            "changedShare": round(self.changed / self.claims, 4) if self.claims else 0.0,
+            "matrix": matrix,
+            "transitions": [{"from": live, "to": candidate, "count": count,
+                             "sampleClaims": self.samples.get((live, candidate), [])}
+                            for (live, candidate), count in changed],
+        }
+
+
+def route_claims(rules: RuleSet, claims: List[ClaimRecord]) -> List[str]:
+    """Routes of many claims under one rule set, with vectorized rule evaluation
+    
+    Rule sets that batch routing cannot take (more mandatory fields than fit
+    a bitmask, or no numpy) are routed claim by claim instead.
+    """
+    router = rules.router
+    missing = [rules.validator.validate(claim) for claim in claims]
+    try:
+        columns = router.claim_columns(zip(claims, missing))
+    except (ImportError, ValueError):
+        return [router.determine_route(claim, fields)['route'] for claim, fields in zip(claims, missing)]
+    return router.route_batch(columns)['route'].tolist()
+
+
+def compare_claims(live: RuleSet, candidate: RuleSet, claim_ids: List[str],
+                   claims: List[ClaimRecord], max_samples: int = 5) -> ShadowReport:
+    """Route the same extracted claims under both rule sets"""
+    report = ShadowReport(live.version, candidate.version, max_samples)
+    if claims:
+        for claim_id, live_route, candidate_route in zip(
+                claim_ids, route_claims(live, claims), route_claims(candidate, claims)):
+            report.add(claim_id, live_route, candidate_route)
+    return report
+
+
+def _without_duplicates(rules: RuleSet) -> RuleSet:
+    if rules.router.duplicate_index is None:
+        return rules
+    return rules.replace(router=RoutingEngine(rules.router.config))
+
+
+# Set in each replay worker by _init_replay_worker
+_replay_state = None
+
+
+def _init_replay_worker(cache: ResultCache, live: RuleSet, candidate: RuleSet,
+                        parser_version: Optional[str], max_samples: int):
+    global _replay_state
+    # A forked worker inherits the parent's connection; it opens its own
+    cache = ResultCache(**cache.__getstate__())
+    _replay_state = (cache, DocumentParser(), live, candidate, parser_version, max_samples)
+
+
+def _replay_span(first: int, last: int) -> ShadowReport:
+    """Compare both rule sets on the cached extractions in one rowid span"""
+    cache, parser, live, candidate, parser_version, max_samples = _replay_state
+    claim_ids, claims = [], []
+    for key, value in cache.iter_entries(ResultCache.EXTRACTION, first, last):
+        document, _, version = key.partition(':')
+        if parser_version is not None and version != parser_version:
+            continue
+        claim = ClaimRecord.from_dict(value)
+        # The file name is not cached, so only content-based inference applies
+        parser._infer_missing_fields(claim, '')
+        claim_ids.append(document)
+        claims.append(claim)
+    return compare_claims(live, candidate, claim_ids, claims, max_samples)
+
+
+def replay_cache(cache: ResultCache, live: RuleSet, candidate: RuleSet, workers: Optional[int] = None,
+                 span: int = 20000, parser_version: Optional[str] = None,
+                 max_samples: int = 5) -> ShadowReport:
+    """Route every cached extraction under the live and the candidate rules
+    
+    No document is parsed again. The cache is read in rowid spans of
+    ``span`` entries, each routed in columns by a worker process (forked,
+    where possible, after the rule sets are compiled); the partial reports
+    are merged in span order, so the samples do not depend on timing. With
+    ``parser_version`` only extractions of that parser version are used, so
+    a document cached by several versions counts once. Duplicate rules are
+    not evaluated, as they depend on the order claims arrived in.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    live, candidate = _without_duplicates(live), _without_duplicates(candidate)
+    report = ShadowReport(live.version, candidate.version, max_samples)
+    bounds = cache.rowid_bounds(ResultCache.EXTRACTION)
+    if bounds is None:
+        return report
+    spans = [(first, min(first + span - 1, bounds[1])) for first in range(bounds[0], bounds[1] + 1, span)]
+    initargs = (cache, live, candidate, parser_version, max_samples)
+    
+    if workers == 1 or len(spans) == 1:
+        _init_replay_worker(*initargs)
+        try:
+            for first, last in spans:
+                report.merge(_replay_span(first, last))
+        finally:
+            _replay_state[0].close()
+        return report
+    
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_fork_context(),
+                             initializer=_init_replay_worker, initargs=initargs) as pool:
+        for partial in pool.map(_replay_span, *zip(*spans)):
+            report.merge(partial)
+    return report
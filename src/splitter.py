@@ -0,0 +1,68 @@
+# src/splitter.py - SPLIT BUNDLED FNOL DOCUMENTS INTO CLAIMS
+import mmap
+import re
+from typing import Iterable, Iterator, List
+from pathlib import Path
+
+# A claim starts at a line beginning with its policy number label
+DEFAULT_CLAIM_HEADER = r'^[ \t]*POLICY[ \t]*(?:NO\.?|NUMBER|#)'
+
+
+class ClaimSplitter:
+    """Segment a document holding many claims, one linear scan per document
+
+    Each claim starts at a line matching ``header`` (by default its
+    "POLICY NUMBER" line); any text before the second header belongs to the
+    first claim, so a single-claim document is one segment. TXT files are
+    memory-mapped and only one claim's text is decoded at a time; PDFs are
+    split as their pages stream in.
+    """
+
+    def __init__(self, header: str = DEFAULT_CLAIM_HEADER):
+        self.header = header
+        self.pattern = re.compile(header, re.IGNORECASE | re.MULTILINE)
+        self.byte_pattern = re.compile(header.encode('ascii'), re.IGNORECASE | re.MULTILINE)
+
+    def split_text(self, text: str) -> List[str]:
+        """Claim texts of an in-memory document"""
+        return list(self.iter_chunks([text]))
+
+    def iter_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Claim texts from consecutive pieces of a document, e.g. PDF pages
+
+        Pieces are joined with a newline. Text is held only until the next
+        header shows where its claim ends.
+        """
+        buffer = ''
+        first_header = True
+        for chunk in chunks:
+            # Headers start a line, so only the new text needs scanning
+            start = len(buffer)
+            buffer += chunk + '\n'
+            cut = 0
+            for match in self.pattern.finditer(buffer, start):
+                if first_header:
+                    first_header = False
+                    continue
+                yield buffer[cut:match.start()]
+                cut = match.start()
+            buffer = buffer[cut:]
+        if buffer.strip():
+            yield buffer
+
+    def iter_txt(self, file_path: Path, encoding: str = 'utf-8') -> Iterator[str]:
+        """Claim texts of a TXT file, read through a memory map"""
+        with open(file_path, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                cut = 0
+                first_header = True
+                for match in self.byte_pattern.finditer(data):
+                    if first_header:
+                        first_header = False
+                        continue
+                    yield data[cut:match.start()].decode(encoding, errors='ignore')
+                    cut = match.start()
+                if data[cut:].strip():
+                    yield data[cut:].decode(encoding, errors='ignore')
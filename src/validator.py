@@ -1,36 +1,47 @@
 # src/validator.py - UPDATED
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import hashlib
+import json
 import re
 
+from .record import ClaimRecord, parse_amount
+from .router import load_rules
+
+_DATE_PATTERNS = [
+    re.compile(r'\d{1,2}/\d{1,2}/\d{4}'),
+    re.compile(r'\d{4}-\d{2}-\d{2}'),
+]
+
 
 class FieldValidator:
     """Validate extracted fields and identify missing ones"""
     
-    def __init__(self):
-        self.mandatory_fields = [
-            'policy_number',
-            'policyholder_name', 
-            'incident_date',
-            'incident_time',
-            'location',
-            'description',
-            'claimant',
-            'asset_type',
-            'estimated_damage',  # Accepts both estimated_damage and estimate_amount
-            'claim_type',
-            'initial_estimate'
-        ]
+    def __init__(self, config: Optional[Dict[str, Any]] = None, policy_index=None):
+        # config is the "validation" section of the rule file
+        if config is None:
+            config = load_rules()['validation']
+        self.config = config
+        # PolicyIndex snapshot for policy checks; None skips them
+        self.policy_index = policy_index
+        # estimated_damage accepts estimate_amount as well
+        self.mandatory_fields = list(config['mandatory_fields'])
+    
+    def config_fingerprint(self) -> str:
+        """Hash of the validation configuration, used to key cached results"""
+        config = {'mandatory_fields': self.mandatory_fields}
+        if self.policy_index is not None:
+            config['policy_snapshot'] = self.policy_index.version
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
     
     def validate(self, extracted_data: Dict[str, Any]) -> List[str]:
         """Identify missing mandatory fields"""
         missing_fields = []
         
-        # Map estimate_amount to estimated_damage if present
-        if 'estimate_amount' in extracted_data and 'estimated_damage' not in extracted_data:
-            extracted_data['estimated_damage'] = extracted_data['estimate_amount']
-        
         for field in self.mandatory_fields:
             value = extracted_data.get(field)
+            if field == 'estimated_damage' and value is None:
+                # estimate_amount counts as estimated_damage
+                value = extracted_data.get('estimate_amount')
             
             # For description, check if it's not just a single word
             if field == 'description' and value:
@@ -44,6 +55,14 @@ class FieldValidator:
         
         return missing_fields
     
+    def check_policy(self, extracted_data: Dict[str, Any]) -> List[str]:
+        """Report unknown or inactive policies and losses outside the effective dates"""
+        if self.policy_index is None or not extracted_data.get('policy_number'):
+            return []
+        issue = self.policy_index.check(extracted_data['policy_number'],
+                                        extracted_data.get('incident_date'))
+        return [issue] if issue else []
+    
     def check_inconsistencies(self, extracted_data: Dict[str, Any]) -> List[str]:
         """Check for data inconsistencies"""
         inconsistencies = []
@@ -61,32 +80,19 @@ class FieldValidator:
         for field in estimate_fields:
             value = extracted_data.get(field)
             if value:
-                if not self._is_numeric(value):
+                if field == 'estimated_damage' and isinstance(extracted_data, ClaimRecord):
+                    # Parsed once per claim and shared with the router
+                    amount = extracted_data.damage
+                else:
+                    amount = parse_amount(value)
+                if amount is None:
                     inconsistencies.append(f"{field} is not a valid number: {value}")
         
         return inconsistencies
     
     def _is_valid_date(self, date_str: str) -> bool:
         """Simple date validation"""
-        patterns = [
-            r'\d{1,2}/\d{1,2}/\d{4}',
-            r'\d{4}-\d{2}-\d{2}',
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, str(date_str)):
-                return True
-        return False
-    
-    def _is_numeric(self, value: Any) -> bool:
-        """Check if value is numeric"""
-        try:
-            if isinstance(value, str):
-                # Remove commas and currency symbols
-                cleaned = re.sub(r'[^\d\.]', '', value)
-                float(cleaned)
-            elif isinstance(value, (int, float)):
+        for pattern in _DATE_PATTERNS:
+            if pattern.match(str(date_str)):
                 return True
-            return True
-        except (ValueError, TypeError):
-            return False
\ No newline at end of file
+        return False
\ No newline at end of file
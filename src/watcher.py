@@ -0,0 +1,302 @@
+# src/watcher.py - INCREMENTAL WATCH-FOLDER INGESTION
+import ctypes
+import ctypes.util
+import os
+import select
+import sqlite3
+import struct
+import threading
+import time
+from typing import Dict, Callable, Iterable, List, Optional, Set, Tuple
+from pathlib import Path
+
+from .cache import hash_file
+from .processor import FNOLProcessor, SUPPORTED_SUFFIXES
+
+# inotify event masks (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class ProcessedIndex:
+    """Persistent SQLite index of processed files: path, size, mtime and content hash
+    
+    It also remembers each watched directory's mtime, so a restart can tell
+    whether anything was added or removed while the watcher was down.
+    """
+    
+    def __init__(self, path: str = "fnol_index.sqlite"):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL, route TEXT, processed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS directories (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL)")
+        self._conn.commit()
+    
+    def lookup(self, paths: Iterable[str], chunk_size: int = 500) -> Dict[str, Tuple[int, int, str]]:
+        """(size, mtime_ns, sha256) of the given paths that are in the index"""
+        paths = list(paths)
+        found = {}
+        with self._lock:
+            for start in range(0, len(paths), chunk_size):
+                chunk = paths[start:start + chunk_size]
+                rows = self._conn.execute(
+                    f"SELECT path, size, mtime_ns, sha256 FROM files WHERE path IN ({','.join('?' * len(chunk))})",
+                    chunk)
+                for path, size, mtime_ns, sha256 in rows:
+                    found[path] = (size, mtime_ns, sha256)
+        return found
+    
+    def record(self, entries: Iterable[Tuple[str, int, int, str, Optional[str]]]):
+        """Store (path, size, mtime_ns, sha256, route) entries in one transaction"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, route, processed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(*entry, now) for entry in entries])
+            self._conn.commit()
+    
+    def paths_in(self, directory: str) -> Set[str]:
+        """Indexed paths of the files directly inside a directory"""
+        prefix = os.path.join(directory, '')
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM files WHERE path >= ? AND path < ?",
+                (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))).fetchall()
+        return {path for path, in rows if os.path.dirname(path) == directory}
+    
+    def directory_mtime(self, directory: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns FROM directories WHERE path = ?", (directory,)).fetchone()
+        return row[0] if row else None
+    
+    def set_directory_mtime(self, directory: str, mtime_ns: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)", (directory, mtime_ns))
+            self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class InotifyWatch:
+    """Minimal ctypes inotify binding for one directory (Linux only)
+    
+    Reports files that were closed after writing or moved into the directory,
+    so half-written uploads are not picked up.
+    """
+    
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+    
+    def read(self, timeout: float) -> Tuple[Set[str], bool]:
+        """File names with events within timeout, and whether events were lost"""
+        names, overflow = set(), False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return names, overflow
+        
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & (IN_Q_OVERFLOW | IN_IGNORED):
+                    overflow = True
+                elif name:
+                    names.add(os.fsdecode(name))
+        return names, overflow
+    
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """Process new or changed FNOL files dropped into a directory
+    
+    Every processed file is recorded in a ProcessedIndex, so only new or
+    changed files (by size and mtime, then content hash) are processed again,
+    also across restarts. With inotify a cycle only looks at the files named
+    in events, so its cost follows the number of new files. When polling, the
+    directory is only listed when its mtime has changed, and only names not
+    yet in the index are stat'ed and looked up; the listing itself still
+    grows with the directory. ``full_scan_interval`` seconds apart every file
+    is checked, to catch files rewritten in place.
+    """
+    
+    def __init__(self, directory: str, processor: Optional[FNOLProcessor] = None,
+                 index: Optional[ProcessedIndex] = None, on_result: Optional[Callable] = None,
+                 interval: float = 2.0, workers: Optional[int] = None, use_inotify: bool = True,
+                 settle_seconds: float = 1.0, full_scan_interval: float = 3600.0):
+        self.directory = str(Path(directory).resolve())
+        self.processor = processor or FNOLProcessor()
+        self.index = index if index is not None else ProcessedIndex()
+        self.on_result = on_result
+        self.interval = interval
+        self.workers = workers
+        self.settle_seconds = settle_seconds
+        self.full_scan_interval = full_scan_interval
+        self._inotify = None
+        if use_inotify:
+            try:
+                self._inotify = InotifyWatch(self.directory)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable ({e}), polling every {interval}s")
+        # Files seen while still being written, checked again next cycle
+        self._unsettled: Set[str] = set()
+        # Indexed paths in the directory, loaded on the first listing
+        self._known: Optional[Set[str]] = None
+        self._reconciled = False
+        self._last_full_scan = time.time()
+    
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify is not None else "polling"
+    
+    def _list_directory(self) -> List[str]:
+        """All supported files in the directory"""
+        with os.scandir(self.directory) as entries:
+            return [entry.path for entry in entries
+                    if entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_SUFFIXES]
+    
+    def _scan_if_changed(self, force: bool = False) -> List[str]:
+        """List the directory, unless its mtime shows nothing was added or removed
+        
+        Only files the index does not know are returned, unless ``force`` asks
+        for every file.
+        """
+        mtime_ns = os.stat(self.directory).st_mtime_ns
+        # A very recent mtime may hide a second change within the same timestamp tick
+        settled = time.time() - mtime_ns / 1e9 > self.settle_seconds
+        if not force and settled and self.index.directory_mtime(self.directory) == mtime_ns:
+            return []
+        files = self._list_directory()
+        self._last_full_scan = time.time()
+        if settled:
+            self.index.set_directory_mtime(self.directory, mtime_ns)
+        if force:
+            return files
+        if self._known is None:
+            self._known = self.index.paths_in(self.directory)
+        return [path for path in files if path not in self._known]
+    
+    def _changed(self, paths: Iterable[str]) -> List[Tuple[str, int, int, str]]:
+        """(path, size, mtime_ns, sha256) of candidates that are new or changed"""
+        paths = sorted(set(paths))
+        known = self.index.lookup(paths)
+        changed, touched = [], []
+        now = time.time()
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self._unsettled.discard(path)
+                continue
+            # inotify only reports files once they are closed after writing
+            if self._inotify is None and now - stat.st_mtime_ns / 1e9 < self.settle_seconds:
+                self._unsettled.add(path)
+                continue
+            self._unsettled.discard(path)
+            
+            entry = known.get(path)
+            if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+                continue
+            sha256 = hash_file(path)
+            if entry is not None and entry[2] == sha256:
+                # Touched but not changed: remember the new mtime only
+                touched.append((path, stat.st_size, stat.st_mtime_ns, sha256, None))
+                continue
+            changed.append((path, stat.st_size, stat.st_mtime_ns, sha256))
+        if touched:
+            self.index.record(touched)
+        return changed
+    
+    def _process(self, changed: List[Tuple[str, int, int, str]]) -> int:
+        """Process changed files and record them in the index"""
+        if not changed:
+            return 0
+        entries = {path: (size, mtime_ns, sha256) for path, size, mtime_ns, sha256 in changed}
+        processed = []
+        for result in self.processor.process_batch(list(entries), workers=self.workers):
+            path = result['sourceFile']
+            if self.on_result is not None:
+                self.on_result(result)
+            processed.append((path, *entries[path], result['recommendedRoute']))
+            if self._known is not None:
+                self._known.add(path)
+            # Record in small batches so a crash loses little work
+            if len(processed) >= 100:
+                self.index.record(processed)
+                processed = []
+        self.index.record(processed)
+        return len(changed)
+    
+    def run_once(self, timeout: float = 0.0, full_scan: bool = False) -> int:
+        """One watch cycle; returns the number of files processed
+        
+        The first cycle reconciles the directory with the index, listing it
+        only if its mtime changed while the watcher was not running.
+        """
+        candidates = set(self._unsettled)
+        if not self._reconciled and not full_scan:
+            self._reconciled = True
+            candidates.update(self._scan_if_changed())
+        elif full_scan or time.time() - self._last_full_scan >= self.full_scan_interval:
+            candidates.update(self._scan_if_changed(force=True))
+        elif self._inotify is not None:
+            names, overflow = self._inotify.read(timeout)
+            if overflow:
+                candidates.update(self._scan_if_changed(force=True))
+            candidates.update(os.path.join(self.directory, name) for name in names
+                              if os.path.splitext(name)[1].lower() in SUPPORTED_SUFFIXES)
+        else:
+            if timeout:
+                time.sleep(timeout)
+            candidates.update(self._scan_if_changed())
+        return self._process(self._changed(candidates))
+    
+    def run(self, stop: Optional[threading.Event] = None, max_cycles: Optional[int] = None):
+        """Watch until stop is set (or max_cycles have run)"""
+        stop = stop or threading.Event()
+        cycles = 0
+        while not stop.is_set() and (max_cycles is None or cycles < max_cycles):
+            self.run_once(timeout=self.interval if cycles else 0.0)
+            cycles += 1
+    
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self.index.close()
@@ -0,0 +1,178 @@
+# src/writers.py - BUFFERED BULK RESULT WRITERS
+import json
+import os
+from typing import Dict, Any, Iterable, List, Optional
+from pathlib import Path
+
+from .extractor import DEFAULT_EXTRACTOR
+
+
+def _json_encoder(name: str):
+    """dumps() of the requested JSON library ('ujson' falls back to json)"""
+    if name == 'ujson':
+        try:
+            import ujson
+            return lambda value: ujson.dumps(value, ensure_ascii=False, escape_forward_slashes=False)
+        except ImportError:
+            pass
+    return lambda value: json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class ResultWriter:
+    """Write processing results in bulk; use as a context manager"""
+
+    def write(self, result: Dict[str, Any]):
+        raise NotImplementedError
+
+    def write_all(self, results: Iterable[Dict[str, Any]]) -> int:
+        """Write results from an iterable (e.g. process_batch) as they arrive"""
+        count = 0
+        for result in results:
+            self.write(result)
+            count += 1
+        return count
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonLinesWriter(ResultWriter):
+    """One compact JSON document per line, through a large write buffer
+
+    With ``track_offsets`` the writer keeps ``offset``, the byte position
+    where the next line starts, e.g. to checkpoint a batch job.
+    """
+
+    def __init__(self, path: str, encoder: str = 'ujson', buffer_size: int = 1 << 20,
+                 append: bool = False, track_offsets: bool = False):
+        self.path = str(path)
+        self._dumps = _json_encoder(encoder)
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8', buffering=buffer_size)
+        self.track_offsets = track_offsets
+        self.offset = os.path.getsize(self.path) if track_offsets else 0
+
+    def write(self, result: Dict[str, Any]):
+        line = self._dumps(result) + "\n"
+        self._file.write(line)
+        if self.track_offsets:
+            self.offset += len(line.encode('utf-8'))
+
+    def flush(self):
+        self._file.flush()
+
+    def sync(self):
+        """Flush and make everything written so far durable on disk"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class ArrowWriter(ResultWriter):
+    """Columnar results in Parquet or Arrow IPC (Feather v2) format, via pyarrow
+
+    Results are buffered into record batches of ``batch_size`` rows, so
+    memory stays bounded. Each extracted field gets its own string column;
+    fields the extractor does not know about go to an ``extraFields`` JSON
+    column.
+    """
+
+    def __init__(self, path: str, format: str = 'parquet', batch_size: int = 10000,
+                 fields: Optional[List[str]] = None):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Arrow/Parquet output requires pyarrow (pip install pyarrow)")
+        if format not in ('parquet', 'arrow'):
+            raise ValueError(f"Unsupported columnar format: {format}")
+
+        self.path = str(path)
+        self.format = format
+        self.batch_size = batch_size
+        self.fields = fields or sorted(DEFAULT_EXTRACTOR.output_fields)
+        self._field_set = set(self.fields)
+        self._pa = pa
+        self.schema = pa.schema(
+            [('sourceFile', pa.string()), ('claimIndex', pa.int32()),
+             ('recommendedRoute', pa.string()), ('reasoning', pa.string()),
+             ('missingFields', pa.list_(pa.string())), ('policyIssues', pa.list_(pa.string())),
+             ('configVersion', pa.string()), ('shadowRoute', pa.string()), ('error', pa.string())]
+            + [(field, pa.string()) for field in self.fields]
+            + [('extraFields', pa.string())])
+        self._columns = {name: [] for name in self.schema.names}
+        self._rows = 0
+
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self.schema)
+
+    def write(self, result: Dict[str, Any]):
+        columns = self._columns
+        extracted = result.get('extractedFields') or {}
+        columns['sourceFile'].append(result.get('sourceFile'))
+        # Only results split from a bundled document have one
+        columns['claimIndex'].append(result.get('claimIndex'))
+        columns['recommendedRoute'].append(result.get('recommendedRoute'))
+        columns['reasoning'].append(result.get('reasoning'))
+        columns['missingFields'].append(result.get('missingFields') or [])
+        # None when policy checks are off, so "no issues" stays distinguishable
+        columns['policyIssues'].append(result.get('policyIssues'))
+        columns['configVersion'].append(result.get('configVersion'))
+        # Only set when candidate rules run in shadow mode
+        columns['shadowRoute'].append(result.get('shadowRoute'))
+        columns['error'].append(result.get('error'))
+        for field in self.fields:
+            value = extracted.get(field)
+            columns[field].append(None if value is None else str(value))
+        extra = {key: value for key, value in extracted.items() if key not in self._field_set}
+        columns['extraFields'].append(json.dumps(extra, ensure_ascii=False) if extra else None)
+
+        self._rows += 1
+        if self._rows >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows as one record batch"""
+        if not self._rows:
+            return
+        batch = self._pa.RecordBatch.from_pydict(self._columns, schema=self.schema)
+        if self.format == 'parquet':
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write(batch)
+        for column in self._columns.values():
+            column.clear()
+        self._rows = 0
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+# Output formats by file extension
+WRITER_FORMATS = {
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+}
+
+
+def open_writer(path: str, format: Optional[str] = None, **options) -> ResultWriter:
+    """Open a result writer, choosing the format from the file extension by default"""
+    format = format or WRITER_FORMATS.get(Path(path).suffix.lower(), 'jsonl')
+    if format == 'jsonl':
+        return JsonLinesWriter(path, **options)
+    if format in ('parquet', 'arrow'):
+        return ArrowWriter(path, format=format, **options)
+    raise ValueError(f"Unsupported output format: {format}")
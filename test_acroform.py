@@ -0,0 +1,58 @@
+# test_acroform.py
+from src.acroform import map_acord_fields, read_form_values
+from src.parser import DocumentParser
+
+BLANK_FORM = "data/ACORD-Automobile-Loss-Notice-12.05.16.pdf"
+
+
+def _pdf_string(value: str) -> str:
+    return '(' + value.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def write_form_pdf(path, values):
+    """Minimal one-page PDF whose AcroForm holds the given text/check box values"""
+    objects = ['<< /Type /Catalog /Pages 2 0 R /AcroForm << /Fields [%s] >> >>' % ' '.join(
+                   f'{4 + i} 0 R' for i in range(len(values))),
+               '<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+               '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>']
+    for name, value in values.items():
+        field_type, value = ('/Btn', '/On') if value is True else ('/Tx', _pdf_string(value))
+        objects.append(f'<< /FT {field_type} /T {_pdf_string(name)} /V {value} >>')
+    
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{obj}\nendobj\n'.encode('latin-1')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1')
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode('latin-1')
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('latin-1')
+    path.write_bytes(bytes(out))
+    return path
+
+
+def test_filled_form_fields_map_to_internal_keys(tmp_path):
+    pdf = write_form_pdf(tmp_path / "filled.pdf", {
+        'Text7': 'POL-778899', 'NAME OF INSURED First Middle Last': 'Jane Doe',
+        'Text3': '03/14/2024', 'Text4': '10:30', 'Check Box6': True,
+        'STREET LOCATION OF LOSS': '12 Main Street', 'CITY STATE ZIP': 'Springfield, IL 62701',
+        'Text45': '$12,500', 'AGENCY': 'Acme Agency',
+    })
+    
+    extracted = DocumentParser().parse_document(str(pdf))
+    
+    assert extracted['policy_number'] == 'POL-778899'
+    assert extracted['incident_time'] == '10:30 PM'
+    assert extracted['location'] == '12 Main Street, Springfield, IL 62701'
+    assert extracted['estimated_damage'] == '12500'
+    assert extracted.damage == 12500.0
+    assert 'AGENCY' not in extracted
+
+
+def test_blank_form_falls_back_to_text():
+    assert read_form_values(BLANK_FORM) == {}
+    assert len(map_acord_fields({'AGENCY': 'Acme Agency'})) == 0
+    
+    with_forms = DocumentParser().parse_document(BLANK_FORM)
+    assert with_forms == DocumentParser(read_forms=False).parse_document(BLANK_FORM)
@@ -0,0 +1,94 @@
+# test_async_processor.py
+import asyncio
+import threading
+import time
+
+from src.async_processor import AsyncFNOLProcessor
+from src.processor import FNOLProcessor
+
+TXT_FILES = [
+    "txt_files/fnol_theft_claim.txt",
+    "txt_files/fnol_injury_claim.txt",
+    "txt_files/fnol_small_claim.txt",
+    "txt_files/fnol_fraud_alert.txt"
+]
+PDF_FILE = "data/ACORD-Automobile-Loss-Notice-12.05.16.pdf"
+
+
+def test_async_results_match_sync_processor():
+    processor = FNOLProcessor()
+    
+    async def run():
+        async with AsyncFNOLProcessor(processor, concurrency=2) as async_processor:
+            single = await async_processor.process_document(PDF_FILE)
+            batch = [result async for result in async_processor.process_batch(TXT_FILES + [PDF_FILE])]
+        return single, batch
+    
+    single, batch = asyncio.run(run())
+    
+    assert single == processor.process_document(PDF_FILE)
+    assert [result['sourceFile'] for result in batch] == TXT_FILES + [PDF_FILE]
+    for result in batch:
+        expected = processor.process_document(result['sourceFile'])
+        assert {k: v for k, v in result.items() if k != 'sourceFile'} == expected
+
+
+def test_batch_from_queue_isolates_errors(tmp_path):
+    async def run():
+        queue = asyncio.Queue()
+        for file_path in [TXT_FILES[0], str(tmp_path / "missing.txt"), None]:
+            queue.put_nowait(file_path)
+        
+        async def paths():
+            while True:
+                file_path = await queue.get()
+                if file_path is None:
+                    return
+                yield file_path
+        
+        async with AsyncFNOLProcessor() as async_processor:
+            return [result async for result in async_processor.process_batch(paths())]
+    
+    results = asyncio.run(run())
+    
+    assert 'error' not in results[0]
+    assert results[1]['error'].startswith("FileNotFoundError")
+
+
+def test_concurrency_limit_and_cancellation():
+    processor = FNOLProcessor()
+    lock = threading.Lock()
+    running, peak, finished = [0], [0], []
+    
+    def slow_process(file_path):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        finished.append(file_path)
+        return {}
+    
+    processor.process_document = slow_process
+    
+    async def run():
+        async_processor = AsyncFNOLProcessor(processor, concurrency=2)
+        
+        async def consume():
+            return [result async for result in async_processor.process_batch(TXT_FILES * 5)]
+        
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.12)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        finally:
+            await async_processor.close()
+        return False
+    
+    assert asyncio.run(run())
+    assert peak[0] == 2
+    assert len(finished) < len(TXT_FILES * 5)
@@ -0,0 +1,53 @@
+# test_batch.py
+from src.cache import ResultCache
+from src.processor import FNOLProcessor
+
+TXT_FILES = [
+    "txt_files/fnol_theft_claim.txt",
+    "txt_files/fnol_injury_claim.txt",
+    "txt_files/fnol_small_claim.txt",
+    "txt_files/fnol_fraud_alert.txt"
+]
+
+
+def test_batch_matches_single_document_results():
+    processor = FNOLProcessor()
+    files = TXT_FILES + ["data/ACORD-Automobile-Loss-Notice-12.05.16.pdf"]
+    
+    results = list(processor.process_batch(files, workers=2))
+    
+    assert [r['sourceFile'] for r in results] == files
+    for file_path, result in zip(files, results):
+        expected = processor.process_document(file_path)
+        assert {k: v for k, v in result.items() if k != 'sourceFile'} == expected
+
+
+def test_batch_isolates_failing_documents(tmp_path):
+    processor = FNOLProcessor()
+    files = [TXT_FILES[0], str(tmp_path / "missing.txt"), TXT_FILES[1]]
+    
+    results = list(processor.process_batch(files, workers=2))
+    
+    assert [r['sourceFile'] for r in results] == files
+    assert 'error' not in results[0] and 'error' not in results[2]
+    assert results[1]['error'].startswith("FileNotFoundError")
+    assert results[1]['recommendedRoute'] == "Manual Review"
+
+
+def test_batch_expands_directory():
+    processor = FNOLProcessor()
+    
+    results = list(processor.process_batch("txt_files", workers=2))
+    
+    assert [r['sourceFile'].replace('\\', '/') for r in results] == sorted(TXT_FILES)
+
+
+def test_prefork_batch_matches_and_reopens_inherited_connections(tmp_path):
+    processor = FNOLProcessor(cache=ResultCache(str(tmp_path / "cache.sqlite")))
+    # The parent's cache connection is open when the workers are forked
+    expected = [processor.process_document(file_path) for file_path in TXT_FILES]
+    
+    results = list(processor.process_batch(TXT_FILES, workers=2, prefork=True))
+    
+    assert [{k: v for k, v in r.items() if k != 'sourceFile'} for r in results] == expected
+    assert processor.process_document(TXT_FILES[0]) == expected[0]
@@ -0,0 +1,38 @@
+# test_benchmarks.py
+import json
+
+from benchmarks.bench import STAGES, compare, main
+from benchmarks.corpus import generate_corpus
+from src.parser import DocumentParser
+
+
+def test_generated_documents_parse(tmp_path):
+    files = generate_corpus(tmp_path / "corpus", 6, pdf_ratio=0.5, seed=3)
+    assert len(files['txt']) + len(files['pdf']) == 6
+    assert files['pdf'], "seed should produce at least one PDF"
+    
+    parser = DocumentParser()
+    for file_path in files['txt'] + files['pdf']:
+        extracted = parser.parse_document(file_path)
+        assert extracted['policy_number'][:3] in ('POL', 'INS', 'SML', 'AUT')
+        assert extracted['estimated_damage'].isdigit()
+    
+    # Same parameters reuse the existing corpus
+    assert generate_corpus(tmp_path / "corpus", 6, pdf_ratio=0.5, seed=3) == files
+
+
+def test_benchmark_emits_results_and_flags_regressions(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(['--docs', '4', '--pdf-ratio', '0.5', '--corpus-dir', str(tmp_path / "corpus"),
+                 '--output', str(output)]) == 0
+    
+    results = json.loads(output.read_text())
+    assert list(results['stages']) == STAGES
+    assert results['stages']['end_to_end']['count'] == 4
+    assert set(results['stages']['route']['latency_ms']) >= {'p50', 'p99', 'max'}
+    
+    slower = json.loads(output.read_text())
+    slower['stages']['route']['throughput_per_s'] /= 10
+    slower['stages']['route']['latency_ms']['p50'] *= 10
+    assert len(compare(slower, results, 0.2)) == 2
+    assert compare(results, results, 0.2) == []
@@ -0,0 +1,65 @@
+# test_cache.py
+import shutil
+from copy import deepcopy
+
+from src.cache import ResultCache
+from src.processor import FNOLProcessor
+from src.router import RoutingEngine
+
+
+def test_cached_results_match_uncached(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    processor = FNOLProcessor(cache=cache)
+    expected = FNOLProcessor().process_document("txt_files/fnol_theft_claim.txt")
+    
+    assert processor.process_document("txt_files/fnol_theft_claim.txt") == expected
+    assert processor.process_document("txt_files/fnol_theft_claim.txt") == expected
+    assert len(list(iter_keys(cache, ResultCache.EXTRACTION))) == 1
+    assert len(list(iter_keys(cache, ResultCache.RESULT))) == 1
+
+
+def test_rules_change_reroutes_without_reparsing(tmp_path, monkeypatch):
+    processor = FNOLProcessor(cache=ResultCache(tmp_path / "cache.sqlite"))
+    first = processor.process_document("txt_files/fnol_theft_claim.txt")
+    assert first['recommendedRoute'] == "Standard Processing"
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("document was parsed again")
+    
+    monkeypatch.setattr(processor.parser, 'extract_document', fail)
+    config = deepcopy(processor.router.config)
+    for rule in config['rules']:
+        if rule['type'] == 'damage_threshold':
+            rule['threshold'] = 50000
+    processor.router = RoutingEngine(config)
+    
+    second = processor.process_document("txt_files/fnol_theft_claim.txt")
+    assert second['recommendedRoute'] == "Fast-track"
+
+
+def test_same_content_under_new_name_reuses_extraction(tmp_path):
+    processor = FNOLProcessor(cache=ResultCache(tmp_path / "cache.sqlite"))
+    copy = tmp_path / "resubmitted_claim.txt"
+    shutil.copy("txt_files/fnol_injury_claim.txt", copy)
+    
+    processor.process_document("txt_files/fnol_injury_claim.txt")
+    result = processor.process_document(str(copy))
+    
+    assert len(list(iter_keys(processor.cache, ResultCache.EXTRACTION))) == 1
+    assert result['recommendedRoute'] == "Specialist Queue"
+
+
+def test_lru_eviction_respects_size_budget(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite", max_bytes=2000)
+    for i in range(50):
+        cache.put(ResultCache.RESULT, f"key-{i}", {"value": "x" * 100})
+    
+    keys = list(iter_keys(cache, ResultCache.RESULT))
+    assert 0 < len(keys) < 20
+    assert "key-49" in keys and "key-0" not in keys
+
+
+def iter_keys(cache, kind):
+    conn = cache._connect()
+    for (key,) in conn.execute("SELECT key FROM entries WHERE kind = ?", (kind,)):
+        yield key
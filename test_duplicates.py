@@ -0,0 +1,79 @@
+# test_duplicates.py
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.duplicates import DuplicateIndex
+from src.processor import FNOLProcessor
+from src.record import ClaimRecord
+from src.router import RoutingEngine
+
+THEFT_FILE = "txt_files/fnol_theft_claim.txt"
+SMALL_FILE = "txt_files/fnol_small_claim.txt"
+DESCRIPTION = ("Vehicle stolen from parking garage overnight. Security footage shows "
+               "suspicious activity around the entrance. Vehicle not recovered yet.")
+
+
+def test_resubmitted_claim_is_flagged_but_not_its_own_duplicate(tmp_path):
+    processor = FNOLProcessor(duplicates=DuplicateIndex(tmp_path / "duplicates.sqlite"))
+    copy = tmp_path / "resubmitted_theft.txt"
+    shutil.copy(THEFT_FILE, copy)
+    
+    first = processor.process_document(THEFT_FILE)
+    assert processor.process_document(THEFT_FILE) == first
+    
+    result = processor.process_document(str(copy))
+    assert result['recommendedRoute'] == "Investigation Flag"
+    assert "fnol_theft_claim.txt" in result['reasoning']
+    assert "same policy number" in result['reasoning']
+
+
+def test_reworded_description_is_a_near_duplicate(tmp_path):
+    index = DuplicateIndex(tmp_path / "duplicates.sqlite")
+    index.add({'policy_number': 'POL-1', 'incident_date': '01/20/2024', 'description': DESCRIPTION},
+              "first.txt")
+    
+    reworded = {'policy_number': 'POL-2', 'incident_date': '02/01/2024',
+                'description': DESCRIPTION.upper().replace("YET.", "SO FAR.")}
+    match = index.find(reworded)
+    assert match['kind'] == "near" and match['source'] == "first.txt"
+    assert match['similarity'] >= 0.7
+    assert index.find({'description': "Hail dented the roof of the insured home last night."}) is None
+    
+    index.add(reworded, "first.txt")
+    assert len(index) == 1
+
+
+def test_batch_routing_uses_duplicate_column(tmp_path):
+    np = pytest.importorskip("numpy")
+    index = DuplicateIndex(tmp_path / "duplicates.sqlite")
+    index.add({'description': DESCRIPTION}, "first.txt")
+    engine = RoutingEngine(duplicate_index=index)
+    claims = [(ClaimRecord({'description': DESCRIPTION, 'estimate_amount': '5000'}), []),
+              (ClaimRecord({'description': "Minor scratch on the rear bumper", 'estimate_amount': '5000'}), [])]
+    
+    routed = engine.route_batch(engine.claim_columns(claims))
+    
+    expected = [engine.determine_route(*claim)['route'] for claim in claims]
+    assert list(routed['route']) == expected == ["Investigation Flag", "Fast-track"]
+    assert np.asarray(routed['reason_code'])[0] == "duplicate"
+
+
+def test_batch_routing_excludes_the_claims_own_source(tmp_path):
+    pytest.importorskip("numpy")
+    duplicates = DuplicateIndex(tmp_path / "duplicates.sqlite")
+    processor = FNOLProcessor(duplicates=duplicates)
+    processor.process_document(SMALL_FILE)
+    engine = processor.router
+    
+    extracted = processor.parser.parse_document(SMALL_FILE)
+    missing = processor.validator.validate(extracted)
+    source = str(Path(SMALL_FILE).resolve())
+    expected = engine.determine_route(extracted, missing, source)
+    
+    routed = engine.route_batch(engine.claim_columns([(extracted, missing, source)]))
+    assert (routed['route'][0], routed['reasoning'][0]) == (expected['route'], expected['reasoning'])
+    assert expected['route'] == "Fast-track"
+    # Without its source the claim matches its own index entry
+    assert engine.route_batch(engine.claim_columns([(extracted, missing)]))['route'][0] == "Investigation Flag"
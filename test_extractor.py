@@ -0,0 +1,41 @@
+# test_extractor.py
+import json
+
+from src.extractor import DEFAULT_EXTRACTOR
+from src.processor import FNOLProcessor
+
+DEMO_FILES = [
+    "data/ACORD-Automobile-Loss-Notice-12.05.16.pdf",
+    "txt_files/fnol_theft_claim.txt",
+    "txt_files/fnol_injury_claim.txt",
+    "txt_files/fnol_small_claim.txt",
+    "txt_files/fnol_fraud_alert.txt"
+]
+
+
+def test_demo_results_unchanged():
+    processor = FNOLProcessor()
+    with open("all_results.json", encoding='utf-8') as f:
+        expected = json.load(f)
+    
+    for file_path, expected_result in zip(DEMO_FILES, expected):
+        # The rules version changes with any rules.json edit, so it is not stored
+        expected_result = {**expected_result, "configVersion": processor.rules.version}
+        assert processor.process_document(file_path) == expected_result
+
+
+def test_leftmost_valid_match_wins():
+    text = "TIME: later\nDATE OF LOSS AND TIME 10:15 am\nTime: 11:00 PM\n"
+    
+    extracted = DEFAULT_EXTRACTOR.extract(text)
+    
+    assert extracted['incident_time'] == "10:15 am"
+
+
+def test_line_fallback_uses_key_words():
+    text = "Type of Claim: Theft of vehicle\nInsured Name: Jane Doe\n"
+    
+    extracted = DEFAULT_EXTRACTOR.extract(text)
+    
+    assert extracted['claim_type'] == "Theft"
+    assert extracted['policyholder_name'] == "Jane Doe"
@@ -0,0 +1,67 @@
+# test_jobs.py
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from src.jobs import BatchJob, JobManifest
+from src.processor import FNOLProcessor
+
+TXT_FILES = sorted(Path("txt_files").glob("*.txt"))
+
+# Runs a job in a child process that dies (no cleanup) after three results
+CRASHING_RUN = """
+import os, sys
+from src.jobs import BatchJob, JobManifest
+from src.processor import FNOLProcessor
+job = BatchJob(JobManifest(sys.argv[1]), sys.argv[2], checkpoint_every=2)
+for count, _ in enumerate(job.run(FNOLProcessor().process_batch), 1):
+    if count == 3:
+        os._exit(1)
+"""
+
+
+def make_inbox(tmp_path, copies=2):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for copy in range(copies):
+        for file_path in TXT_FILES:
+            shutil.copy(file_path, inbox / f"{copy}_{file_path.name}")
+    return inbox
+
+
+def test_resume_after_crash_writes_each_result_once(tmp_path):
+    inbox = make_inbox(tmp_path)
+    output = tmp_path / "results.jsonl"
+    manifest = JobManifest(str(tmp_path / "jobs.sqlite"))
+    job_id = manifest.create_job(str(inbox), str(output))
+    
+    crashed = subprocess.run([sys.executable, "-c", CRASHING_RUN, manifest.path, job_id],
+                             cwd=Path(__file__).parent)
+    assert crashed.returncode == 1
+    assert manifest.summary(job_id) == {'done': 2}
+    
+    job = BatchJob(manifest, job_id)
+    resumed = list(job.run(FNOLProcessor().process_batch))
+    
+    assert job.skipped == 2 and len(resumed) == 6
+    lines = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert sorted(line['sourceFile'] for line in lines) == sorted(str(p) for p in inbox.iterdir())
+    assert manifest.summary(job_id) == {'done': 8}
+    assert manifest.get_job(job_id)['finished_at'] is not None
+
+
+def test_failed_documents_are_retried_up_to_max_attempts(tmp_path):
+    output = tmp_path / "results.jsonl"
+    manifest = JobManifest(str(tmp_path / "jobs.sqlite"))
+    job_id = manifest.create_job(str(tmp_path / "late.txt"), str(output), max_attempts=2)
+    
+    assert len(list(BatchJob(manifest, job_id).run(FNOLProcessor().process_batch))) == 1
+    assert manifest.document_states(job_id) == {str(tmp_path / "late.txt"): ('retry', 1)}
+    assert output.read_text() == ""
+    
+    list(BatchJob(manifest, job_id).run(FNOLProcessor().process_batch))
+    assert manifest.summary(job_id) == {'failed': 1}
+    assert json.loads(output.read_text())['error'].startswith("FileNotFoundError")
+    assert list(BatchJob(manifest, job_id).run(FNOLProcessor().process_batch)) == []
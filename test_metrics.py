@@ -0,0 +1,69 @@
+# test_metrics.py
+import json
+
+import pytest
+
+from src.metrics import HistogramSink, JsonLinesSink, Metrics, PrometheusSink
+from src.processor import FNOLProcessor
+
+PDF_FILE = "data/ACORD-Automobile-Loss-Notice-12.05.16.pdf"
+TXT_FILE = "txt_files/fnol_theft_claim.txt"
+
+
+def test_metrics_do_not_change_results():
+    plain = FNOLProcessor()
+    instrumented = FNOLProcessor(metrics=Metrics([HistogramSink()]))
+    
+    for file_path in (TXT_FILE, PDF_FILE):
+        assert instrumented.process_document(file_path) == plain.process_document(file_path)
+
+
+def test_sinks_record_stages_sizes_and_routes(tmp_path):
+    histogram = HistogramSink()
+    prometheus = PrometheusSink()
+    jsonl = JsonLinesSink(tmp_path / "traces.jsonl")
+    processor = FNOLProcessor(metrics=Metrics([histogram, prometheus, jsonl]))
+    
+    processor.process_document(TXT_FILE)
+    processor.process_document(PDF_FILE)
+    with pytest.raises(FileNotFoundError):
+        processor.process_document(str(tmp_path / "missing.txt"))
+    jsonl.close()
+    
+    snapshot = histogram.snapshot()
+    assert snapshot['documents'] == 3 and snapshot['errors'] == 1
+    assert snapshot['stages']['read']['count'] == 2
+    assert {'total', 'read', 'extract', 'validate', 'route'} <= set(snapshot['stages'])
+    assert snapshot['totals']['pages'] == 4
+    assert sum(snapshot['routes'].values()) == 2
+    
+    traces = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    assert [trace['file'] for trace in traces[:2]] == [TXT_FILE, PDF_FILE]
+    assert traces[1]['counts']['pages'] == 4 and traces[1]['counts']['text_chars'] > 0
+    assert traces[2]['error'].startswith("FileNotFoundError")
+    
+    text = prometheus.render()
+    assert 'fnol_stage_seconds_count{stage="read"} 2' in text
+    assert 'fnol_stage_seconds_bucket{stage="route",le="+Inf"} 2' in text
+    assert 'fnol_pages_total 4' in text
+
+
+def test_slow_results_carry_their_trace():
+    processor = FNOLProcessor(metrics=Metrics(slow_threshold=0))
+    result = processor.process_document(TXT_FILE)
+    assert result['trace']['route'] == result['recommendedRoute']
+    assert set(result['trace']['stagesMs']) == {'read', 'extract', 'validate', 'route'}
+    
+    processor.metrics.slow_threshold = 60
+    assert 'trace' not in processor.process_document(TXT_FILE)
+
+
+def test_batch_workers_send_traces_to_parent_sinks():
+    histogram = HistogramSink()
+    processor = FNOLProcessor(metrics=Metrics([histogram]))
+    
+    results = list(processor.process_batch([TXT_FILE, PDF_FILE], workers=2))
+    
+    assert all('error' not in result for result in results)
+    assert histogram.documents == 2
+    assert histogram.totals['pages'] == 4
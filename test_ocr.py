@@ -0,0 +1,55 @@
+# test_ocr.py
+from PIL import Image, ImageDraw
+
+from src.cache import ResultCache
+from src.ocr import OcrStage
+from src.processor import FNOLProcessor
+
+CLAIM_TEXT = """POLICY NUMBER: SCN123456789
+NAME OF INSURED: Sam Scanner
+DATE OF LOSS: 03/04/2024
+DESCRIPTION: Faxed notice of a parked car hit in a garage.
+"""
+
+
+class PageLabelEngine:
+    """Stands in for tesseract: 'recognises' the label drawn on test pages"""
+    
+    cache_key = "page-label"
+    
+    def recognize(self, image) -> str:
+        # Pages are drawn black on white; the darkest row tells them apart
+        label = sum(1 for x in range(0, image.size[0], 8) if image.getpixel((x, 20)) < 128)
+        return CLAIM_TEXT if label else f"PAGE {label}\n"
+
+
+def write_scan(path, pages):
+    """Image-only PDF (no text layer); a page with a bar across the top holds the claim"""
+    images = []
+    for bar in pages:
+        image = Image.new('L', (300, 300), 255)
+        if bar:
+            ImageDraw.Draw(image).rectangle((0, 15, 299, 25), fill=0)
+        ImageDraw.Draw(image).text((20, 100 + len(images) * 10), "scan", fill=0)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:])
+    return str(path)
+
+
+def test_scanned_pages_are_recognised_once(tmp_path):
+    scan = write_scan(tmp_path / "fax.pdf", [True, False])
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    ocr = OcrStage(PageLabelEngine(), workers=2, cache=cache, dpi=72)
+    processor = FNOLProcessor(ocr=ocr, pdf_backend='pdfplumber')
+    
+    assert FNOLProcessor().process_document(scan)['extractedFields'].get('policy_number') is None
+    result = processor.process_document(scan)
+    assert result['extractedFields']['policy_number'] == "SCN123456789"
+    assert (ocr.pages_recognized, ocr.pages_cached) == (2, 0)
+    
+    # The same pages in another file come from the cache
+    again = OcrStage(PageLabelEngine(), workers=1, cache=cache, dpi=72)
+    texts = again.ocr_pages(write_scan(tmp_path / "resent.pdf", [True, False]), [0, 1])
+    assert texts[0] == CLAIM_TEXT
+    assert (again.pages_recognized, again.pages_cached) == (0, 2)
+    ocr.close()
@@ -0,0 +1,37 @@
+# test_pdf_backends.py
+from pathlib import Path
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.pdf_backends import compare_backends
+from src.parser import DocumentParser
+from src.pdf_backends import AutoBackend, PdfPlumberBackend, TextLayerBackend, get_pdf_backend
+
+FORM_PDF = "data/ACORD-Automobile-Loss-Notice-12.05.16.pdf"
+
+
+def test_auto_uses_layout_for_forms_and_text_layer_otherwise(tmp_path):
+    files = generate_corpus(tmp_path / "corpus", 3, pdf_ratio=1.0, seed=5)
+    auto = AutoBackend()
+    
+    assert isinstance(auto.select(Path(FORM_PDF))[0], PdfPlumberBackend)
+    for file_path in files['pdf']:
+        assert isinstance(auto.select(Path(file_path))[0], TextLayerBackend)
+        assert (DocumentParser(pdf_backend='auto').parse_document(file_path)
+                == DocumentParser(pdf_backend='pdfplumber').parse_document(file_path))
+
+
+def test_backend_comparison_reports_speed_and_accuracy(tmp_path):
+    files = generate_corpus(tmp_path / "corpus", 2, pdf_ratio=1.0, seed=5)
+    
+    results = compare_backends(files['pdf'] + [FORM_PDF])
+    
+    assert set(results) == {'auto', 'pdfplumber', 'pypdf2'}
+    assert results['pdfplumber']['fields']['accuracy'] == 1.0
+    assert results['auto']['identical_docs'] == 3
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_pdf_backend('ocr')
@@ -0,0 +1,66 @@
+# test_pipeline.py
+import threading
+import time
+
+from src.cache import ResultCache
+from src.metrics import HistogramSink, Metrics
+from src.pipeline import ClaimPipeline
+from src.processor import FNOLProcessor
+
+TXT_FILES = [
+    "txt_files/fnol_theft_claim.txt",
+    "txt_files/fnol_injury_claim.txt",
+    "txt_files/fnol_small_claim.txt",
+    "txt_files/fnol_fraud_alert.txt"
+]
+PDF_FILE = "data/ACORD-Automobile-Loss-Notice-12.05.16.pdf"
+
+
+def test_pipeline_matches_process_document(tmp_path):
+    metrics = Metrics([HistogramSink()])
+    processor = FNOLProcessor(metrics=metrics)
+    files = TXT_FILES + [PDF_FILE, str(tmp_path / "missing.txt")]
+    pipeline = ClaimPipeline(processor, parse_workers=3, validate_workers=2, route_workers=2,
+                             queue_size=2, pdf_processes=1)
+    
+    results = {r['sourceFile']: r for r in pipeline.run(files)}
+    
+    assert sorted(results) == sorted(files)
+    assert results[files[-1]]['error'].startswith("FileNotFoundError")
+    for file_path in files[:-1]:
+        expected = FNOLProcessor().process_document(file_path)
+        assert {k: v for k, v in results[file_path].items() if k != 'sourceFile'} == expected
+    
+    stats = pipeline.stats()
+    assert list(stats) == ['parse', 'validate', 'route', 'sink']
+    assert stats['parse']['processed'] == 6 and stats['parse']['errors'] == 1
+    assert stats['route']['processed'] == 5 and stats['sink']['processed'] == 6
+    assert all(s['peakQueueDepth'] <= 2 for s in stats.values())
+    assert metrics.sink(HistogramSink).documents == 6
+
+
+def test_pipeline_reuses_cached_results(tmp_path):
+    processor = FNOLProcessor(cache=ResultCache(str(tmp_path / "cache.sqlite")))
+    first = sorted(ClaimPipeline(processor).run(TXT_FILES), key=lambda r: r['sourceFile'])
+    
+    pipeline = ClaimPipeline(processor)
+    second = sorted(pipeline.run(TXT_FILES), key=lambda r: r['sourceFile'])
+    
+    assert first == second
+    assert pipeline.stats()['validate']['processed'] == 0
+
+
+def test_slow_sink_applies_backpressure():
+    files = TXT_FILES * 10
+    pipeline = ClaimPipeline(FNOLProcessor(), parse_workers=2, queue_size=1)
+    results = pipeline.run(files)
+    
+    next(results)
+    time.sleep(0.3)
+    # Only a handful of claims fit in the queues while the sink is stalled
+    in_flight = pipeline.stats()['parse']['processed']
+    assert in_flight < 10
+    
+    assert len(list(results)) == len(files) - 1
+    results.close()
+    assert not any(t.name.startswith("fnol-pipeline") for t in threading.enumerate())
@@ -0,0 +1,43 @@
+# test_policies.py
+import os
+
+from src.policies import PolicyIndex
+from src.processor import FNOLProcessor
+
+THEFT_FILE = "txt_files/fnol_theft_claim.txt"  # INS987654321, loss on 01/20/2024
+
+
+def write_policies(path, rows):
+    path.write_text("policy_number,effective_from,effective_to,status\n"
+                    + "".join(",".join(row) + "\n" for row in rows), encoding='utf-8')
+    return path
+
+
+def test_policy_checks(tmp_path):
+    index = PolicyIndex(write_policies(tmp_path / "policies.csv", [
+        ("INS987654321", "2024-01-01", "12/31/2024", "Active"),
+        ("POL-OLD", "2020-01-01", "2020-12-31", "active"),
+        ("POL-CANCELLED", "2024-01-01", "2024-12-31", "Cancelled"),
+    ]))
+    
+    assert index.lookup("ins987654321")['effective_to'] == "2024-12-31"
+    assert index.check("INS987654321", "01/20/2024") is None
+    assert index.check("POL-MISSING").startswith("Unknown policy number")
+    assert "not active" in index.check("POL-CANCELLED", "03/01/2024")
+    assert "outside the effective dates" in index.check("POL-OLD", "01/20/2024")
+    assert os.path.exists(tmp_path / "policies.sqlite")
+
+
+def test_processor_reports_policy_issues_and_reloads_snapshot(tmp_path):
+    csv_path = write_policies(tmp_path / "policies.csv", [("INS987654321", "2024-01-01", "2024-12-31", "")])
+    processor = FNOLProcessor(policies=PolicyIndex(csv_path, reload_interval=0))
+    
+    assert processor.process_document(THEFT_FILE)['policyIssues'] == []
+    
+    write_policies(csv_path, [("INS987654321", "2023-01-01", "2023-12-31", "")])
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    issues = processor.process_document(THEFT_FILE)['policyIssues']
+    assert len(issues) == 1 and "2023-12-31" in issues[0]
+    
+    assert 'policyIssues' not in FNOLProcessor().process_document(THEFT_FILE)
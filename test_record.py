@@ -0,0 +1,43 @@
+# test_record.py
+import pickle
+import sys
+
+from src.parser import DocumentParser
+from src.record import ClaimRecord
+from src.router import RoutingEngine
+
+TXT_FILE = "txt_files/fnol_theft_claim.txt"
+
+
+def test_record_behaves_like_the_dict_it_replaces():
+    fields = {'policy_number': 'POL-1', 'estimate_amount': '45,000', 'adjuster': 'Sam'}
+    record = ClaimRecord(fields)
+    
+    assert record == fields
+    assert record.to_dict() == fields
+    assert 'vin' not in record and record.get('vin') is None
+    assert record['adjuster'] == 'Sam'
+    assert pickle.loads(pickle.dumps(record)) == fields
+    assert sys.getsizeof(ClaimRecord(record.to_dict())) < sys.getsizeof(dict(fields))
+    
+    del record['adjuster']
+    assert list(record) == ['policy_number', 'estimate_amount']
+
+
+def test_damage_is_parsed_once_and_reset_on_update():
+    record = ClaimRecord({'estimate_amount': '$45,000'})
+    
+    assert record.damage == 45000.0
+    assert record._damage == 45000.0
+    record['estimated_damage'] = '8,500'
+    assert record.damage == 8500.0
+    assert RoutingEngine().determine_route(record, [])['route'] == "Fast-track"
+
+
+def test_parser_returns_a_record_convertible_to_the_model():
+    record = DocumentParser().parse_document(TXT_FILE)
+    
+    assert isinstance(record, ClaimRecord)
+    model = record.to_model()
+    assert model.policy_info.policy_number == record['policy_number']
+    assert model.asset_details.estimated_damage == record.damage
@@ -0,0 +1,118 @@
+# test_router.py
+import json
+import random
+
+import pytest
+
+from src.matcher import PhraseMatcher
+from src.router import RoutingEngine, load_rules
+
+
+COMPLETE = {
+    'policy_number': 'POL-1', 'policyholder_name': 'A', 'incident_date': '01/01/2024',
+    'incident_time': '10:00 AM', 'location': 'X', 'asset_type': 'Vehicle',
+    'claim_type': 'Collision', 'estimated_damage': '30000',
+}
+
+
+def route(data, missing=None):
+    return RoutingEngine().determine_route(data, missing or [])
+
+
+def test_phrase_matcher_finds_overlapping_phrases():
+    matcher = PhraseMatcher(['false claim', 'claim', 'fab', 'fabricated'])
+    assert matcher.find_all('a false claim, fabricated') == {'false claim', 'claim', 'fab', 'fabricated'}
+    assert matcher.ordered_matches('fabricated claim') == ['claim', 'fab', 'fabricated']
+    assert PhraseMatcher([]).find_all('anything') == set()
+
+
+def test_rule_priority_and_phrase_order():
+    data = dict(COMPLETE, description='Fabricated and potentially fraudulent; medical bills')
+    assert route(data) == {
+        "route": "Investigation Flag",
+        "reasoning": "Description contains fraud indicator: 'potentially fraudulent'"
+    }
+
+    data = dict(COMPLETE, description='Hospital visit', claim_type='Collision')
+    assert route(data, ['location'])['route'] == "Specialist Queue"
+
+
+def test_weak_fraud_exception_for_theft():
+    data = dict(COMPLETE, estimated_damage=None, description='Suspicious and questionable activity')
+    assert route(data)['reasoning'] == "Description contains 'suspicious'"
+
+    data['claim_type'] = 'Theft'
+    assert route(data)['reasoning'] == "Description contains 'questionable'"
+
+
+def test_damage_threshold_and_missing_fields():
+    assert route(dict(COMPLETE, estimated_damage='$12,500'))['reasoning'] == \
+        "Estimated damage ($12,500) < $25,000"
+    assert route(COMPLETE, ['claimant', 'vin', 'location', 'asset_type', 'claim_type'])['reasoning'] == \
+        "Missing mandatory fields: location, asset_type, claim_type"
+
+
+def test_rules_load_from_file(tmp_path):
+    config = load_rules()
+    config['routing']['rules'] = [{"name": "all", "priority": 1, "type": "default",
+                                   "route": "Manual Review", "reasoning": "Everything"}]
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(config))
+
+    engine = RoutingEngine.from_file(str(path))
+    assert engine.determine_route(COMPLETE, [])['route'] == "Manual Review"
+    assert engine.config_fingerprint() != RoutingEngine().config_fingerprint()
+
+    with pytest.raises(ValueError):
+        RoutingEngine({"rules": [{"name": "x", "priority": 1, "type": "unknown"}]})
+
+
+def test_route_batch_matches_determine_route():
+    pytest.importorskip("numpy")
+    with open("all_results.json", 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    claims = [(r['extractedFields'], r['missingFields']) for r in results]
+    claims += [
+        (dict(COMPLETE, estimated_damage=None, claim_type='Auto Theft',
+              description='Suspicious, questionable entry'), []),
+        (dict(COMPLETE, estimated_damage='abc', description='Nothing of note here'), []),
+        (dict(COMPLETE, estimated_damage='$24,999.50', claim_type=None), []),
+        (dict(COMPLETE, description='Bodily harm'), ['claimant', 'location', 'incident_time']),
+        ({}, []),
+    ]
+
+    for threshold in (25000, 50000):
+        config = load_rules()['routing']
+        for rule in config['rules']:
+            if rule['type'] == 'damage_threshold':
+                rule['threshold'] = threshold
+        engine = RoutingEngine(config)
+
+        batch = engine.route_batch(engine.claim_columns(claims))
+        for i, (data, missing) in enumerate(claims):
+            expected = engine.determine_route(data, missing)
+            assert (batch['route'][i], batch['reasoning'][i]) == (expected['route'], expected['reasoning'])
+
+
+def test_route_batch_parity_with_shuffled_missing_fields_and_many_phrases():
+    pytest.importorskip("numpy")
+    config = load_rules()['routing']
+    for rule in config['rules']:
+        if rule['name'] == 'weak_fraud':
+            # Far more phrases than fit in a 64-bit mask
+            rule['phrases'] = rule['phrases'] + [f"indicator {i}" for i in range(200)]
+    engine = RoutingEngine(config)
+    fields = next(rule['fields'] for rule in config['rules'] if rule['type'] == 'missing_fields')
+
+    rng = random.Random(7)
+    claims = []
+    for i in range(500):
+        missing = rng.sample(fields + ['claimant'], rng.randint(0, 5))
+        description = rng.choice(["Nothing of note", f"mentions indicator {rng.randrange(200)}",
+                                  "Suspicious entry"])
+        claims.append((dict(COMPLETE, description=description), missing))
+
+    batch = engine.route_batch(engine.claim_columns(claims))
+    for i, (data, missing) in enumerate(claims):
+        expected = engine.determine_route(data, missing)
+        assert (batch['route'][i], batch['reasoning'][i]) == (expected['route'], expected['reasoning'])
\ No newline at end of file
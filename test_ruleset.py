@@ -0,0 +1,66 @@
+# test_ruleset.py
+import json
+import os
+
+from src.processor import FNOLProcessor
+from src.router import load_rules
+from src.ruleset import RulesWatcher
+
+THEFT_FILE = "txt_files/fnol_theft_claim.txt"
+
+
+def write_rules(path, config):
+    path.write_text(json.dumps(config), encoding='utf-8')
+    # Bump the mtime so the watcher sees every write
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    return path
+
+
+def test_reload_swaps_rules_and_version(tmp_path):
+    config = load_rules()
+    rules_path = write_rules(tmp_path / "rules.json", config)
+    processor = FNOLProcessor(rules_path=rules_path, streaming=True)
+    parser_version = processor.parser.cache_version()
+    first = processor.process_document(THEFT_FILE)
+    assert first['configVersion'] == processor.rules.version
+    assert 'witness' not in first['missingFields']
+    
+    old_rules = processor.rules
+    config['version'] += 1
+    config['validation']['mandatory_fields'].append('witness')
+    write_rules(rules_path, config)
+    watcher = RulesWatcher(rules_path, processor.reload_rules)
+    assert watcher.check() is False  # Seen when the watcher was created
+    processor.reload_rules()
+    
+    second = processor.process_document(THEFT_FILE)
+    assert second['configVersion'].startswith(f"{config['version']}-")
+    assert second['configVersion'] != first['configVersion']
+    assert 'witness' in second['missingFields']
+    # Like the constructor, only fields the extractor produces can stop a stream
+    assert processor.parser.stop_fields == FNOLProcessor(streaming=True).parser.stop_fields
+    assert 'claimant' not in processor.parser.stop_fields
+    assert processor.parser.cache_version() == parser_version
+    # A claim that started on the old rules finishes on them
+    extracted = processor.parser.parse_document(THEFT_FILE)
+    missing, issues = processor._validate(extracted, rules=old_rules)
+    assert processor._route(extracted, missing, issues, rules=old_rules)['configVersion'] == first['configVersion']
+
+
+def test_watcher_keeps_rules_when_file_is_invalid(tmp_path):
+    config = load_rules()
+    rules_path = write_rules(tmp_path / "rules.json", config)
+    processor = FNOLProcessor(rules_path=rules_path)
+    watcher = RulesWatcher(rules_path, processor.reload_rules)
+    version = processor.rules.version
+    
+    rules_path.write_text("{not json", encoding='utf-8')
+    os.utime(rules_path, ns=(0, os.stat(rules_path).st_mtime_ns + 10 ** 9))
+    assert watcher.check() is False
+    assert processor.rules.version == version
+    
+    config['routing']['rules'] = config['routing']['rules'][:-1]
+    write_rules(rules_path, config)
+    assert watcher.check() is True
+    assert processor.rules.version != version
@@ -0,0 +1,96 @@
+# test_service.py
+import json
+import threading
+import urllib.request
+from urllib.error import HTTPError
+
+import pytest
+
+from src.processor import FNOLProcessor
+from src.service import ClaimService, create_server
+
+
+@pytest.fixture
+def base_url():
+    service = ClaimService(FNOLProcessor(), workers=2, queue_size=2)
+    server = create_server("127.0.0.1", 0, service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+
+def post(url, body, headers):
+    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def test_process_path_matches_processor(base_url):
+    expected = FNOLProcessor().process_document("txt_files/fnol_injury_claim.txt")
+    
+    result = post(f"{base_url}/process", json.dumps({"path": "txt_files/fnol_injury_claim.txt"}).encode(),
+                  {"Content-Type": "application/json"})
+    
+    assert result == expected
+
+
+def test_raw_upload_keeps_filename_for_inference(base_url):
+    expected = FNOLProcessor().process_document("txt_files/fnol_theft_claim.txt")
+    with open("txt_files/fnol_theft_claim.txt", 'rb') as f:
+        body = f.read()
+    
+    result = post(f"{base_url}/process?filename=fnol_theft_claim.txt", body,
+                  {"Content-Type": "application/octet-stream"})
+    
+    assert result == expected
+
+
+def test_batch_returns_results_in_order(base_url):
+    paths = ["txt_files/fnol_small_claim.txt", "txt_files/fnol_fraud_alert.txt"]
+    
+    results = post(f"{base_url}/batch", json.dumps({"paths": paths}).encode(),
+                   {"Content-Type": "application/json"})
+    
+    assert [r['recommendedRoute'] for r in results] == ["Fast-track", "Standard Processing"]
+
+
+def test_paths_outside_root_are_rejected(base_url):
+    with pytest.raises(HTTPError) as error:
+        post(f"{base_url}/process", json.dumps({"path": "../etc/passwd"}).encode(),
+             {"Content-Type": "application/json"})
+    
+    assert error.value.code == 403
+
+
+def test_batch_stays_within_service_slots():
+    processor = FNOLProcessor()
+    service = ClaimService(processor, workers=1, queue_size=1)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+    process_document = processor.process_document
+    
+    def counting(file_path):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        try:
+            return process_document(file_path)
+        finally:
+            with lock:
+                running[0] -= 1
+    
+    processor.process_document = counting
+    paths = ["txt_files/fnol_small_claim.txt", "txt_files/fnol_fraud_alert.txt", "missing.txt"] * 3
+    try:
+        results = service.process_paths(paths)
+    finally:
+        service.shutdown()
+    
+    assert [r['recommendedRoute'] for r in results[:2]] == ["Fast-track", "Standard Processing"]
+    assert [r['sourceFile'].endswith(p) for r, p in zip(results, paths)] == [True] * len(paths)
+    assert 'error' in results[2]
+    assert peak[0] == 1
+    assert service._slots.acquire(blocking=False) and service._slots.acquire(blocking=False)
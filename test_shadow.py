@@ -0,0 +1,73 @@
+# test_shadow.py
+import glob
+from copy import deepcopy
+
+from src.cache import ResultCache
+from src.processor import FNOLProcessor
+from src.router import load_rules
+from src.ruleset import RuleSet
+from src.shadow import ShadowReport, replay_cache
+
+TXT_FILES = sorted(glob.glob("txt_files/*.txt"))
+
+
+def candidate_rules(threshold):
+    config = deepcopy(load_rules())
+    for spec in config['routing']['rules']:
+        if spec['type'] == 'damage_threshold':
+            spec['threshold'] = threshold
+    return RuleSet.from_config(config)
+
+
+def test_shadow_route_in_results():
+    processor = FNOLProcessor(shadow=candidate_rules(1_000_000))
+    report = ShadowReport(processor.rules.version, processor.shadow.version)
+    for result in processor.process_batch(TXT_FILES, workers=2):
+        report.observe(result)
+    
+    summary = report.to_dict()
+    assert summary['claims'] == len(TXT_FILES)
+    assert summary['changed'] >= 1
+    for transition in summary['transitions']:
+        assert (transition['from'], transition['to']) == ("Standard Processing", "Fast-track")
+        assert set(transition['sampleClaims']) <= set(TXT_FILES)
+    assert 'shadowRoute' not in FNOLProcessor().process_document(TXT_FILES[0])
+
+
+def test_replay_cached_extractions_without_parsing(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    processor = FNOLProcessor(cache=cache)
+    for file_path in TXT_FILES:
+        processor.process_document(file_path)
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("document was parsed again")
+    
+    monkeypatch.setattr("src.parser.DocumentParser.extract_document", fail)
+    live = RuleSet.from_config(load_rules())
+    same = replay_cache(cache, live, live, workers=1).to_dict()
+    assert same['claims'] == len(TXT_FILES) and same['changed'] == 0
+    
+    serial = replay_cache(cache, live, candidate_rules(1_000_000), workers=1).to_dict()
+    # One entry per span, so every span goes to a worker process
+    parallel = replay_cache(cache, live, candidate_rules(1_000_000), workers=2, span=1).to_dict()
+    assert parallel == serial
+    assert serial['changed'] >= 1
+    assert serial['matrix']["Standard Processing"]["Fast-track"] == serial['changed']
+
+
+def test_replay_falls_back_when_batch_routing_cannot_run(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    processor = FNOLProcessor(cache=cache)
+    for file_path in TXT_FILES:
+        processor.process_document(file_path)
+    
+    config = deepcopy(load_rules())
+    for spec in config['routing']['rules']:
+        if spec['type'] == 'missing_fields':
+            # More fields than the batch missing-field bitmask holds
+            spec['fields'] = spec['fields'] + [f"extra_field_{i}" for i in range(70)]
+    live = RuleSet.from_config(load_rules())
+    
+    report = replay_cache(cache, live, RuleSet.from_config(config), workers=1).to_dict()
+    assert report['claims'] == len(TXT_FILES) and report['changed'] == 0
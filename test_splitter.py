@@ -0,0 +1,49 @@
+# test_splitter.py
+from pathlib import Path
+
+from src.processor import FNOLProcessor
+from src.splitter import ClaimSplitter
+
+TXT_FILES = [
+    "txt_files/fnol_theft_claim.txt",
+    "txt_files/fnol_injury_claim.txt",
+    "txt_files/fnol_small_claim.txt",
+    "txt_files/fnol_fraud_alert.txt"
+]
+
+
+def write_bundle(path):
+    texts = [Path(file_path).read_text(encoding='utf-8') for file_path in TXT_FILES]
+    path.write_text("CARRIER EXPORT 2024-02-01\n\n" + "\n".join(texts), encoding='utf-8')
+    return texts
+
+
+def test_txt_and_page_splitting_agree(tmp_path):
+    bundle = tmp_path / "export.txt"
+    texts = write_bundle(bundle)
+    splitter = ClaimSplitter()
+
+    claims = list(splitter.iter_txt(bundle))
+
+    assert len(claims) == len(TXT_FILES)
+    assert claims[0].startswith("CARRIER EXPORT")
+    assert [claim.strip() for claim in claims[1:]] == [text.strip() for text in texts[1:]]
+    # Claims spanning "pages", and pages holding several claims
+    lines = bundle.read_text(encoding='utf-8').split('\n')
+    pages = ['\n'.join(lines[i:i + 7]) for i in range(0, len(lines), 7)]
+    assert list(splitter.iter_chunks(pages)) == claims[:-1] + [claims[-1] + '\n']
+    assert splitter.split_text(texts[0]) == [texts[0] + '\n']
+
+
+def test_process_bundle_routes_each_claim(tmp_path):
+    bundle = tmp_path / "export.txt"
+    write_bundle(bundle)
+    processor = FNOLProcessor()
+
+    results = list(processor.process_bundle(str(bundle)))
+
+    assert [result['claimIndex'] for result in results] == [0, 1, 2, 3]
+    for file_path, result in zip(TXT_FILES, results):
+        expected = processor.process_document(file_path)
+        assert result['extractedFields']['policy_number'] == expected['extractedFields']['policy_number']
+        assert result['recommendedRoute'] == expected['recommendedRoute']
@@ -0,0 +1,42 @@
+# test_startup.py
+import re
+import subprocess
+import sys
+
+# Generous budget for importing the CLI modules; the module checks are the precise guard
+IMPORT_BUDGET_MS = 200
+HEAVY_MODULES = ['pdfplumber', 'pdfminer', 'pydantic', 'concurrent.futures.process']
+TXT_FILE = "txt_files/fnol_theft_claim.txt"
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code],
+                          capture_output=True, text=True, check=True)
+
+
+def test_txt_processing_does_not_load_the_pdf_backend():
+    code = (
+        "import sys, run\n"
+        "from src.processor import FNOLProcessor\n"
+        f"FNOLProcessor().process_document({TXT_FILE!r})\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    assert _run(code).stdout.strip() == ""
+
+
+def test_pdf_backend_loads_on_first_pdf():
+    code = (
+        "import sys\n"
+        "from src.processor import FNOLProcessor\n"
+        "FNOLProcessor().process_document('data/ACORD-Automobile-Loss-Notice-12.05.16.pdf')\n"
+        "print('pdfplumber' in sys.modules)\n"
+    )
+    assert _run(code).stdout.strip() == "True"
+
+
+def test_cli_import_time_within_budget():
+    timings = _run("import run", "-X", "importtime").stderr
+    # Cumulative microseconds of the top-level "run" import
+    cumulative = [int(match) for match in re.findall(r"\|\s*(\d+) \| run$", timings, re.MULTILINE)]
+    assert cumulative
+    assert cumulative[0] / 1000 < IMPORT_BUDGET_MS
@@ -0,0 +1,44 @@
+# test_streaming.py
+from pathlib import Path
+
+from src.parser import DocumentParser
+from src.validator import FieldValidator
+
+CLAIM = Path("txt_files/fnol_small_claim.txt").read_text(encoding='utf-8')
+
+
+def fake_pages(pages, opened):
+    def iter_pdf_pages(file_path):
+        for page_text in pages:
+            opened.append(page_text)
+            yield page_text
+    return iter_pdf_pages
+
+
+def test_streaming_stops_once_mandatory_fields_found():
+    parser = DocumentParser(streaming=True, stop_fields=FieldValidator().mandatory_fields)
+    opened = []
+    parser.iter_pdf_pages = fake_pages(["ATTACHMENT PAGE", CLAIM, "PHOTO 1", "PHOTO 2"], opened)
+    
+    text = parser._read_pdf_text(Path("claim.pdf"))
+    
+    assert opened == ["ATTACHMENT PAGE", CLAIM]
+    assert parser._extract_from_text(text)['policy_number'] == "SML444555666"
+
+
+def test_streaming_reads_everything_when_fields_never_appear():
+    parser = DocumentParser(streaming=True, stop_fields=['policy_number'])
+    opened = []
+    parser.iter_pdf_pages = fake_pages(["PAGE 1", "PAGE 2", "PAGE 3"], opened)
+    
+    parser._read_pdf_text(Path("claim.pdf"))
+    
+    assert len(opened) == 3
+
+
+def test_max_pages_caps_pages_read():
+    parser = DocumentParser(streaming=True, max_pages=2)
+    
+    pages = list(parser.iter_pdf_pages(Path("data/ACORD-Automobile-Loss-Notice-12.05.16.pdf")))
+    
+    assert len(pages) == 2
@@ -0,0 +1,105 @@
+# test_watcher.py
+import os
+import shutil
+import time
+
+import pytest
+
+from src.processor import FNOLProcessor
+from src.watcher import FolderWatcher, ProcessedIndex
+
+CLAIMS = ["txt_files/fnol_theft_claim.txt", "txt_files/fnol_injury_claim.txt"]
+
+
+def make_watcher(directory, index_path, results, **kwargs):
+    return FolderWatcher(directory, FNOLProcessor(), ProcessedIndex(index_path),
+                         on_result=results.append, workers=1, settle_seconds=0, **kwargs)
+
+
+def bump_mtime(path, seconds=5):
+    # Make sure the change is visible even within one filesystem timestamp tick
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))
+
+
+def test_polling_processes_only_new_or_changed_files(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for claim in CLAIMS:
+        shutil.copy(claim, inbox)
+    results = []
+    watcher = make_watcher(inbox, tmp_path / "index.sqlite", results, use_inotify=False)
+    
+    assert watcher.run_once() == 2
+    assert watcher.run_once() == 0
+    
+    shutil.copy("txt_files/fnol_small_claim.txt", inbox)
+    bump_mtime(inbox)
+    assert watcher.run_once() == 1
+    assert results[-1]['sourceFile'].endswith("fnol_small_claim.txt")
+    
+    # Touched without a content change: recorded, not reprocessed
+    bump_mtime(inbox / "fnol_theft_claim.txt")
+    assert watcher.run_once(full_scan=True) == 0
+    
+    (inbox / "fnol_theft_claim.txt").write_text("POLICY NUMBER: NEW123\n", encoding='utf-8')
+    assert watcher.run_once(full_scan=True) == 1
+    assert len(watcher.index) == 3
+    watcher.close()
+
+
+def test_polling_checks_only_unindexed_names(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for claim in CLAIMS:
+        shutil.copy(claim, inbox)
+    results = []
+    watcher = make_watcher(inbox, tmp_path / "index.sqlite", results, use_inotify=False)
+    assert watcher.run_once() == 2
+    
+    looked_up = []
+    lookup = watcher.index.lookup
+    watcher.index.lookup = lambda paths: looked_up.extend(paths) or lookup(paths)
+    shutil.copy("txt_files/fnol_small_claim.txt", inbox)
+    bump_mtime(inbox)
+    assert watcher.run_once() == 1
+    assert [os.path.basename(path) for path in looked_up] == ["fnol_small_claim.txt"]
+    watcher.close()
+
+
+def test_restart_skips_listing_unchanged_directory(tmp_path, monkeypatch):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    shutil.copy(CLAIMS[0], inbox)
+    bump_mtime(inbox, seconds=-5)
+    results = []
+    
+    watcher = make_watcher(inbox, tmp_path / "index.sqlite", results, use_inotify=False)
+    assert watcher.run_once() == 1
+    watcher.close()
+    
+    restarted = make_watcher(inbox, tmp_path / "index.sqlite", results, use_inotify=False)
+    monkeypatch.setattr(restarted, '_list_directory', lambda: pytest.fail("directory was listed"))
+    assert restarted.run_once() == 0
+    restarted.close()
+
+
+def test_inotify_reports_new_files(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    results = []
+    watcher = make_watcher(inbox, tmp_path / "index.sqlite", results)
+    if watcher.mode != "inotify":
+        watcher.close()
+        pytest.skip("inotify not available")
+    
+    assert watcher.run_once() == 0
+    shutil.copy(CLAIMS[1], inbox)
+    deadline = time.time() + 5
+    processed = 0
+    while not processed and time.time() < deadline:
+        processed = watcher.run_once(timeout=0.5)
+    
+    assert processed == 1
+    assert results[0]['recommendedRoute'] == "Specialist Queue"
+    watcher.close()
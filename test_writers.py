@@ -0,0 +1,84 @@
+# test_writers.py
+import json
+
+import pytest
+
+from src.processor import FNOLProcessor
+from src.writers import JsonLinesWriter, open_writer
+
+FILES = [
+    "txt_files/fnol_theft_claim.txt",
+    "txt_files/fnol_injury_claim.txt",
+    "txt_files/fnol_small_claim.txt",
+    "txt_files/fnol_fraud_alert.txt"
+]
+
+
+@pytest.fixture(scope="module")
+def results():
+    return list(FNOLProcessor().process_batch(FILES, workers=2))
+
+
+@pytest.mark.parametrize("encoder", ["ujson", "json"])
+def test_json_lines_round_trip(tmp_path, results, encoder):
+    output = tmp_path / "results.jsonl"
+    with JsonLinesWriter(output, encoder=encoder, buffer_size=64) as writer:
+        assert writer.write_all(results) == len(results)
+    
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == results
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_columnar_output_in_batches(tmp_path, results, suffix):
+    pa = pytest.importorskip("pyarrow")
+    output = tmp_path / f"results{suffix}"
+    extra = dict(results[0], extractedFields={**results[0]['extractedFields'], 'adjuster': 'K. Lee'})
+    
+    with open_writer(output, batch_size=2) as writer:
+        writer.write_all(results + [extra])
+    
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(output)
+    else:
+        table = pa.ipc.open_file(str(output)).read_all()
+    
+    rows = table.to_pylist()
+    assert [row['sourceFile'] for row in rows] == FILES + [FILES[0]]
+    assert [row['recommendedRoute'] for row in rows[:4]] == [r['recommendedRoute'] for r in results]
+    assert rows[1]['missingFields'] == results[1]['missingFields']
+    assert rows[0]['policy_number'] == results[0]['extractedFields']['policy_number']
+    assert rows[0]['extraFields'] is None
+    assert json.loads(rows[4]['extraFields']) == {'adjuster': 'K. Lee'}
+
+
+def test_columnar_output_keeps_policy_issues(tmp_path, results):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    output = tmp_path / "results.parquet"
+    checked = [dict(results[0], policyIssues=["Unknown policy number: X"]), dict(results[1], policyIssues=[])]
+    
+    with open_writer(output) as writer:
+        writer.write_all(checked + [results[2]])
+    
+    rows = pq.read_table(output).to_pylist()
+    assert [row['policyIssues'] for row in rows] == [["Unknown policy number: X"], [], None]
+
+
+def test_columnar_output_keeps_shadow_route(tmp_path, results):
+    pa = pytest.importorskip("pyarrow")
+    output = tmp_path / "results.arrow"
+    
+    with open_writer(output) as writer:
+        writer.write_all([dict(results[0], shadowRoute="Fast-track"), results[1]])
+    
+    rows = pa.ipc.open_file(str(output)).read_all().to_pylist()
+    assert [row['shadowRoute'] for row in rows] == ["Fast-track", None]
+
+
+def test_processor_save_results_streams_batch(tmp_path):
+    processor = FNOLProcessor()
+    output = tmp_path / "batch.jsonl"
+    assert processor.save_results(processor.process_batch(FILES, workers=2), output) == len(FILES)
+    assert len(output.read_text(encoding='utf-8').splitlines()) == len(FILES)